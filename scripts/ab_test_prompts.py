@@ -1,10 +1,11 @@
 """A/B test OCR prompt variants on a sample of pages.
 
 Usage:
-    python -m scripts.ab_test_prompts --volume CO273_534 --sample 10
+    python -m scripts.ab_test_prompts --volume CO273_534 --sample 10 [--seed 0] [--no-cache]
 
 Runs all 3 prompt variants on the same sample pages, computes WER/CER
-for each, and reports which variant performs best.
+for each, and reports which variant performs best. Responses are cached,
+so re-running on the same sample (fixed by --seed) makes no API calls.
 """
 import argparse
 import asyncio
@@ -12,10 +13,11 @@ import json
 from pathlib import Path
 
 from src.config import DOWNLOAD_DIR
+from src.ocr.cache import CACHE_NAME, ResponseCache
 from src.ocr.config import OCR_PROMPTS
 from src.ocr.evaluate import evaluate_document
 from src.ocr.gemini_ocr import ocr_single_page
-from src.ocr.pipeline import get_gemini_model, _discover_pages
+from src.ocr.pipeline import GeminiRateLimiter, get_gemini_model, _discover_pages
 
 
 async def ab_test(
@@ -23,6 +25,8 @@ async def ab_test(
     volume_id: str,
     sample: int = 10,
     concurrency: int = 5,
+    cache: ResponseCache | None = None,
+    seed: int | None = None,
 ) -> dict:
     """Run A/B test across all prompt variants."""
     images_dir = volume_dir / "images"
@@ -37,12 +41,13 @@ async def ab_test(
     # Sample pages
     if sample < len(pages):
         import random
-        pages = random.sample(pages, sample)
+        pages = random.Random(seed).sample(pages, sample)
 
     print(f"A/B testing {len(pages)} pages with {len(OCR_PROMPTS)} prompt variants")
 
     model = get_gemini_model()
     semaphore = asyncio.Semaphore(concurrency)
+    limiter = GeminiRateLimiter()
     results = {}
 
     for variant_name in OCR_PROMPTS:
@@ -61,6 +66,8 @@ async def ab_test(
                     source_document=entry["doc_id"],
                     output_dir=out_dir,
                     prompt_key=variant_name,
+                    cache=cache,
+                    limiter=limiter,
                 )
 
         # Evaluate this variant
@@ -106,10 +113,17 @@ def main():
     parser.add_argument("--volume", type=str, required=True, help="Volume to test")
     parser.add_argument("--sample", type=int, default=10, help="Number of pages to test")
     parser.add_argument("--concurrency", type=int, default=5, help="Max concurrent requests")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the page sample")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the response cache and always call Gemini")
     args = parser.parse_args()
 
     volume_dir = DOWNLOAD_DIR / args.volume
-    asyncio.run(ab_test(volume_dir, args.volume, args.sample, args.concurrency))
+    if args.no_cache:
+        asyncio.run(ab_test(volume_dir, args.volume, args.sample, args.concurrency, seed=args.seed))
+        return
+    with ResponseCache(DOWNLOAD_DIR / CACHE_NAME) as cache:
+        asyncio.run(ab_test(volume_dir, args.volume, args.sample, args.concurrency, cache, args.seed))
+        print(f"Response cache: {cache.hits} hits, {cache.misses} misses")
 
 
 if __name__ == "__main__":
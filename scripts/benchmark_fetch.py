@@ -0,0 +1,95 @@
+"""Benchmark per-page image fetching against BulkPDF fetching.
+
+Usage:
+    python -m scripts.benchmark_fetch --volume CO273_534 --docs 3
+
+Scrapes the same documents twice into a scratch directory, once with
+fetch="images" and once with fetch="pdf", counting HTTP requests (retries
+and redirects included) and wall time for each, and reports both.
+"""
+import argparse
+import json
+import shutil
+import threading
+import time
+
+from src.auth import authenticate_gale
+from src.config import DOWNLOAD_DIR, VOLUMES
+from src.scraper import scrape_volume
+
+
+class RequestCounter:
+    """requests response hook counting every HTTP response on a session."""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, response, *args, **kwargs):
+        with self._lock:
+            self.count += 1
+        return response
+
+
+def benchmark(session, volume_id: str, doc_ids: list[str], workers: int | None = None) -> dict:
+    """Run both fetch modes on doc_ids and return {mode: stats}."""
+    bench_dir = DOWNLOAD_DIR / "_benchmark"
+    counter = RequestCounter()
+    session.hooks["response"].append(counter)
+    results = {}
+
+    try:
+        for fetch in ("images", "pdf"):
+            output_dir = bench_dir / fetch
+            shutil.rmtree(output_dir, ignore_errors=True)
+            print(f"\n--- fetch={fetch} ---")
+
+            counter.count = 0
+            started = time.monotonic()
+            scrape_volume(
+                session, volume_id, doc_ids, output_dir,
+                resume=False, max_workers=workers, fetch=fetch,
+            )
+            elapsed = time.monotonic() - started
+
+            images_dir = output_dir / volume_id / "images"
+            pages = sum(1 for _ in images_dir.rglob("page_*.jpg"))
+            results[fetch] = {
+                "requests": counter.count,
+                "wall_seconds": round(elapsed, 2),
+                "pages": pages,
+                "requests_per_page": round(counter.count / pages, 3) if pages else None,
+            }
+    finally:
+        session.hooks["response"].remove(counter)
+
+    print("\n=== Fetch Benchmark ===")
+    for fetch, r in results.items():
+        print(f"  {fetch:7s}  requests={r['requests']:5d}  wall={r['wall_seconds']:8.2f}s  "
+              f"pages={r['pages']}  requests/page={r['requests_per_page']}")
+
+    bench_dir.mkdir(parents=True, exist_ok=True)
+    report_path = bench_dir / "fetch_benchmark.json"
+    report_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Results saved to {report_path}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image vs BulkPDF page fetching")
+    parser.add_argument("--volume", type=str, required=True, help="Volume to sample documents from")
+    parser.add_argument("--docs", type=int, default=3, help="Number of documents to fetch")
+    parser.add_argument("--workers", type=int, default=None, help="Concurrent page downloads")
+    args = parser.parse_args()
+
+    if args.volume not in VOLUMES:
+        print(f"Unknown volume: {args.volume}")
+        raise SystemExit(1)
+
+    session = authenticate_gale()
+    doc_ids = VOLUMES[args.volume]["doc_ids"][:args.docs]
+    benchmark(session, args.volume, doc_ids, args.workers)
+
+
+if __name__ == "__main__":
+    main()
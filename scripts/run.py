@@ -2,16 +2,26 @@
 CLI entry point for aihistory scraper pipeline.
 
 Usage:
-    python -m scripts.run scrape [--resume] [--volume ID]
-    python -m scripts.run build [--volume ID]
+    python -m scripts.run scrape [--resume] [--volume ID] [--engine threads|async] [--fetch images|pdf] [--parallel-volumes N]
+    python -m scripts.run build [--volume ID] [--reencode] [--processes N]
     python -m scripts.run upload
+    python -m scripts.run stream [--resume] [--volume ID] [--concurrency N] [--prompt general|tabular|handwritten] [--no-cache]
     python -m scripts.run test [--doc-id GALE|...]
     python -m scripts.run all [--resume] [--volume ID]
 """
 import argparse
-from src.config import VOLUMES, DOWNLOAD_DIR
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config import (
+    ADAPTIVE_MAX_WORKERS, ASYNC_MAX_IN_FLIGHT, DOWNLOAD_DELAY, DOWNLOAD_DIR,
+    MAX_WORKERS, PROGRESS_INTERVAL, VOLUMES,
+)
 from src.auth import authenticate_gale
-from src.scraper import scrape_volume, get_document_data, download_document_pages, save_ocr_text, sanitize_doc_id
+from src.rate_control import AdaptiveLimiter
+from src.scraper import (
+    RequestThrottle, ScrapeProgress, scrape_volume, get_document_data,
+    download_document_pages, save_ocr_text, sanitize_doc_id,
+)
 from src.pdf_builder import build_volume_pdf
 from src.gcs_upload import upload_all_volumes, list_bucket_contents
 
@@ -35,6 +45,11 @@ def cmd_scrape(args):
     volumes = _get_volumes(args)
 
     print(f"\n=== Step 2: Downloading documents ({len(volumes)} volume(s)) ===")
+    if args.parallel_volumes > 1 and len(volumes) > 1:
+        _scrape_parallel(session, volumes, args)
+        print("\n=== Scraping complete ===")
+        return
+
     for volume_id, vol_config in volumes.items():
         print(f"\nStarting {volume_id}...")
         scrape_volume(
@@ -44,11 +59,73 @@ def cmd_scrape(args):
             output_dir=DOWNLOAD_DIR,
             resume=args.resume,
             max_workers=args.workers,
+            engine=args.engine,
+            adaptive=not args.fixed_rate,
+            fetch=args.fetch,
         )
 
     print("\n=== Scraping complete ===")
 
 
+def _scrape_parallel(session, volumes, args):
+    """Scrape up to --parallel-volumes volumes at once on one session.
+
+    All volumes share the session's cookie jar, one concurrency budget
+    (a single limiter; fixed at --workers with --fixed-rate), one
+    DOWNLOAD_DELAY metadata throttle and one aggregated progress line.
+    """
+    workers = args.workers or (ASYNC_MAX_IN_FLIGHT if args.engine == "async" else MAX_WORKERS)
+    parallel = min(args.parallel_volumes, len(volumes))
+
+    ceiling = workers if args.fixed_rate else max(workers, ADAPTIVE_MAX_WORKERS)
+    floor = workers if args.fixed_rate else 1
+    limiter = AdaptiveLimiter(initial=workers, min_limit=floor, max_limit=ceiling)
+
+    throttle = RequestThrottle(DOWNLOAD_DELAY)
+    progress = ScrapeProgress()
+    stop = threading.Event()
+
+    def report():
+        while not stop.wait(PROGRESS_INTERVAL):
+            print(f"[progress] {progress.summary()}")
+
+    def run(volume_id, vol_config):
+        return scrape_volume(
+            session=session,
+            volume_id=volume_id,
+            doc_ids=vol_config["doc_ids"],
+            output_dir=DOWNLOAD_DIR,
+            resume=args.resume,
+            max_workers=workers,
+            engine=args.engine,
+            adaptive=not args.fixed_rate,
+            fetch=args.fetch,
+            limiter=limiter,
+            throttle=throttle,
+            progress=progress,
+        )
+
+    print(f"Scraping {len(volumes)} volumes, {parallel} at a time")
+    reporter = threading.Thread(target=report, daemon=True)
+    reporter.start()
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            futures = {
+                executor.submit(run, volume_id, vol_config): volume_id
+                for volume_id, vol_config in volumes.items()
+            }
+            for future, volume_id in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"[{volume_id}] FAILED: {e}")
+    finally:
+        stop.set()
+        reporter.join()
+
+    print(f"[progress] {progress.summary()}")
+
+
 def cmd_build(args):
     """Build per-volume PDFs from downloaded page images."""
     print("=== Building PDFs ===")
@@ -63,11 +140,49 @@ def cmd_build(args):
             continue
 
         print(f"\nBuilding {volume_id}...")
-        build_volume_pdf(images_dir, output_pdf)
+        build_volume_pdf(
+            images_dir, output_pdf,
+            passthrough=not getattr(args, "reencode", False),
+            workers=getattr(args, "processes", 1),
+        )
 
     print("\n=== PDF build complete ===")
 
 
+def cmd_stream(args):
+    """Scrape and OCR in one pass: pages are transcribed as documents land."""
+    import asyncio
+    from contextlib import ExitStack
+    from src.ocr.cache import CACHE_NAME, ResponseCache
+    from src.ocr.stream import run_stream_pipeline
+
+    print("=== Step 1: NUS SSO Authentication ===")
+    session = authenticate_gale()
+
+    volumes = _get_volumes(args)
+    print(f"\n=== Step 2: Streaming scrape -> OCR ({len(volumes)} volume(s)) ===")
+    with ExitStack() as stack:
+        cache = None if args.no_cache else stack.enter_context(ResponseCache(DOWNLOAD_DIR / CACHE_NAME))
+        for volume_id, vol_config in volumes.items():
+            print(f"\nStarting {volume_id}...")
+            asyncio.run(run_stream_pipeline(
+                session=session,
+                volume_id=volume_id,
+                doc_ids=vol_config["doc_ids"],
+                output_dir=DOWNLOAD_DIR,
+                concurrency=args.concurrency,
+                prompt_key=args.prompt,
+                cache=cache,
+                resume=args.resume,
+                max_workers=args.workers,
+                engine=args.engine,
+                adaptive=not args.fixed_rate,
+                fetch=args.fetch,
+            ))
+
+    print("\n=== Streaming complete ===")
+
+
 def cmd_upload(args):
     """Upload all volumes to GCS."""
     print("=== Uploading to GCS ===")
@@ -162,14 +277,33 @@ def main():
     sp_scrape = subparsers.add_parser("scrape", help="Auth + download documents")
     sp_scrape.add_argument("--resume", action="store_true", help="Resume interrupted download")
     sp_scrape.add_argument("--volume", type=str, help="Scrape only this volume (e.g., CO273_534)")
-    sp_scrape.add_argument("--workers", type=int, default=None, choices=range(1, 21), metavar="N", help="Concurrent download workers 1-20 (default: 5)")
+    sp_scrape.add_argument("--workers", type=int, default=None, choices=range(1, 257), metavar="N", help="Concurrent page downloads 1-256; starting limit when adaptive (default: 5 threads, 64 async)")
+    sp_scrape.add_argument("--engine", type=str, default="threads", choices=["threads", "async"], help="Page download engine (async requires httpx)")
+    sp_scrape.add_argument("--fixed-rate", action="store_true", help="Disable adaptive concurrency; keep --workers fixed")
+    sp_scrape.add_argument("--fetch", type=str, default="images", choices=["images", "pdf"], help="Fetch pages one image per request, or one BulkPDF per document")
+    sp_scrape.add_argument("--parallel-volumes", type=int, default=1, metavar="N", help="Scrape N volumes at once, sharing one session and request budget")
     sp_scrape.set_defaults(func=cmd_scrape)
 
     # build
     sp_build = subparsers.add_parser("build", help="Merge document PDFs into volume PDFs")
     sp_build.add_argument("--volume", type=str, help="Build only this volume")
+    sp_build.add_argument("--reencode", action="store_true", help="Re-encode every page with PIL instead of embedding JPEG bytes as-is")
+    sp_build.add_argument("--processes", type=int, default=1, metavar="N", help="Convert non-passthrough pages (fallback images, or all with --reencode) in N processes (default: 1, in-process)")
     sp_build.set_defaults(func=cmd_build)
 
+    # stream
+    sp_stream = subparsers.add_parser("stream", help="Scrape + OCR in one streaming pass")
+    sp_stream.add_argument("--resume", action="store_true", help="Resume interrupted scrape (OCR always resumes)")
+    sp_stream.add_argument("--volume", type=str, help="Process only this volume")
+    sp_stream.add_argument("--workers", type=int, default=None, choices=range(1, 257), metavar="N", help="Concurrent page downloads 1-256; starting limit when adaptive (default: 5 threads, 64 async)")
+    sp_stream.add_argument("--engine", type=str, default="threads", choices=["threads", "async"], help="Page download engine (async requires httpx)")
+    sp_stream.add_argument("--fixed-rate", action="store_true", help="Disable adaptive concurrency; keep --workers fixed")
+    sp_stream.add_argument("--fetch", type=str, default="images", choices=["images", "pdf"], help="Fetch pages one image per request, or one BulkPDF per document")
+    sp_stream.add_argument("--concurrency", type=int, default=20, help="Max concurrent OCR requests")
+    sp_stream.add_argument("--prompt", type=str, default="general", choices=["general", "tabular", "handwritten", "auto"], help="OCR prompt variant, or auto to pick one per page (default: general)")
+    sp_stream.add_argument("--no-cache", action="store_true", help="Ignore the response cache and always call Gemini")
+    sp_stream.set_defaults(func=cmd_stream)
+
     # upload
     sp_upload = subparsers.add_parser("upload", help="Upload to GCS")
     sp_upload.set_defaults(func=cmd_upload)
@@ -183,7 +317,11 @@ def main():
     sp_all = subparsers.add_parser("all", help="Full pipeline")
     sp_all.add_argument("--resume", action="store_true", help="Resume interrupted download")
     sp_all.add_argument("--volume", type=str, help="Process only this volume")
-    sp_all.add_argument("--workers", type=int, default=None, choices=range(1, 21), metavar="N", help="Concurrent download workers 1-20 (default: 5)")
+    sp_all.add_argument("--workers", type=int, default=None, choices=range(1, 257), metavar="N", help="Concurrent page downloads 1-256; starting limit when adaptive (default: 5 threads, 64 async)")
+    sp_all.add_argument("--engine", type=str, default="threads", choices=["threads", "async"], help="Page download engine (async requires httpx)")
+    sp_all.add_argument("--fixed-rate", action="store_true", help="Disable adaptive concurrency; keep --workers fixed")
+    sp_all.add_argument("--fetch", type=str, default="images", choices=["images", "pdf"], help="Fetch pages one image per request, or one BulkPDF per document")
+    sp_all.add_argument("--parallel-volumes", type=int, default=1, metavar="N", help="Scrape N volumes at once, sharing one session and request budget")
     sp_all.set_defaults(func=cmd_all)
 
     args = parser.parse_args()
@@ -3,15 +3,20 @@ CLI entry point for Phase 2 OCR pipeline.
 
 Usage:
     python -m scripts.run_ocr extract [--volume CO273_534]
-    python -m scripts.run_ocr ocr [--volume CO273_534] [--concurrency 20]
+    python -m scripts.run_ocr ocr [--volume CO273_534] [--concurrency 20] [--no-cache]
+    python -m scripts.run_ocr ocr --batch [--batch-backend gemini|local]
     python -m scripts.run_ocr all [--volume CO273_534] [--concurrency 20]
-    python -m scripts.run_ocr evaluate [--volume CO273_534] [--sample 10]
+    python -m scripts.run_ocr evaluate [--volume CO273_534] [--sample 10] [--no-cache]
 """
 import argparse
 import asyncio
+from contextlib import ExitStack
 from pathlib import Path
 
 from src.config import VOLUMES, DOWNLOAD_DIR
+from src.ocr.cache import CACHE_NAME, ResponseCache
+from src.ocr.config import EVAL_WORKERS, OCR_CORRECT_CONCURRENCY
+from src.ocr.batch import run_batch_pipeline
 from src.ocr.extract import extract_volume_pages
 from src.ocr.manifest import save_ocr_manifest, load_ocr_manifest
 from src.ocr.pipeline import run_ocr_pipeline
@@ -58,43 +63,92 @@ def cmd_extract(args):
 
 def cmd_ocr(args):
     """Run Gemini Vision OCR on extracted page images."""
+    if getattr(args, 'batch', False) and getattr(args, 'correct', False):
+        print("--correct is not supported with --batch")
+        raise SystemExit(1)
+
     print("=== Running Gemini Vision OCR ===")
 
-    for volume_id in get_volume_ids(args):
-        volume_dir = DOWNLOAD_DIR / volume_id
+    with ExitStack() as cache_stack:
+        cache = None
+        if not getattr(args, 'no_cache', False):
+            cache = cache_stack.enter_context(ResponseCache(DOWNLOAD_DIR / CACHE_NAME))
+        for volume_id in get_volume_ids(args):
+            _ocr_volume(args, volume_id, cache)
+        if cache is not None:
+            print(f"\nResponse cache: {cache.hits} hits, {cache.misses} misses")
+
+    print("\n=== OCR complete ===")
+
+
+def _ocr_volume(args, volume_id: str, cache: ResponseCache | None) -> None:
+    """OCR one volume, downloading its images from GCS unless --local."""
+    volume_dir = DOWNLOAD_DIR / volume_id
 
+    with ExitStack() as stack:
+        download = None
         if not getattr(args, 'local', False):
-            print(f"[{volume_id}] Downloading images from GCS...")
-            from src.ocr.pipeline import download_images_from_gcs
-            count = download_images_from_gcs(volume_id, volume_dir / "images")
-            print(f"[{volume_id}] Downloaded {count} images from GCS")
+            # Images download in the background; OCR starts on the first pages
+            from src.gcs_download import VolumeDownload
+            download = stack.enter_context(VolumeDownload(volume_id, volume_dir))
+            print(f"[{volume_id}] Downloading {len(download.futures)} files from GCS alongside OCR...")
 
-        if not (volume_dir / "images").exists():
+        if not (download.pages if download else (volume_dir / "images").exists()):
             print(f"Skipping {volume_id}: no images/ directory (run extract first)")
-            continue
+            return
+
+        if getattr(args, 'batch', False):
+            if download:
+                # Batch jobs are built from the full set of images
+                count = download.wait()
+                print(f"[{volume_id}] Downloaded {count} images from GCS")
+                download = None
+            print(f"\n[{volume_id}] Starting batch OCR...")
+            asyncio.run(run_batch_pipeline(
+                volume_dir=volume_dir,
+                volume_id=volume_id,
+                backend=_batch_backend(args),
+                prompt_key=getattr(args, 'prompt', 'general'),
+                cache=cache,
+            ))
+        else:
+            print(f"\n[{volume_id}] Starting OCR...")
+            asyncio.run(run_ocr_pipeline(
+                volume_dir=volume_dir,
+                volume_id=volume_id,
+                concurrency=args.concurrency,
+                correct=getattr(args, 'correct', False),
+                correct_concurrency=getattr(args, 'correct_concurrency', OCR_CORRECT_CONCURRENCY),
+                prefilter=not getattr(args, 'correct_all', False),
+                prompt_key=getattr(args, 'prompt', 'general'),
+                download=download,
+                cache=cache,
+            ))
+
+        if download:
+            count = download.wait()
+            print(f"[{volume_id}] Downloaded {count} images from GCS")
 
-        print(f"\n[{volume_id}] Starting OCR...")
-        asyncio.run(run_ocr_pipeline(
-            volume_dir=volume_dir,
-            volume_id=volume_id,
-            concurrency=args.concurrency,
-            correct=getattr(args, 'correct', False),
-            prompt_key=getattr(args, 'prompt', 'general'),
-        ))
+    if not getattr(args, 'local', False):
+        print(f"[{volume_id}] Uploading OCR results to GCS...")
+        from src.ocr.pipeline import upload_ocr_to_gcs
+        count = upload_ocr_to_gcs(volume_id, volume_dir / "ocr")
+        print(f"[{volume_id}] Uploaded {count} OCR files to GCS")
 
-        if not getattr(args, 'local', False):
-            print(f"[{volume_id}] Uploading OCR results to GCS...")
-            from src.ocr.pipeline import upload_ocr_to_gcs
-            count = upload_ocr_to_gcs(volume_id, volume_dir / "ocr")
-            print(f"[{volume_id}] Uploaded {count} OCR files to GCS")
 
-    print("\n=== OCR complete ===")
+def _batch_backend(args):
+    """Batch backend for --batch: the Gemini Batch API or the local stand-in."""
+    from src.ocr.batch import GeminiBatchBackend, LocalBatchBackend
+    if getattr(args, 'batch_backend', 'gemini') == 'local':
+        from src.ocr.pipeline import get_gemini_model
+        return LocalBatchBackend(get_gemini_model())
+    return GeminiBatchBackend()
 
 
 def cmd_evaluate(args):
     """Evaluate Gemini OCR quality against Gale baseline."""
     import json as json_mod
-    from src.ocr.evaluate import evaluate_volume
+    from src.ocr.evaluate import EVAL_CACHE_NAME, MetricsCache, evaluate_volume
 
     print("=== Evaluating OCR Quality (Gemini vs Gale) ===")
 
@@ -102,11 +156,17 @@ def cmd_evaluate(args):
         volume_dir = DOWNLOAD_DIR / volume_id
         print(f"\n[{volume_id}] Evaluating...")
 
-        result = evaluate_volume(
-            volume_id=volume_id,
-            volume_dir=volume_dir,
-            sample=args.sample,
-        )
+        with ExitStack() as cache_stack:
+            cache = None
+            if not getattr(args, 'no_cache', False) and volume_dir.exists():
+                cache = cache_stack.enter_context(MetricsCache(volume_dir / EVAL_CACHE_NAME))
+            result = evaluate_volume(
+                volume_id=volume_id,
+                volume_dir=volume_dir,
+                sample=args.sample,
+                workers=args.workers,
+                cache=cache,
+            )
 
         if "error" in result:
             print(f"[{volume_id}] Error: {result['error']}")
@@ -115,6 +175,8 @@ def cmd_evaluate(args):
         print(f"\n[{volume_id}] Overall: WER={result['overall_wer']}, "
               f"CER={result['overall_cer']} "
               f"({result['total_documents']} documents)")
+        print(f"[{volume_id}] Weighted by reference length: WER={result['weighted_wer']}, "
+              f"CER={result['weighted_cer']} ({result['pages_compared']} pages)")
 
         # Save report
         report_path = volume_dir / "eval_report.json"
@@ -146,10 +208,19 @@ def main():
     sp_ocr.add_argument("--volume", type=str, help="Process only this volume")
     sp_ocr.add_argument("--concurrency", type=int, default=20, help="Max concurrent requests")
     sp_ocr.add_argument("--local", action="store_true", help="Use local files instead of GCS")
-    sp_ocr.add_argument("--correct", action="store_true", help="Run post-correction pass after OCR")
+    sp_ocr.add_argument("--correct", action="store_true", help="Post-correct each page as its OCR completes")
+    sp_ocr.add_argument("--correct-concurrency", type=int, default=OCR_CORRECT_CONCURRENCY,
+                        help="Max concurrent correction requests")
+    sp_ocr.add_argument("--correct-all", action="store_true",
+                        help="Correct every page, not just those the local pre-filter flags as noisy")
+    sp_ocr.add_argument("--no-cache", action="store_true", help="Ignore the response cache and always call Gemini")
+    sp_ocr.add_argument("--batch", action="store_true",
+                        help="Submit pending pages as Gemini batch jobs and wait for them")
+    sp_ocr.add_argument("--batch-backend", type=str, default="gemini", choices=["gemini", "local"],
+                        help="Batch backend; 'local' runs jobs through the interactive API")
     sp_ocr.add_argument("--prompt", type=str, default="general",
-                        choices=["general", "tabular", "handwritten"],
-                        help="OCR prompt variant (default: general)")
+                        choices=["general", "tabular", "handwritten", "auto"],
+                        help="OCR prompt variant, or auto to pick one per page (default: general)")
     sp_ocr.set_defaults(func=cmd_ocr)
 
     # all
@@ -157,16 +228,29 @@ def main():
     sp_all.add_argument("--volume", type=str, help="Process only this volume")
     sp_all.add_argument("--concurrency", type=int, default=20, help="Max concurrent requests")
     sp_all.add_argument("--local", action="store_true", help="Use local files instead of GCS")
-    sp_all.add_argument("--correct", action="store_true", help="Run post-correction pass after OCR")
+    sp_all.add_argument("--correct", action="store_true", help="Post-correct each page as its OCR completes")
+    sp_all.add_argument("--correct-concurrency", type=int, default=OCR_CORRECT_CONCURRENCY,
+                        help="Max concurrent correction requests")
+    sp_all.add_argument("--correct-all", action="store_true",
+                        help="Correct every page, not just those the local pre-filter flags as noisy")
+    sp_all.add_argument("--no-cache", action="store_true", help="Ignore the response cache and always call Gemini")
+    sp_all.add_argument("--batch", action="store_true",
+                        help="Submit pending pages as Gemini batch jobs and wait for them")
+    sp_all.add_argument("--batch-backend", type=str, default="gemini", choices=["gemini", "local"],
+                        help="Batch backend; 'local' runs jobs through the interactive API")
     sp_all.add_argument("--prompt", type=str, default="general",
-                        choices=["general", "tabular", "handwritten"],
-                        help="OCR prompt variant (default: general)")
+                        choices=["general", "tabular", "handwritten", "auto"],
+                        help="OCR prompt variant, or auto to pick one per page (default: general)")
     sp_all.set_defaults(func=cmd_all)
 
     # evaluate
     sp_eval = subparsers.add_parser("evaluate", help="Compare Gemini vs Gale OCR quality")
     sp_eval.add_argument("--volume", type=str, help="Process only this volume")
     sp_eval.add_argument("--sample", type=int, default=None, help="Evaluate only N documents")
+    sp_eval.add_argument("--workers", type=int, default=EVAL_WORKERS,
+                         help="Evaluation processes (0 = one per CPU, 1 = serial)")
+    sp_eval.add_argument("--no-cache", action="store_true",
+                         help="Recompute every page instead of reusing cached metrics")
     sp_eval.set_defaults(func=cmd_evaluate)
 
     args = parser.parse_args()
@@ -0,0 +1,172 @@
+# src/async_download.py
+"""
+Async page image download engine built on httpx.
+
+Alternative to the requests + ThreadPoolExecutor path in src.scraper:
+a single event loop on a background thread drives every page fetch through
+one pooled httpx.AsyncClient, reusing keep-alive (HTTP/2 when the h2 package
+is installed) connections to the luna-gale-com image host. Concurrency is a
+semaphore on in-flight requests, so hundreds of fetches cost no extra threads.
+An optional AdaptiveLimiter narrows that further, exactly as for the threaded
+engine; file I/O is buffered and run off the loop with asyncio.to_thread.
+
+httpx is an optional dependency (pip install -e ".[async]"), imported lazily
+so the default threaded engine works without it.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+import requests
+
+from src.config import (
+    ASYNC_MAX_IN_FLIGHT,
+    ASYNC_WRITE_BUFFER,
+    DOWNLOAD_CHUNK_SIZE,
+    IMAGE_DOWNLOAD_URL,
+    MAX_RETRIES,
+    REQUEST_TIMEOUT,
+)
+from src.rate_control import AdaptiveLimiter, request_slot_async, retry_delay
+from src.scraper import (
+    IMAGE_PARAMS,
+    PartialPage,
+    expected_content_length,
+    is_complete_page,
+)
+
+
+def _http2_available() -> bool:
+    """Return True if the h2 package needed for httpx HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class AsyncPageDownloader:
+    """Download page images on a private event loop, exposed as Futures.
+
+    Use as a context manager. submit() may be called from any thread and
+    returns a concurrent.futures.Future resolving to True on success or skip,
+    the same contract as src.scraper._download_single_page().
+
+    Cookies and headers are copied from the authenticated requests.Session.
+    `limiter` adapts concurrency below max_in_flight and sees every response.
+    `transport` is passed through to httpx (e.g. httpx.MockTransport in tests).
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        max_in_flight: int | None = None,
+        transport=None,
+        limiter: AdaptiveLimiter | None = None,
+    ):
+        self.session = session
+        self.max_in_flight = max_in_flight or ASYNC_MAX_IN_FLIGHT
+        self.limiter = limiter
+        self.transport = transport
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def __enter__(self) -> "AsyncPageDownloader":
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="async-page-download", daemon=True,
+        )
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._open(), self._loop).result()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        try:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    async def _open(self) -> None:
+        """Create the shared client and semaphore inside the event loop."""
+        import httpx
+
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        self._client = httpx.AsyncClient(
+            http2=_http2_available() and self.transport is None,
+            limits=httpx.Limits(
+                max_connections=self.max_in_flight,
+                max_keepalive_connections=self.max_in_flight,
+            ),
+            cookies=self.session.cookies.copy(),
+            headers=dict(self.session.headers),
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True,
+            transport=self.transport,
+        )
+
+    def submit(self, page_info: dict, output_dir: Path) -> Future:
+        """Schedule one page download; thread-safe."""
+        return asyncio.run_coroutine_threadsafe(
+            self.download_page(page_info, output_dir), self._loop,
+        )
+
+    async def download_page(self, page_info: dict, output_dir: Path) -> bool:
+        """Download a single page image. Returns True on success or skip.
+
+        Streams into a PartialPage in ASYNC_WRITE_BUFFER-sized writes, all
+        file I/O (open, write, fsync + rename) off the loop. Failures are
+        retried after Retry-After or exponential backoff, as in the threaded
+        engine.
+        """
+        page_num = int(page_info["pageNumber"])
+        filepath = output_dir / f"page_{page_num:04d}.jpg"
+
+        # Skip if already downloaded
+        if is_complete_page(filepath):
+            return True
+
+        url = f"{IMAGE_DOWNLOAD_URL}/{page_info['recordId']}"
+
+        for attempt in range(1, MAX_RETRIES + 1):
+            async with self._semaphore, request_slot_async(self.limiter) as outcome:
+                try:
+                    async with self._client.stream("GET", url, params=IMAGE_PARAMS) as response:
+                        outcome.observe(response)
+                        response.raise_for_status()
+                        await self._save(response, filepath)
+                    outcome.ok = True
+                    return True
+
+                except Exception as e:
+                    outcome.fail(e)
+                    if attempt == MAX_RETRIES:
+                        print(f"    Failed page {page_num}: {e}")
+                        return False
+
+            await asyncio.sleep(retry_delay(attempt, outcome.retry_after))
+
+        return False
+
+    async def _save(self, response, filepath: Path) -> None:
+        """Stream a response body into filepath through a PartialPage."""
+        part = await asyncio.to_thread(PartialPage, filepath)
+        try:
+            buffer: list[bytes] = []
+            buffered = 0
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                buffer.append(chunk)
+                buffered += len(chunk)
+                if buffered >= ASYNC_WRITE_BUFFER:
+                    await asyncio.to_thread(part.write, b"".join(buffer))
+                    buffer, buffered = [], 0
+            if buffer:
+                await asyncio.to_thread(part.write, b"".join(buffer))
+            await asyncio.to_thread(part.commit, expected_content_length(response.headers))
+        except BaseException:
+            await asyncio.to_thread(part.discard)
+            raise
@@ -0,0 +1,146 @@
+# src/bulk_pdf.py
+"""
+Bulk PDF fetch mode: one HTTP request per document instead of one per page.
+
+The dviViewer JSON carries originalDocument.formatPdfRecordIdsForDviDownload,
+a pipe-delimited list of the document's record IDs ready for Gale's BulkPDF
+form. fetch_document_pdf() posts it once, streams the multi-page PDF to
+{volume}/bulk_pdf/{safe_doc_id}/{safe_doc_id}.pdf and splits it into the
+usual images/{safe_doc_id}/page_NNNN.jpg files with
+src.ocr.extract.extract_volume_pages().
+
+Gale may answer with a short disclaimer PDF instead (as the old pdfGenerator
+endpoint always did), so a PDF whose page count doesn't match the document's
+imageList is rejected and the document falls back to per-page image requests.
+"""
+import os
+import time
+from pathlib import Path
+
+import requests
+from pypdf import PdfReader
+
+from src.config import (
+    BULK_PDF_URL,
+    DOWNLOAD_CHUNK_SIZE,
+    MAX_RETRIES,
+    PDF_DOWNLOAD_TIMEOUT,
+)
+from src.ocr.extract import extract_volume_pages
+from src.rate_control import AdaptiveLimiter, request_slot, retry_delay
+from src.scraper import PageSubmitter, _submit_document_pages, sanitize_doc_id
+
+BULK_PDF_DIR = "bulk_pdf"
+MIN_PDF_BYTES = 5000  # Gale's disclaimer PDFs are ~2.5 KB
+
+
+def bulk_pdf_record_ids(doc_data: dict) -> str:
+    """The pipe-delimited record IDs for a document's BulkPDF request, or ""."""
+    record_ids = doc_data.get("originalDocument", {}).get("formatPdfRecordIdsForDviDownload", "")
+    if isinstance(record_ids, list):
+        record_ids = "|".join(record_ids)
+    return record_ids or ""
+
+
+def _pdf_page_count(path: Path) -> int:
+    """Number of pages in a PDF file. Raises ValueError if it isn't one."""
+    with open(path, "rb") as f:
+        if f.read(5) != b"%PDF-":
+            raise ValueError("response is not a PDF")
+    return len(PdfReader(str(path)).pages)
+
+
+def download_bulk_pdf(
+    session: requests.Session,
+    doc_data: dict,
+    pdf_path: Path,
+    limiter: AdaptiveLimiter | None = None,
+) -> bool:
+    """Download a document's pages as one PDF. Returns True if pdf_path is valid.
+
+    The body is streamed to a .part file and renamed into place only if it
+    is a PDF with one page per imageList entry. Retries up to MAX_RETRIES on
+    errors and non-PDF bodies; a PDF of the wrong size (a disclaimer) is not
+    retried.
+    """
+    expected_pages = len(doc_data.get("imageList", []))
+    record_ids = bulk_pdf_record_ids(doc_data)
+    if not record_ids or not expected_pages:
+        return False
+
+    pdf_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = pdf_path.with_name(pdf_path.name + ".part")
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        with request_slot(limiter) as outcome:
+            try:
+                response = session.post(
+                    BULK_PDF_URL,
+                    data={"recordIds": record_ids},
+                    headers={"Accept": "application/pdf"},
+                    timeout=PDF_DOWNLOAD_TIMEOUT,
+                    stream=True,
+                )
+                try:
+                    outcome.observe(response)
+                    response.raise_for_status()
+                    with open(tmp_path, "wb") as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                finally:
+                    response.close()
+
+                pages = _pdf_page_count(tmp_path)
+                outcome.ok = True
+
+            except Exception as e:
+                outcome.fail(e)
+                tmp_path.unlink(missing_ok=True)
+                if attempt == MAX_RETRIES:
+                    print(f"    Bulk PDF failed: {e}")
+                    return False
+
+            else:
+                size = tmp_path.stat().st_size
+                if pages == expected_pages and size >= MIN_PDF_BYTES:
+                    os.replace(tmp_path, pdf_path)
+                    return True
+                tmp_path.unlink(missing_ok=True)
+                print(f"    Bulk PDF rejected: {pages} pages ({size} bytes), "
+                      f"expected {expected_pages} pages")
+                return False
+
+        time.sleep(retry_delay(attempt, outcome.retry_after))
+
+    return False
+
+
+def fetch_document_pdf(
+    session: requests.Session,
+    doc_data: dict,
+    doc_id: str,
+    volume_dir: Path,
+    submit_page: PageSubmitter,
+    limiter: AdaptiveLimiter | None = None,
+) -> int:
+    """Fetch one document via BulkPDF and split it into page images.
+
+    Falls back to per-page image downloads on submit_page if the BulkPDF
+    request fails or returns the wrong document. Returns pages written.
+    """
+    safe_id = sanitize_doc_id(doc_id)
+    pdf_dir = volume_dir / BULK_PDF_DIR / safe_id
+    pdf_path = pdf_dir / f"{safe_id}.pdf"
+    images_dir = volume_dir / "images" / safe_id
+
+    try:
+        valid = pdf_path.exists() and _pdf_page_count(pdf_path) == len(doc_data.get("imageList", []))
+    except Exception:
+        valid = False
+
+    if valid or download_bulk_pdf(session, doc_data, pdf_path, limiter):
+        return extract_volume_pages(pdf_dir, images_dir, ingest=False)["total_pages"]
+
+    print(f"    {doc_id}: falling back to per-page image downloads")
+    futures = _submit_document_pages(submit_page, doc_data, images_dir)
+    return sum(1 for f in futures if f.result())
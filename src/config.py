@@ -19,6 +19,7 @@ GALE_BASE_URL = os.getenv(
 PDF_DOWNLOAD_URL = f"{GALE_BASE_URL}/ps/pdfGenerator/html"
 TEXT_DOWNLOAD_URL = f"{GALE_BASE_URL}/ps/htmlGenerator/forText"
 DVI_DOCUMENT_URL = f"{GALE_BASE_URL}/ps/dviViewer/getDviDocument"
+BULK_PDF_URL = f"{GALE_BASE_URL}/ps/callisto/BulkPDF/UBER2"
 
 # Gale image server (different subdomain)
 IMAGE_BASE_URL = "https://luna-gale-com.libproxy1.nus.edu.sg"
@@ -52,14 +53,31 @@ def load_volumes() -> dict:
 VOLUMES = load_volumes()
 
 # Scraper settings
-DOWNLOAD_DELAY = 0.5   # seconds between documents (was 1.5)
-MAX_WORKERS = 5         # concurrent page image downloads per document
+DOWNLOAD_DELAY = 0.5   # seconds between dviViewer metadata requests (was 1.5)
+MAX_WORKERS = 5         # concurrent page image downloads, shared across a volume
+PREFETCH_DOCS = 2       # documents whose metadata is fetched ahead of page downloads
+ASYNC_MAX_IN_FLIGHT = 64  # concurrent page fetches for the async (httpx) engine
 MAX_RETRIES = 3
 REQUEST_TIMEOUT = 30  # seconds
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes per streamed read of a page image
+ASYNC_WRITE_BUFFER = 1024 * 1024  # bytes the async engine buffers per off-loop file write
+MANIFEST_BATCH_SIZE = 50  # manifest writes per SQLite commit
+PROGRESS_INTERVAL = 10  # seconds between aggregated --parallel-volumes progress lines
 PDF_DOWNLOAD_TIMEOUT = 120  # seconds; multi-page PDFs take longer
+PDF_RENDER_IN_FLIGHT = 4  # pages queued per `build --processes` process; bounds memory
 SEARCH_RESULTS_PER_PAGE = 25  # Gale's default pagination size
 
+# Adaptive (AIMD) rate control — MAX_WORKERS / --workers is the starting limit
+ADAPTIVE_MIN_WORKERS = 1
+ADAPTIVE_MAX_WORKERS = 20       # ceiling the concurrency limit may grow to
+ADAPTIVE_LATENCY_FACTOR = 2.0   # back off when p95 latency exceeds this x the best p95
+ADAPTIVE_LATENCY_WINDOW = 50    # requests per p95 latency sample
+ADAPTIVE_COOLDOWN = 2.0         # seconds between multiplicative decreases
+RETRY_AFTER_MAX = 300.0         # longest Retry-After (seconds) we will honour
+
 # GCS settings
 GCS_BUCKET = os.getenv("GCS_BUCKET", "aihistory-co273")
 GCS_KEY_PATH = os.getenv("GCS_KEY_PATH", "")
 GCS_REGION = os.getenv("GCS_REGION", "asia-southeast1")
+GCS_UPLOAD_WORKERS = 16  # concurrent blob uploads per volume
+GCS_DOWNLOAD_WORKERS = 16  # concurrent blob downloads per volume (OCR stage)
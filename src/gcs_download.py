@@ -0,0 +1,140 @@
+# src/gcs_download.py
+"""
+Download a volume's page images from Google Cloud Storage for the OCR stage.
+
+Objects keep their layout: {volume_id}/images/{doc_id}/page_NNNN.jpg lands at
+{volume_dir}/images/{doc_id}/page_NNNN.jpg. Volumes uploaded with a PageStore
+index fetch page_index.json plus the unique blobs/ instead, and images/ is
+rebuilt as links once every blob is in.
+
+Downloads run in a bounded thread pool in doc-then-page order. Each local
+file gets a Future, so the OCR pipeline can start on the first pages while
+the rest are still downloading. Files whose size and MD5 already match the
+blob are not downloaded again.
+"""
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from src.config import GCS_DOWNLOAD_WORKERS
+from src.gcs_upload import file_checksums, get_bucket
+from src.page_store import BLOBS_DIR, INDEX_NAME, PageStore
+
+
+def _is_current(blob, local_path: Path) -> bool:
+    """True if local_path already holds the blob's bytes (size, then MD5)."""
+    try:
+        if local_path.stat().st_size != blob.size:
+            return False
+    except OSError:
+        return False
+    return not blob.md5_hash or file_checksums(local_path)[0] == blob.md5_hash
+
+
+def download_blob(blob, local_path: Path) -> bool:
+    """Download one blob unless local_path matches it. Returns True if downloaded.
+
+    The body is written to a .part file and renamed into place, so readers
+    never see a partial image.
+    """
+    if _is_current(blob, local_path):
+        return False
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = local_path.with_name(local_path.name + ".part")
+    blob.download_to_filename(str(tmp))
+    os.replace(tmp, local_path)
+    return True
+
+
+class VolumeDownload:
+    """Concurrent, layout-preserving download of one volume's page images.
+
+    Use as a context manager: entering lists the bucket and submits every
+    download; leaving waits for them (cancelling the rest on error).
+
+    Attributes:
+        pages: images/ page paths the volume will have, in doc-then-page order
+        futures: local file path (page image or PageStore blob) -> Future
+            resolving to True if downloaded, False if it was already current
+    """
+
+    def __init__(
+        self,
+        volume_id: str,
+        volume_dir: Path,
+        bucket=None,
+        max_workers: int = GCS_DOWNLOAD_WORKERS,
+    ):
+        self.volume_id = volume_id
+        self.volume_dir = volume_dir
+        self.bucket = bucket if bucket is not None else get_bucket()
+        self.max_workers = max_workers
+        self.pages: list[Path] = []
+        self.futures: dict[Path, Future] = {}
+        self.indexed = False
+        self._executor: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> "VolumeDownload":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+    def _local_path(self, blob_name: str) -> Path:
+        return self.volume_dir / blob_name[len(self.volume_id) + 1:]
+
+    def start(self) -> "VolumeDownload":
+        """List the volume's objects and submit their downloads."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        index_blob = self.bucket.blob(f"{self.volume_id}/{INDEX_NAME}")
+
+        if index_blob.exists():
+            self.indexed = True
+            self.volume_dir.mkdir(parents=True, exist_ok=True)
+            index_blob.download_to_filename(str(self.volume_dir / INDEX_NAME))
+            store = PageStore(self.volume_dir)
+            blobs = {
+                blob.name: blob
+                for blob in self.bucket.list_blobs(prefix=f"{self.volume_id}/{BLOBS_DIR}/")
+                if not blob.name.endswith("/")
+            }
+            # Submit blobs in the order their first page appears
+            for doc_id in sorted(store.index):
+                for page_num in sorted(store.index[doc_id], key=int):
+                    sha = store.index[doc_id][page_num]
+                    self.pages.append(store.page_path(doc_id, int(page_num)))
+                    local_path = store.blob_path(sha)
+                    blob = blobs.get(f"{self.volume_id}/{local_path.relative_to(self.volume_dir).as_posix()}")
+                    if blob is not None and local_path not in self.futures:
+                        self.futures[local_path] = self._executor.submit(download_blob, blob, local_path)
+            return self
+
+        for blob in sorted(
+            self.bucket.list_blobs(prefix=f"{self.volume_id}/images/"),
+            key=lambda b: b.name,
+        ):
+            if blob.name.endswith("/"):
+                continue
+            local_path = self._local_path(blob.name)
+            if local_path.name.startswith("page_") and local_path.suffix == ".jpg":
+                self.pages.append(local_path)
+            self.futures[local_path] = self._executor.submit(download_blob, blob, local_path)
+        return self
+
+    def wait(self) -> int:
+        """Block until every download finishes; rebuild images/ links if indexed.
+
+        Returns the number of files downloaded. Failed downloads are
+        reported, not raised.
+        """
+        count = 0
+        for local_path, future in self.futures.items():
+            try:
+                count += future.result()
+            except Exception as e:
+                print(f"  [{self.volume_id}] download FAILED {local_path.name}: {e}")
+        if self.indexed:
+            PageStore(self.volume_dir).materialize()
+        return count
@@ -1,10 +1,33 @@
 # src/gcs_upload.py
 """
 Upload downloaded volumes to Google Cloud Storage.
+
+Uploads are incremental: one list_blobs call per volume prefix fetches the
+remote MD5/CRC32C of every object, and only files whose checksums differ
+are uploaded, across a thread pool. Local checksums are cached in
+{volume}/gcs_upload.json by size and mtime, so unchanged files are not
+re-hashed either.
 """
+import base64
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+
+import google_crc32c
 from google.cloud import storage
-from src.config import GCS_BUCKET, GCS_KEY_PATH
+
+from src.bulk_pdf import BULK_PDF_DIR
+from src.config import DOWNLOAD_CHUNK_SIZE, GCS_BUCKET, GCS_KEY_PATH, GCS_UPLOAD_WORKERS
+from src.manifest_db import write_json_atomic
+from src.page_store import PageStore
+from src.pdf_builder import FRAGMENTS_DIR
+
+UPLOAD_MANIFEST = "gcs_upload.json"
+
+# .part files are page downloads that never completed; SQLite manifests are
+# live local state, uploaded as their exported manifest JSON instead
+LOCAL_ONLY_SUFFIXES = {".part", ".sqlite", ".sqlite-wal", ".sqlite-shm"}
 
 
 def get_gcs_client() -> storage.Client:
@@ -27,32 +50,117 @@ def upload_file(bucket, local_path: Path, gcs_path: str) -> None:
     blob.upload_from_filename(str(local_path))
 
 
-def upload_volume(bucket, volume_dir: Path, volume_id: str) -> int:
+def file_checksums(path: Path) -> tuple[str, str]:
+    """(md5, crc32c) of a file, base64-encoded as in GCS blob metadata."""
+    md5 = hashlib.md5()
+    crc = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+            md5.update(chunk)
+            crc.update(chunk)
+    return (
+        base64.b64encode(md5.digest()).decode(),
+        base64.b64encode(crc.digest()).decode(),
+    )
+
+
+def _load_upload_manifest(volume_dir: Path) -> dict:
+    path = volume_dir / UPLOAD_MANIFEST
+    if path.exists():
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def _volume_files(volume_dir: Path) -> list[Path]:
+    """Files of a volume that belong in the bucket, in sorted order."""
+    store = PageStore(volume_dir)
+    files = []
+    for file_path in sorted(volume_dir.rglob("*")):
+        if not file_path.is_file() or file_path.suffix in LOCAL_ONLY_SUFFIXES:
+            continue
+        if file_path.parent == volume_dir and file_path.name == UPLOAD_MANIFEST:
+            continue
+        if store.is_indexed_page(file_path):
+            continue
+        parts = file_path.relative_to(volume_dir).parts
+        if FRAGMENTS_DIR in parts:
+            continue  # build cache; the assembled volume PDF is uploaded instead
+        if parts[0] == BULK_PDF_DIR:
+            continue  # raw BulkPDF downloads; the pages split from them are uploaded instead
+        files.append(file_path)
+    return files
+
+
+def upload_volume(
+    bucket,
+    volume_dir: Path,
+    volume_id: str,
+    max_workers: int = GCS_UPLOAD_WORKERS,
+) -> int:
     """
-    Upload all files in a volume directory to GCS.
+    Upload new or changed files in a volume directory to GCS.
 
     Uploads:
     - pages/*.jpg → {volume_id}/pages/
     - manifest.json → {volume_id}/
     - *_full.pdf → {volume_id}/
 
+    Page images indexed in the volume's PageStore are uploaded once as
+    blobs/ plus page_index.json; their images/ links are skipped.
+
+    Files whose MD5 (or CRC32C, for composite objects without one) matches
+    the existing blob are skipped. Failed uploads are reported and retried
+    on the next run.
+
     Returns count of files uploaded.
     """
-    count = 0
-
-    for file_path in sorted(volume_dir.rglob("*")):
-        if not file_path.is_file():
+    cache = _load_upload_manifest(volume_dir)
+    remote = {
+        blob.name: (blob.md5_hash, blob.crc32c)
+        for blob in bucket.list_blobs(prefix=f"{volume_id}/")
+    }
+
+    checksums = {}
+    pending = []
+    for file_path in _volume_files(volume_dir):
+        relative = file_path.relative_to(volume_dir).as_posix()
+        gcs_path = f"{volume_id}/{relative}"
+        stat = file_path.stat()
+        entry = cache.get(relative)
+        if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            md5, crc32c = file_checksums(file_path)
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "md5": md5, "crc32c": crc32c}
+        checksums[relative] = entry
+
+        remote_md5, remote_crc32c = remote.get(gcs_path, (None, None))
+        if remote_md5 == entry["md5"] or (not remote_md5 and remote_crc32c == entry["crc32c"]):
             continue
+        pending.append((file_path, gcs_path))
 
-        # Build GCS path preserving directory structure
-        relative = file_path.relative_to(volume_dir)
-        gcs_path = f"{volume_id}/{relative.as_posix()}"
-
-        print(f"  Uploading {gcs_path}...")
-        upload_file(bucket, file_path, gcs_path)
-        count += 1
-
-    print(f"  [{volume_id}] Uploaded {count} files")
+    skipped = len(checksums) - len(pending)
+    count = 0
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(upload_file, bucket, file_path, gcs_path): gcs_path
+                for file_path, gcs_path in pending
+            }
+            for future, gcs_path in futures.items():
+                try:
+                    future.result()
+                    print(f"  Uploaded {gcs_path}")
+                    count += 1
+                except Exception as e:
+                    print(f"  FAILED {gcs_path}: {e}")
+    finally:
+        write_json_atomic(volume_dir / UPLOAD_MANIFEST, checksums)
+
+    print(f"  [{volume_id}] Uploaded {count} files, {skipped} unchanged"
+          + (f", {len(pending) - count} failed" if count < len(pending) else ""))
     return count
 
 
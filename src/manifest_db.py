@@ -0,0 +1,189 @@
+# src/manifest_db.py
+"""
+SQLite-backed progress manifests.
+
+Rewriting a whole manifest JSON after every document or page costs O(n) per
+update and O(n^2) per volume. ManifestDB instead keeps progress in a WAL-mode
+SQLite file next to the JSON one (manifest.json -> manifest.sqlite):
+
+- each document/page result is one upsert into an indexed (kind, key) table
+- writes are committed in batches of batch_size, plus on flush()/close()
+- membership checks hit an in-memory status map, so they are O(1)
+
+The JSON manifests are still exported for compatibility; load_manifest() and
+load_ocr_manifest() prefer the database when it exists.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.config import MANIFEST_BATCH_SIZE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL,
+    UNIQUE (kind, key)
+);
+"""
+
+UPSERT_ITEM = (
+    "INSERT INTO items (kind, key, status, error, updated_at) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(kind, key) DO UPDATE SET status = excluded.status, "
+    "error = excluded.error, updated_at = excluded.updated_at"
+)
+
+
+def db_path_for(json_path: Path) -> Path:
+    """SQLite file kept alongside a JSON manifest (manifest.json -> manifest.sqlite)."""
+    return json_path.with_suffix(".sqlite")
+
+
+class ManifestDB:
+    """Transactional key/status store with JSON-valued metadata.
+
+    Items are (kind, key) -> status ("done"/"failed") plus an error string,
+    listed in first-seen order. Safe to share across threads.
+    """
+
+    def __init__(self, path: Path, batch_size: int = MANIFEST_BATCH_SIZE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._status: dict[tuple[str, str], str] = {
+            (kind, key): status
+            for kind, key, status in self._conn.execute("SELECT kind, key, status FROM items")
+        }
+        self._counts = Counter((kind, status) for (kind, _), status in self._status.items())
+
+    def __enter__(self) -> "ManifestDB":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- metadata --------------------------------------------------------------
+
+    def meta(self) -> dict:
+        """All metadata as a dict."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM meta").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def get_meta(self, key: str, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_meta(self, key: str, value) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, json.dumps(value)),
+            )
+            self._written()
+
+    # -- items -----------------------------------------------------------------
+
+    def mark(self, kind: str, key: str, status: str, error: str = "") -> None:
+        """Record an item's status; committed once batch_size writes accumulate."""
+        key = str(key)
+        with self._lock:
+            self._conn.execute(
+                UPSERT_ITEM,
+                (kind, key, status, error, datetime.now(timezone.utc).isoformat()),
+            )
+            self._set_status(kind, key, status)
+            self._written()
+
+    def mark_many(self, kind: str, rows: list[tuple[str, str, str]]) -> None:
+        """Record (key, status, error) rows and commit them as one transaction."""
+        with self._lock:
+            now = datetime.now(timezone.utc).isoformat()
+            self._conn.executemany(
+                UPSERT_ITEM,
+                [(kind, str(key), status, error, now) for key, status, error in rows],
+            )
+            for key, status, _ in rows:
+                self._set_status(kind, str(key), status)
+            self._conn.commit()
+            self._pending = 0
+
+    def status(self, kind: str, key) -> str | None:
+        """Current status of an item, or None. O(1), no database round-trip."""
+        return self._status.get((kind, str(key)))
+
+    def count(self, kind: str, status: str) -> int:
+        """Number of items of a kind with the given status. O(1)."""
+        return self._counts[(kind, status)]
+
+    def items(self, kind: str, status: str) -> list[tuple[str, str]]:
+        """(key, error) pairs with the given status, in first-seen order."""
+        with self._lock:
+            return list(self._conn.execute(
+                "SELECT key, error FROM items WHERE kind = ? AND status = ? ORDER BY seq",
+                (kind, status),
+            ))
+
+    def clear(self, kind: str) -> None:
+        """Delete every item of one kind."""
+        with self._lock:
+            self._conn.execute("DELETE FROM items WHERE kind = ?", (kind,))
+            self._status = {k: s for k, s in self._status.items() if k[0] != kind}
+            self._counts = Counter({k: n for k, n in self._counts.items() if k[0] != kind})
+            self._written()
+
+    # -- transactions ----------------------------------------------------------
+
+    def _set_status(self, kind: str, key: str, status: str) -> None:
+        # Caller holds the lock
+        previous = self._status.get((kind, key))
+        if previous is not None:
+            self._counts[(kind, previous)] -= 1
+        self._counts[(kind, status)] += 1
+        self._status[(kind, key)] = status
+
+    def _written(self) -> None:
+        # Caller holds the lock
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._conn.commit()
+            self._pending = 0
+
+    def flush(self) -> None:
+        """Commit any batched writes."""
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+def write_json_atomic(path: Path, data) -> None:
+    """Write JSON to a temp file and rename it over path."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
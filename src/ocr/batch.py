@@ -0,0 +1,349 @@
+# src/ocr/batch.py
+"""Bulk OCR through Gemini batch prediction jobs.
+
+Batch jobs trade latency (minutes to hours) for a lower per-request price
+and no RPM/TPM pacing. run_batch_pipeline packs the pages that
+_discover_pages finds still pending into jobs of at most
+OCR_BATCH_MAX_BYTES of encoded request data, submits them, polls every
+OCR_BATCH_POLL_INTERVAL seconds and writes each response to the same
+ocr/{doc_id}/page_NNNN.{txt,json} files and ocr_manifest.json as the
+interactive pipeline.
+
+Submitted jobs are recorded under "batch_jobs" in the OCR manifest before
+polling starts, so an interrupted run picks up the same jobs instead of
+paying for the pages again.
+
+Backends implement submit / poll / results:
+- GeminiBatchBackend: the Gemini Batch API (needs the google-genai SDK;
+  google.generativeai has no batch endpoint)
+- LocalBatchBackend: runs each job through an interactive model when it is
+  polled, so the flow can be exercised offline
+"""
+import asyncio
+import math
+import time
+from pathlib import Path
+
+from src.ocr.cache import ResponseCache
+from src.ocr.classify import AUTO_PROMPT, PromptRouter
+from src.ocr.config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    OCR_BATCH_MAX_BYTES,
+    OCR_BATCH_POLL_INTERVAL,
+    OCR_MAX_IMAGE_EDGE,
+    OCR_PROMPT,
+    OCR_PROMPTS,
+)
+from src.ocr.gemini_ocr import load_image_part, save_page_output
+from src.ocr.manifest import OcrManifest, load_ocr_manifest
+from src.ocr.pipeline import (
+    CheckpointWriter,
+    _copy_duplicates,
+    _discover_pages,
+    _ocr_output_dir,
+    _split_duplicates,
+)
+from src.page_store import file_sha256
+
+BATCH_JOBS = "batch_jobs"  # OCR manifest metadata key
+REQUEST_OVERHEAD = 1024  # bytes of JSON around each request's prompt and image
+
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def _model_name(model: str) -> str:
+    """Full resource name ("models/..."), as GenerativeModel.model_name reports it."""
+    return model if model.startswith("models/") else f"models/{model}"
+
+
+class GeminiBatchBackend:
+    """Gemini Batch API jobs with inline requests."""
+
+    _FINISHED = {
+        "JOB_STATE_SUCCEEDED": SUCCEEDED,
+        "JOB_STATE_FAILED": FAILED,
+        "JOB_STATE_CANCELLED": FAILED,
+        "JOB_STATE_EXPIRED": FAILED,
+    }
+
+    def __init__(self, model: str = GEMINI_MODEL, api_key: str = GEMINI_API_KEY):
+        from google import genai
+        self.client = genai.Client(api_key=api_key)
+        self.model_name = _model_name(model)
+
+    def submit(self, requests: list[dict], display_name: str) -> str:
+        """Create a job for requests ({key, prompt, image}); returns its name."""
+        src = [
+            {"contents": [{"role": "user", "parts": [
+                {"text": request["prompt"]},
+                {"inline_data": request["image"]},
+            ]}]}
+            for request in requests
+        ]
+        job = self.client.batches.create(
+            model=self.model_name, src=src, config={"display_name": display_name},
+        )
+        return job.name
+
+    def poll(self, name: str) -> str:
+        """RUNNING, SUCCEEDED or FAILED."""
+        state = self.client.batches.get(name=name).state
+        return self._FINISHED.get(getattr(state, "name", str(state)), RUNNING)
+
+    def results(self, name: str, keys: list[str]) -> dict[str, str | Exception]:
+        """Response text (or the error) per request key, in submission order."""
+        job = self.client.batches.get(name=name)
+        responses = getattr(job.dest, "inlined_responses", None) or []
+        results = {}
+        for key, item in zip(keys, responses):
+            if item.error:
+                results[key] = RuntimeError(str(item.error))
+                continue
+            try:
+                results[key] = item.response.text
+            except Exception as e:  # blocked or empty candidate
+                results[key] = e
+        return results
+
+
+class LocalBatchBackend:
+    """Stand-in backend: a job runs through an interactive model when polled.
+
+    The job completes on its `polls`-th poll. Jobs live in memory, so one
+    left over from an earlier process polls as FAILED and is resubmitted on
+    the next run.
+    """
+
+    def __init__(self, model, polls: int = 1):
+        self.model = model
+        self.model_name = getattr(model, "model_name", None) or _model_name(GEMINI_MODEL)
+        self.polls = max(1, polls)
+        self._jobs: dict[str, dict] = {}
+
+    def submit(self, requests: list[dict], display_name: str) -> str:
+        name = f"local-batches/{len(self._jobs) + 1}"
+        self._jobs[name] = {"requests": list(requests), "polls": 0, "results": None}
+        return name
+
+    def poll(self, name: str) -> str:
+        job = self._jobs.get(name)
+        if job is None:
+            return FAILED
+        job["polls"] += 1
+        if job["polls"] < self.polls:
+            return RUNNING
+        if job["results"] is None:
+            job["results"] = {}
+            for request in job["requests"]:
+                try:
+                    response = self.model.generate_content([request["prompt"], request["image"]])
+                    job["results"][request["key"]] = response.text
+                except Exception as e:
+                    job["results"][request["key"]] = e
+        return SUCCEEDED
+
+    def results(self, name: str, keys: list[str]) -> dict[str, str | Exception]:
+        return dict(self._jobs[name]["results"] or {})
+
+
+def request_size(prompt: str, image: dict) -> int:
+    """Bytes one inline request adds to a job: the image goes base64-encoded."""
+    return (
+        4 * math.ceil(len(image["data"]) / 3)
+        + len(prompt.encode("utf-8"))
+        + len(image["mime_type"])
+        + REQUEST_OVERHEAD
+    )
+
+
+def _cache_key(backend, prompt: str, image_path: Path) -> str:
+    return ResponseCache.key(
+        "ocr", backend, prompt, file_sha256(image_path), max_edge=OCR_MAX_IMAGE_EDGE,
+    )
+
+
+async def _submit_jobs(
+    backend,
+    entries: list[dict],
+    prompt_key: str,
+    volume_id: str,
+    max_bytes: int,
+    manifest: OcrManifest,
+    jobs: list[dict],
+) -> None:
+    """Submit entries in jobs of at most max_bytes of encoded requests (see request_size).
+
+    Each job record ({name, keys, prompt_key}) is appended to jobs and
+    saved to the manifest as soon as the job exists, so an interrupted
+    submission doesn't lose (and pay again for) jobs already created.
+    """
+    prompt = OCR_PROMPTS.get(prompt_key, OCR_PROMPT)
+    requests: list[dict] = []
+    size = 0
+
+    async def submit() -> None:
+        display_name = f"{volume_id}-ocr-{prompt_key}-{int(time.time())}-{len(jobs) + 1}"
+        name = await asyncio.to_thread(backend.submit, requests, display_name)
+        jobs.append({"name": name, "keys": [r["key"] for r in requests], "prompt_key": prompt_key})
+        manifest.db.set_meta(BATCH_JOBS, jobs)
+        await asyncio.to_thread(manifest.db.flush)
+        print(f"[{volume_id}] Submitted batch job {name} ({len(requests)} pages, "
+              f"{size / 1024 / 1024:.1f} MB)")
+
+    for entry in entries:
+        image = await asyncio.to_thread(load_image_part, entry["image_path"])
+        added = request_size(prompt, image)
+        if requests and size + added > max_bytes:
+            await submit()
+            requests, size = [], 0
+        requests.append({"key": entry["page_key"], "prompt": prompt, "image": image})
+        size += added
+    if requests:
+        await submit()
+
+
+def _record_job(
+    checkpoint: CheckpointWriter,
+    job: dict,
+    state: str,
+    results: dict[str, str | Exception],
+    entries: dict[str, dict],
+    ocr_dir: Path,
+    volume_id: str,
+    backend,
+    cache: ResponseCache | None,
+) -> int:
+    """Write a finished job's transcriptions and queue its page results.
+
+    Returns the number of pages transcribed.
+    """
+    prompt_key = job.get("prompt_key", "general")
+    prompt = OCR_PROMPTS.get(prompt_key, OCR_PROMPT)
+    done = 0
+    for key in job["keys"]:
+        entry = entries.get(key)
+        if entry is None:
+            continue  # image no longer in the volume
+        result = results.get(key)
+        if not isinstance(result, str):
+            if result is not None:
+                error = str(result)
+            elif state == SUCCEEDED:
+                error = f"no response for {key} in batch job {job['name']}"
+            else:
+                error = f"batch job {state}"
+            checkpoint.record(key, success=False, error=error)
+            print(f"  [{volume_id}] {key} FAILED: {error}")
+            continue
+        save_page_output(
+            _ocr_output_dir(ocr_dir, entry), entry["page_num"], volume_id,
+            entry["doc_id"], result, prompt_key,
+        )
+        if cache is not None:
+            cache.put(_cache_key(backend, prompt, entry["image_path"]), result)
+        checkpoint.record(key, success=True)
+        done += 1
+    return done
+
+
+async def run_batch_pipeline(
+    volume_dir: Path,
+    volume_id: str,
+    backend,
+    prompt_key: str = "general",
+    cache: ResponseCache | None = None,
+    poll_interval: float = OCR_BATCH_POLL_INTERVAL,
+    max_bytes: int = OCR_BATCH_MAX_BYTES,
+) -> dict:
+    """OCR a volume's pending pages as batch jobs and wait for them.
+
+    Jobs still recorded in the manifest from an earlier run are polled
+    rather than resubmitted. With prompt_key "auto", each page is routed
+    to its own prompt and every prompt gets its own jobs. With a
+    ResponseCache, pages seen before are written straight from it and batch
+    responses are added to it.
+
+    Returns the exported OCR manifest dict.
+    """
+    images_dir = volume_dir / "images"
+    ocr_dir = volume_dir / "ocr"
+    manifest_path = volume_dir / "ocr_manifest.json"
+
+    page_entries = _discover_pages(images_dir)
+    if not page_entries:
+        print(f"[{volume_id}] No images found in {images_dir}")
+        return load_ocr_manifest(manifest_path)
+
+    router = PromptRouter(volume_dir / "text") if prompt_key == AUTO_PROMPT else None
+
+    with OcrManifest(manifest_path) as manifest:
+        manifest.set_volume(volume_id, len(page_entries))
+        unique_entries, duplicates = _split_duplicates(page_entries)
+        entries = {entry["page_key"]: entry for entry in unique_entries}
+        completed = manifest.completed_keys()
+        jobs = manifest.db.get_meta(BATCH_JOBS, [])
+        submitted = {key for job in jobs for key in job["keys"]}
+
+        async with CheckpointWriter(manifest) as checkpoint:
+            pending: dict[str, list[dict]] = {}  # prompt key -> entries
+            for entry in unique_entries:
+                if entry["page_key"] in completed or entry["page_key"] in submitted:
+                    continue
+                page_prompt_key = prompt_key
+                if router is not None:
+                    page_prompt_key = await asyncio.to_thread(
+                        router.route, entry["image_path"], entry["doc_id"], entry["page_num"],
+                    )
+                prompt = OCR_PROMPTS.get(page_prompt_key, OCR_PROMPT)
+                text = cache.get(_cache_key(backend, prompt, entry["image_path"])) if cache else None
+                if text is None:
+                    pending.setdefault(page_prompt_key, []).append(entry)
+                    continue
+                save_page_output(
+                    _ocr_output_dir(ocr_dir, entry), entry["page_num"], volume_id,
+                    entry["doc_id"], text, page_prompt_key,
+                )
+                checkpoint.record(entry["page_key"], success=True)
+
+            if jobs:
+                print(f"[{volume_id}] Resuming {len(jobs)} batch jobs from an earlier run")
+            if router is not None:
+                print(f"[{volume_id}] Prompt routing: {router.summary()}")
+            print(f"[{volume_id}] Batching {sum(map(len, pending.values()))} pages "
+                  f"({len(completed)} already done, {len(submitted)} already submitted)")
+
+            for page_prompt_key, prompt_entries in pending.items():
+                await _submit_jobs(
+                    backend, prompt_entries, page_prompt_key, volume_id, max_bytes, manifest, jobs,
+                )
+
+            while jobs:
+                for job in list(jobs):
+                    state = await asyncio.to_thread(backend.poll, job["name"])
+                    if state == RUNNING:
+                        continue
+                    results = {}
+                    if state == SUCCEEDED:
+                        results = await asyncio.to_thread(backend.results, job["name"], job["keys"])
+                    done = _record_job(
+                        checkpoint, job, state, results, entries, ocr_dir, volume_id, backend, cache,
+                    )
+                    print(f"[{volume_id}] Batch job {job['name']} {state}: "
+                          f"{done}/{len(job['keys'])} pages transcribed")
+                    jobs.remove(job)
+                    await checkpoint.flush()
+                    manifest.db.set_meta(BATCH_JOBS, jobs)
+                if jobs:
+                    print(f"[{volume_id}] Waiting on {len(jobs)} batch jobs...")
+                    await asyncio.sleep(poll_interval)
+
+            await _copy_duplicates(checkpoint, duplicates, ocr_dir, volume_id)
+
+        result = await asyncio.to_thread(manifest.export_json)
+
+    print(f"[{volume_id}] Batch OCR complete: {len(result['completed_pages'])} done, "
+          f"{len(result['failed_pages'])} failed")
+    return result
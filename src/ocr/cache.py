@@ -0,0 +1,130 @@
+# src/ocr/cache.py
+"""Persistent cache of Gemini responses.
+
+OCR and correction requests are deterministic enough to reuse: the same
+image (or text) sent with the same prompt, model and generation config gets
+the cached response instead of a new API call. Entries live in one SQLite
+file (DOWNLOAD_DIR/ocr_cache.sqlite for the CLIs) keyed by
+
+    sha256(kind, model name, generation config, sha256(prompt), sha256(input))
+
+and the least recently used entries are evicted once the stored responses
+exceed max_bytes.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from src.ocr.config import GEMINI_MODEL, OCR_CACHE_MAX_MB
+
+CACHE_NAME = "ocr_cache.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at);
+"""
+
+
+def _sha256(data: bytes | str) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def model_identity(model) -> tuple[str, str]:
+    """(model name, generation config as canonical JSON) for cache keys."""
+    name = getattr(model, "model_name", None)
+    if not isinstance(name, str):
+        name = GEMINI_MODEL
+    config = getattr(model, "_generation_config", None)
+    if not isinstance(config, dict):
+        config = {}
+    return name, json.dumps(config, sort_keys=True, default=str)
+
+
+class ResponseCache:
+    """SQLite response store with size-bounded LRU eviction. Safe to share across threads."""
+
+    def __init__(self, path: Path, max_bytes: int = OCR_CACHE_MAX_MB * 1024 * 1024):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def __enter__(self) -> "ResponseCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def key(kind: str, model, prompt: str, content: bytes | str, **extra) -> str:
+        """Cache key for one request: kind ("ocr"/"correct"), model, prompt and input."""
+        name, config = model_identity(model)
+        parts = [kind, name, config, _sha256(prompt), _sha256(content)]
+        parts += [f"{k}={extra[k]}" for k in sorted(extra)]
+        return _sha256("\n".join(parts))
+
+    def get(self, key: str) -> str | None:
+        """Cached response text, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, text: str) -> None:
+        """Store a response, evicting least recently used entries past max_bytes."""
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, text, size, used_at) VALUES (?, ?, ?, ?)",
+                (key, text, size, time.time()),
+            )
+            self._size += size - (old[0] if old else 0)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        if self._size <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY used_at").fetchall()
+        for key, size in rows:
+            if self._size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._size -= size
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        """Total bytes of cached response text."""
+        return self._size
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
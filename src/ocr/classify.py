@@ -0,0 +1,153 @@
+# src/ocr/classify.py
+"""Per-page prompt routing (general / tabular / handwritten).
+
+With --prompt auto, each page gets the OCR_PROMPTS variant that suits it
+instead of one prompt for the whole volume. PromptRouter decides from
+cheap local signals:
+
+- the Gale baseline text for the page (text/{doc_id}.txt), if any: mostly
+  number-heavy lines read as a table; text that is largely OCR noise
+  (correct.noise_rate) means Gale could not read the hand
+- the page image, as a ROUTE_IMAGE_EDGE grayscale thumbnail: long ruled
+  lines in both directions mark a table; printed lines leave blank rows
+  between them, handwriting far fewer
+
+Row and column ink profiles come from BOX-resizing the binarised
+thumbnail, so a page costs a few milliseconds.
+"""
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+
+from PIL import Image, ImageOps, ImageStat
+
+from src.ocr.config import (
+    ROUTE_GALE_NOISE,
+    ROUTE_GALE_NUMERIC_LINES,
+    ROUTE_HANDWRITTEN_GAPS,
+    ROUTE_IMAGE_EDGE,
+    ROUTE_TABLE_RULES,
+)
+from src.ocr.correct import noise_rate
+from src.ocr.evaluate import parse_gale_text
+
+AUTO_PROMPT = "auto"
+
+RULE_INK = 0.5    # a row/column this dark is a ruled line
+BLANK_INK = 0.01  # a row this light is a gap between text lines
+MIN_INK = 0.005   # pages lighter than this are treated as blank
+MARGIN = 0.03     # share of each edge cropped, so dark scan borders aren't read as rules
+
+
+def _runs(profile: list[float], threshold: float) -> int:
+    """Number of separate runs of values above threshold."""
+    runs, inside = 0, False
+    for value in profile:
+        if value > threshold and not inside:
+            runs += 1
+        inside = value > threshold
+    return runs
+
+
+def image_features(image_path: Path, max_edge: int = ROUTE_IMAGE_EDGE) -> dict:
+    """Ink statistics of a page image.
+
+    Returns {ink, h_rules, v_rules, gap_share}: overall ink coverage, ruled
+    lines across / down the page, and the share of blank rows inside the
+    inked block.
+    """
+    with Image.open(image_path) as img:
+        img.draft("L", (max_edge, max_edge))  # JPEG: decode at reduced scale
+        gray = img.convert("L")
+    gray.thumbnail((max_edge, max_edge))
+    width, height = gray.size
+    gray = gray.crop((
+        round(width * MARGIN), round(height * MARGIN),
+        round(width * (1 - MARGIN)), round(height * (1 - MARGIN)),
+    ))
+    ink = ImageOps.autocontrast(gray).point(lambda v: 255 if v < 128 else 0)
+    width, height = ink.size
+
+    rows = [v / 255 for v in ink.resize((1, height), Image.BOX).tobytes()]
+    cols = [v / 255 for v in ink.resize((width, 1), Image.BOX).tobytes()]
+    inked = [i for i, v in enumerate(rows) if v > MIN_INK]
+    block = rows[inked[0]:inked[-1] + 1] if inked else []
+
+    return {
+        "ink": ImageStat.Stat(ink).mean[0] / 255,
+        "h_rules": _runs(rows, RULE_INK),
+        "v_rules": _runs(cols, RULE_INK),
+        "gap_share": sum(v < BLANK_INK for v in block) / len(block) if block else 1.0,
+    }
+
+
+def _is_numeric_line(line: str) -> bool:
+    """A ledger-like line: at least two numbers and mostly digits."""
+    chars = [c for c in line if not c.isspace()]
+    numbers = re.findall(r"\d[\d,.]*", line)
+    return len(numbers) >= 2 and sum(c.isdigit() for c in chars) >= 0.3 * len(chars)
+
+
+def classify_gale_text(text: str) -> str | None:
+    """Prompt key suggested by a page's Gale OCR text, or None if it says nothing."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if len(lines) >= 5 and sum(map(_is_numeric_line, lines)) / len(lines) >= ROUTE_GALE_NUMERIC_LINES:
+        return "tabular"
+    if len(text.split()) >= 10 and noise_rate(text) >= ROUTE_GALE_NOISE:
+        return "handwritten"
+    return None
+
+
+def classify_image(features: dict) -> str:
+    """Prompt key suggested by image_features()."""
+    if features["h_rules"] >= ROUTE_TABLE_RULES and features["v_rules"] >= ROUTE_TABLE_RULES - 1:
+        return "tabular"
+    if features["ink"] > MIN_INK and features["gap_share"] < ROUTE_HANDWRITTEN_GAPS:
+        return "handwritten"
+    return "general"
+
+
+class PromptRouter:
+    """Chooses the OCR prompt for each page of a volume. Safe to share across threads.
+
+    text_dir holds the Gale baseline ({doc_id}.txt); without it, or for
+    pages it doesn't cover, only the image is used. A page that can't be
+    read gets `default`.
+    """
+
+    def __init__(self, text_dir: Path | None = None, default: str = "general"):
+        self.text_dir = text_dir
+        self.default = default
+        self.counts: Counter = Counter()
+        self._gale: dict[str, dict[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def _gale_page(self, doc_id: str, page_num: int) -> str | None:
+        if not self.text_dir or not doc_id:
+            return None
+        with self._lock:
+            if doc_id not in self._gale:
+                path = self.text_dir / f"{doc_id}.txt"
+                self._gale[doc_id] = (
+                    parse_gale_text(path.read_text(encoding="utf-8")) if path.exists() else {}
+                )
+            return self._gale[doc_id].get(page_num)
+
+    def route(self, image_path: Path, doc_id: str = "", page_num: int = 0) -> str:
+        """Prompt key for one page."""
+        try:
+            gale_text = self._gale_page(doc_id, page_num)
+            prompt_key = classify_gale_text(gale_text) if gale_text else None
+            if prompt_key is None:
+                prompt_key = classify_image(image_features(image_path))
+        except Exception as e:
+            print(f"  Prompt routing failed for {Path(image_path).name}: {e}")
+            prompt_key = self.default
+        with self._lock:
+            self.counts[prompt_key] += 1
+        return prompt_key
+
+    def summary(self) -> str:
+        """Pages routed per prompt, e.g. "120 general, 8 tabular"."""
+        return ", ".join(f"{n} {key}" for key, n in self.counts.most_common())
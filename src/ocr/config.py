@@ -10,16 +10,64 @@ GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
 
 # Concurrency
 OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", "20"))
+OCR_CORRECT_CONCURRENCY = int(os.getenv("OCR_CORRECT_CONCURRENCY", "10"))  # post-correction stage
+
+# Gemini quotas shared by OCR and correction requests (0 = unlimited)
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "2000"))        # requests per minute
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "4000000"))     # tokens per minute
+GEMINI_QUOTA_HEADROOM = 0.9   # fraction of the quota actually used
+GEMINI_BURST_SECONDS = 2.0    # bucket capacity, in seconds of quota
+GEMINI_THROTTLE_PAUSE = 5.0   # seconds every caller waits after a 429 without Retry-After
+OCR_OUTPUT_TOKENS = 800       # estimated response tokens per transcribed page
+
+# Prompt routing (--prompt auto, src/ocr/classify.py)
+ROUTE_IMAGE_EDGE = 1024          # long edge of the thumbnail pages are classified from
+ROUTE_TABLE_RULES = 3            # ruled lines (each way: 3 horizontal, 2 vertical) that make a table
+ROUTE_HANDWRITTEN_GAPS = 0.12    # blank-row share of the text block below which it reads as handwriting
+ROUTE_GALE_NUMERIC_LINES = 0.4   # share of number-heavy Gale lines that makes a table
+ROUTE_GALE_NOISE = 0.3           # Gale noise rate above which the hand was unreadable to Gale
+
+# Correction pre-filter (src/ocr/correct.py CorrectionFilter): pages are sent
+# to the correction model only if they look noisy enough to benefit
+CORRECT_MIN_NOISE = float(os.getenv("CORRECT_MIN_NOISE", "0.01"))  # suspicious-word share at or below = clean
+CORRECT_MAX_ILLEGIBLE = float(os.getenv("CORRECT_MAX_ILLEGIBLE", "0.2"))  # [illegible] per word at or above = skip
+CORRECT_MAX_TABLE = float(os.getenv("CORRECT_MAX_TABLE", "0.5"))  # share of Markdown table lines at or above = skip
+
+# Correction batching (src/ocr/correct.py CorrectionBatcher): short pages share a
+# request up to this many characters; longer pages are split at paragraph breaks
+CORRECT_REQUEST_CHARS = int(os.getenv("CORRECT_REQUEST_CHARS", "12000"))
+CORRECT_BATCH_LINGER = 1.0  # seconds a page waits for others to fill its request
 
 # Retry settings
 OCR_MAX_RETRIES = 3
 OCR_RETRY_BACKOFF = 2.0  # exponential backoff multiplier
 OCR_TIMEOUT = 30  # seconds per Gemini request
 
+# Manifest checkpointing
+OCR_CHECKPOINT_INTERVAL = 2.0  # seconds between manifest commits during a run
+OCR_CHECKPOINT_BATCH = 50  # queued page results that trigger an early commit
+
+# Streaming scrape -> OCR (python -m scripts.run stream)
+OCR_STREAM_QUEUE = 200  # scraped pages waiting for OCR before the scraper blocks
+
+# Batch OCR (python -m scripts.run_ocr ocr --batch); inline batch requests are capped at 20MB
+OCR_BATCH_MAX_BYTES = 19 * 1000 * 1000  # encoded request bytes (base64 images + prompts) per job
+OCR_BATCH_POLL_INTERVAL = float(os.getenv("OCR_BATCH_POLL_INTERVAL", "60"))  # seconds
+
+# Evaluation (src/ocr/evaluate.py): processes documents are spread over; 0 = one per CPU
+EVAL_WORKERS = int(os.getenv("EVAL_WORKERS", "0"))
+
 # Image extraction
 IMAGE_FORMAT = "JPEG"
 IMAGE_QUALITY = 95  # JPEG quality (1-100)
 
+# Images are sent to Gemini as their original bytes; only pages whose long
+# edge exceeds this are downscaled (and re-encoded) first. 0 disables.
+OCR_MAX_IMAGE_EDGE = int(os.getenv("OCR_MAX_IMAGE_EDGE", "3072"))
+
+# Response cache (src/ocr/cache.py); least recently used entries are evicted past this
+OCR_CACHE_MAX_MB = int(os.getenv("OCR_CACHE_MAX_MB", "1024"))
+
 # OCR prompts for CO 273 Straits Settlements colonial documents
 OCR_PROMPTS = {
     "general": (
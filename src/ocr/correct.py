@@ -1,7 +1,31 @@
 # src/ocr/correct.py
-"""Post-correction pass for OCR output using LLM."""
+"""Post-correction pass for OCR output using LLM.
+
+CorrectionFilter scores each page locally first, so clean, mostly
+illegible and tabular pages are never sent to the correction model.
+CorrectionBatcher then packs short pages into shared requests and splits
+long ones at paragraph breaks.
+"""
+import asyncio
+import re
 from pathlib import Path
 
+from src.ocr.cache import ResponseCache
+from src.ocr.config import (
+    CORRECT_BATCH_LINGER,
+    CORRECT_MAX_ILLEGIBLE,
+    CORRECT_MAX_TABLE,
+    CORRECT_MIN_NOISE,
+    CORRECT_REQUEST_CHARS,
+)
+from src.ocr.gemini_ocr import count_illegible
+from src.ocr.rate_limit import (
+    GeminiRateLimiter,
+    estimate_text_tokens,
+    is_rate_limited,
+    usage_tokens,
+)
+
 
 CORRECTION_PROMPT = (
     "You are a proofreader for OCR output of 19th-century British colonial documents. "
@@ -22,15 +46,121 @@ CORRECTION_PROMPT = (
     "---\n"
 )
 
+BATCH_INSTRUCTIONS = (
+    "The text below is split into sections, each introduced by a marker line such as "
+    "<<<SECTION 1>>>. Sections may come from different pages: correct each one on its own. "
+    "Copy every marker line exactly, in the same order, each followed by its corrected "
+    "section.\n\n"
+)
+BATCH_CORRECTION_PROMPT = CORRECTION_PROMPT.removesuffix("---\n") + BATCH_INSTRUCTIONS + "---\n"
+
+_SECTION_MARKER = re.compile(r"^<<<SECTION (\d+)>>>[ \t]*$", re.MULTILINE)
+
+
+# Misreadings of common words that are never valid spellings
+COMMON_CONFUSIONS = frozenset({
+    "tbe", "tle", "thc", "tlie", "tbat", "tbis", "tbey", "tbeir", "tbere", "witb",
+    "wbich", "wben", "wbo", "bave", "frorn", "rnay", "sarne", "tirne", "govemor",
+    "governrnent", "cornmittee", "cornmissioner", "rnade", "sbould", "wonld", "conld",
+})
+
+_WORD = re.compile(r"\S+")
+_EDGE_PUNCTUATION = ".,;:!?\"'()[]{}<>*_|-\u2013\u2014\u2018\u2019\u201c\u201d"
+_ORDINAL = re.compile(r"\d+(st|nd|rd|th|d)", re.IGNORECASE)
+_ROMAN = re.compile(r"[ivxlcdm]+")
+
+
+def _is_suspicious(token: str) -> bool:
+    """True for a word that looks like an OCR error rather than archaic spelling."""
+    word = token.strip(_EDGE_PUNCTUATION)
+    if not any(c.isalpha() for c in word):
+        return False  # numbers, currency, table rules
+    lower = word.lower()
+    if _ORDINAL.fullmatch(word) or _ROMAN.fullmatch(lower):
+        return False
+    if re.search(r"[^\W\d_]\d|\d[^\W\d_]", word):
+        return True  # "G0vernor", "Straits5"
+    if not all(c.isalnum() or c in "'-.&/," for c in word):
+        return True  # "Gov~rnor"
+    if lower in COMMON_CONFUSIONS:
+        return True
+    if any(
+        re.search(r"(.)\1\1", run) and not _ROMAN.fullmatch(run)
+        for run in re.findall(r"[^\W\d_]+", lower)
+    ):
+        return True  # "Govvvernor", but not "273/iii"
+    if len(word) >= 3 and word.islower() and not set(lower) & set("aeiouy"):
+        return True  # "tbt"
+    return any(a.islower() and b.isupper() for a, b in zip(word, word[1:])) and not re.match(
+        r"(Ma?c|O')", word,
+    )  # "tHe", but not "McLeod"
+
+
+def noise_rate(text: str) -> float:
+    """Share of the words in text that look like OCR errors."""
+    words = _WORD.findall(text)
+    if not words:
+        return 0.0
+    return sum(_is_suspicious(word) for word in words) / len(words)
+
+
+class CorrectionFilter:
+    """Local pre-filter deciding which pages are worth an LLM correction.
+
+    skip_reason() names why a page is not sent:
+    - "empty": no text
+    - "tabular": at least max_table of the non-blank lines are Markdown
+      table rows (correction tends to shift cells)
+    - "illegible": at least max_illegible [illegible] markers per word,
+      leaving the model little to work with
+    - "clean": at most min_noise of the words look like OCR errors
+    """
+
+    def __init__(
+        self,
+        min_noise: float = CORRECT_MIN_NOISE,
+        max_illegible: float = CORRECT_MAX_ILLEGIBLE,
+        max_table: float = CORRECT_MAX_TABLE,
+    ):
+        self.min_noise = min_noise
+        self.max_illegible = max_illegible
+        self.max_table = max_table
+
+    def thresholds(self) -> dict:
+        return {
+            "min_noise": self.min_noise,
+            "max_illegible": self.max_illegible,
+            "max_table": self.max_table,
+        }
+
+    def skip_reason(self, text: str) -> str | None:
+        """Why the page should not be corrected, or None to correct it."""
+        words = _WORD.findall(text)
+        if not words:
+            return "empty"
+        lines = [line for line in text.splitlines() if line.strip()]
+        table_rows = sum(1 for line in lines if line.lstrip().startswith("|"))
+        if table_rows / len(lines) >= self.max_table:
+            return "tabular"
+        if count_illegible(text) / len(words) >= self.max_illegible:
+            return "illegible"
+        if noise_rate(text) <= self.min_noise:
+            return "clean"
+        return None
+
 
 async def correct_single_page(
     model,
     page_txt_path: Path,
+    cache: ResponseCache | None = None,
+    limiter: GeminiRateLimiter | None = None,
 ) -> bool:
     """Run post-correction on a single OCR'd page.
 
     Reads the existing .txt file, sends to LLM for correction,
     saves corrected text back. Original is preserved as .raw.txt.
+    With a cache, text corrected before is not sent again; with a limiter,
+    the request is paced by the shared RPM/TPM budget.
 
     Returns True on success or skip (already corrected).
     """
@@ -50,8 +180,21 @@ async def correct_single_page(
             return True
 
         prompt = CORRECTION_PROMPT + raw_text
-        response = await model.generate_content_async(prompt)
-        corrected = response.text
+        corrected = cache_key = None
+        if cache is not None:
+            cache_key = ResponseCache.key("correct", model, CORRECTION_PROMPT, raw_text)
+            corrected = cache.get(cache_key)
+        if corrected is None:
+            if limiter is not None:
+                # The corrected text comes back about as long as it went in
+                estimate = estimate_text_tokens(prompt) + estimate_text_tokens(raw_text)
+                await limiter.acquire(estimate)
+            response = await model.generate_content_async(prompt)
+            corrected = response.text
+            if limiter is not None:
+                limiter.settle(estimate, usage_tokens(response))
+            if cache is not None:
+                cache.put(cache_key, corrected)
 
         # Save backup of original
         raw_backup.write_text(raw_text, encoding="utf-8")
@@ -62,5 +205,208 @@ async def correct_single_page(
         return True
 
     except Exception as e:
+        if limiter is not None and is_rate_limited(e):
+            limiter.throttled(e)
         print(f"  Correction failed for {page_txt_path.name}: {e}")
         return False
+
+
+def split_paragraphs(text: str, max_chars: int = CORRECT_REQUEST_CHARS) -> list[tuple[str, str]]:
+    """Split text at blank lines into (chunk, separator) pairs of up to max_chars.
+
+    "".join(chunk + separator) rebuilds text exactly. Paragraphs are never
+    split, so one longer than max_chars becomes a chunk of its own.
+    """
+    parts = re.split(r"(\n[ \t]*\n\s*)", text)
+    chunks = []
+    body, sep = parts[0], ""
+    for i in range(1, len(parts), 2):
+        sep, paragraph = parts[i], parts[i + 1]
+        if len(body) + len(sep) + len(paragraph) > max_chars:
+            chunks.append((body, sep))
+            body = paragraph
+        else:
+            body += sep + paragraph
+    chunks.append((body, ""))
+    return chunks
+
+
+def _rewrap(original: str, corrected: str) -> str:
+    """Corrected text with the original's leading and trailing whitespace."""
+    lead = original[:len(original) - len(original.lstrip())]
+    trail = original[len(original.rstrip()):]
+    return lead + corrected.strip() + trail
+
+
+def parse_sections(response_text: str, count: int) -> list[str]:
+    """Split a batched correction response back into its count sections.
+
+    Raises ValueError unless markers 1..count each appear once, in order.
+    """
+    pieces = _SECTION_MARKER.split(response_text)
+    numbers = [int(n) for n in pieces[1::2]]
+    if numbers != list(range(1, count + 1)):
+        raise ValueError(f"expected sections 1..{count}, got {numbers}")
+    return pieces[2::2]
+
+
+class CorrectionBatcher:
+    """Shares correction requests between pages corrected concurrently.
+
+    correct() splits a page into paragraph chunks and queues them; queued
+    chunks are sent together once they reach max_chars or have waited
+    `linger` seconds, as marked sections of one request. A response whose
+    markers don't come back intact is retried one section per request.
+    At most `semaphore` requests are in flight. Use as an async context
+    manager.
+    """
+
+    def __init__(
+        self,
+        model,
+        semaphore: asyncio.Semaphore,
+        cache: ResponseCache | None = None,
+        limiter: GeminiRateLimiter | None = None,
+        max_chars: int = CORRECT_REQUEST_CHARS,
+        linger: float = CORRECT_BATCH_LINGER,
+    ):
+        self.model = model
+        self.semaphore = semaphore
+        self.cache = cache
+        self.limiter = limiter
+        self.max_chars = max(1, max_chars)
+        self.linger = linger
+        self.requests = 0
+        self._pending: list[tuple[str, bool, asyncio.Future]] = []
+        self._pending_chars = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "CorrectionBatcher":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def correct(self, page_txt_path: Path) -> bool:
+        """Correct one page in place, keeping the original as .raw.txt.
+
+        Same contract as correct_single_page: True on success or skip.
+        """
+        raw_backup = page_txt_path.with_suffix(".raw.txt")
+        if raw_backup.exists():
+            return True
+        if not page_txt_path.exists():
+            return False
+
+        raw_text = await asyncio.to_thread(page_txt_path.read_text, encoding="utf-8")
+        if not raw_text.strip():
+            return True
+
+        chunks = split_paragraphs(raw_text, self.max_chars)
+        whole = len(chunks) == 1
+        loop = asyncio.get_running_loop()
+        futures = []
+        for chunk, _ in chunks:
+            future = loop.create_future()
+            futures.append(future)
+            self._pending.append((chunk, whole, future))
+            self._pending_chars += len(chunk)
+        if self._pending_chars >= self.max_chars:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._dispatch)
+
+        corrected = await asyncio.gather(*futures, return_exceptions=True)
+        errors = [result for result in corrected if isinstance(result, BaseException)]
+        if errors:
+            print(f"  Correction failed for {page_txt_path.name}: {errors[0]}")
+            return False
+
+        await asyncio.to_thread(raw_backup.write_text, raw_text, encoding="utf-8")
+        await asyncio.to_thread(
+            page_txt_path.write_text,
+            "".join(text + sep for text, (_, sep) in zip(corrected, chunks)), encoding="utf-8",
+        )
+        return True
+
+    def _dispatch(self) -> None:
+        """Send everything queued, in requests of up to max_chars."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, size = [], 0
+        for section in self._pending:
+            if batch and size + len(section[0]) > self.max_chars:
+                self._spawn(batch)
+                batch, size = [], 0
+            batch.append(section)
+            size += len(section[0])
+        if batch:
+            self._spawn(batch)
+        self._pending, self._pending_chars = [], 0
+
+    def _spawn(self, batch: list[tuple[str, bool, asyncio.Future]]) -> None:
+        task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[str, bool, asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                chunk, whole, _ = batch[0]
+                text = await self._request(CORRECTION_PROMPT, chunk)
+                results = [text if whole else _rewrap(chunk, text)]
+            else:
+                content = "".join(
+                    f"<<<SECTION {i}>>>\n{chunk.strip()}\n"
+                    for i, (chunk, _, _) in enumerate(batch, 1)
+                )
+                text = await self._request(BATCH_CORRECTION_PROMPT, content)
+                try:
+                    sections = parse_sections(text, len(batch))
+                except ValueError:
+                    await asyncio.gather(*(self._send([section]) for section in batch))
+                    return
+                results = [_rewrap(chunk, section) for (chunk, _, _), section in zip(batch, sections)]
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _request(self, prompt: str, content: str) -> str:
+        """One correction request, through the cache and rate limiter."""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ResponseCache.key("correct", self.model, prompt, content)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        async with self.semaphore:
+            try:
+                if self.limiter is not None:
+                    estimate = estimate_text_tokens(prompt + content) + estimate_text_tokens(content)
+                    await self.limiter.acquire(estimate)
+                response = await self.model.generate_content_async(prompt + content)
+                self.requests += 1
+                text = response.text
+                if self.limiter is not None:
+                    self.limiter.settle(estimate, usage_tokens(response))
+            except Exception as e:
+                if self.limiter is not None and is_rate_limited(e):
+                    self.limiter.throttled(e)
+                raise
+        if self.cache is not None:
+            self.cache.put(cache_key, text)
+        return text
+
+    async def close(self) -> None:
+        """Send whatever is still queued and wait for every request."""
+        if self._pending:
+            self._dispatch()
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -1,9 +1,34 @@
-"""Evaluate Gemini OCR output against Gale OCR baseline using WER/CER."""
+"""Evaluate Gemini OCR output against Gale OCR baseline using WER/CER.
+
+Word and character edit distances are computed in one pass per page with
+rapidfuzz (the Levenshtein engine jiwer itself uses), normalised like
+jiwer's defaults except that words are split on any whitespace (jiwer
+splits on spaces only, so a line break would join two words); characters
+are taken from the stripped text. Pages are spread over a process
+pool, and results carry error counts so aggregates can be weighted by
+reference length (sum of errors / sum of reference words or characters)
+as well as averaged per page.
+
+Page metrics are cached in a SQLite file (volume_dir/eval_cache.sqlite for
+the CLI) keyed by the sha256 of both texts, so a re-run only recomputes
+pages whose Gale baseline or Gemini transcription changed; the report is
+assembled from cached and fresh metrics alike.
+"""
+import hashlib
 import json
+import os
 import re
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from jiwer import wer, cer
+from rapidfuzz.distance import Levenshtein
+
+from src.ocr.config import EVAL_WORKERS
+
+EVAL_CACHE_NAME = "eval_cache.sqlite"
+METRICS_VERSION = "1"  # bump when compute_page_metrics changes, to drop stale entries
 
 
 def parse_gale_text(text: str) -> dict[int, str]:
@@ -49,22 +74,176 @@ def load_gemini_page(ocr_dir: Path, doc_id: str, page_num: int) -> str | None:
 def compute_page_metrics(reference: str, hypothesis: str) -> dict:
     """Compute WER and CER between reference and hypothesis texts.
 
-    Returns dict with wer, cer, ref_words, hyp_words.
+    Matches jiwer's default wer()/cer() except that words are split on any
+    whitespace, where jiwer splits on spaces only: "Straits\nSettlements"
+    is two words here and one for jiwer.
+
+    Returns dict with wer, cer, ref_words, hyp_words, plus the raw
+    word_errors, char_errors and ref_chars used for weighted aggregates.
     """
     ref_words = reference.split()
     hyp_words = hypothesis.split()
 
     if not ref_words:
-        return {"wer": 0.0, "cer": 0.0, "ref_words": 0, "hyp_words": len(hyp_words)}
+        return {
+            "wer": 0.0, "cer": 0.0, "ref_words": 0, "hyp_words": len(hyp_words),
+            "word_errors": 0, "char_errors": 0, "ref_chars": 0,
+        }
 
-    w = wer(reference, hypothesis)
-    c = cer(reference, hypothesis)
+    ref_chars = reference.strip()
+    word_errors = Levenshtein.distance(ref_words, hyp_words)
+    char_errors = Levenshtein.distance(ref_chars, hypothesis.strip())
 
     return {
-        "wer": round(w, 4),
-        "cer": round(c, 4),
+        "wer": round(word_errors / len(ref_words), 4),
+        "cer": round(char_errors / len(ref_chars), 4),
         "ref_words": len(ref_words),
         "hyp_words": len(hyp_words),
+        "word_errors": word_errors,
+        "char_errors": char_errors,
+        "ref_chars": len(ref_chars),
+    }
+
+
+def _weighted(metrics: list[dict]) -> dict:
+    """Reference-length-weighted WER/CER and the totals behind them."""
+    totals = {
+        key: sum(m[key] for m in metrics)
+        for key in ("word_errors", "ref_words", "char_errors", "ref_chars")
+    }
+    totals["weighted_wer"] = (
+        round(totals["word_errors"] / totals["ref_words"], 4) if totals["ref_words"] else None
+    )
+    totals["weighted_cer"] = (
+        round(totals["char_errors"] / totals["ref_chars"], 4) if totals["ref_chars"] else None
+    )
+    return totals
+
+
+class MetricsCache:
+    """SQLite store of page metrics keyed by the texts compared.
+
+    Used from the evaluating process only; pool workers just compute.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS metrics (key TEXT PRIMARY KEY, metrics TEXT NOT NULL)"
+        )
+
+    def __enter__(self) -> "MetricsCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def key(reference: str, hypothesis: str) -> str:
+        """Cache key for one page: metrics version plus the hash of each text."""
+        digests = [hashlib.sha256(t.encode("utf-8")).hexdigest() for t in (reference, hypothesis)]
+        return hashlib.sha256("\n".join([METRICS_VERSION, *digests]).encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, dict]:
+        """Cached metrics for whichever of keys are present."""
+        found = {}
+        for i in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+            chunk = keys[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT key, metrics FROM metrics WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.update((key, json.loads(metrics)) for key, metrics in rows)
+        self.hits += len(found)
+        self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, entries: dict[str, dict]) -> None:
+        """Store metrics for several pages in one transaction."""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO metrics (key, metrics) VALUES (?, ?)",
+                [(key, json.dumps(metrics)) for key, metrics in entries.items()],
+            )
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _load_document(doc_id: str, text_dir: Path, ocr_dir: Path) -> dict[int, tuple[str, str | None]]:
+    """(Gale text, Gemini text or None) per page of one document."""
+    gale_pages = parse_gale_text((text_dir / f"{doc_id}.txt").read_text(encoding="utf-8"))
+    return {
+        page_num: (gale_text, load_gemini_page(ocr_dir, doc_id, page_num))
+        for page_num, gale_text in sorted(gale_pages.items())
+    }
+
+
+def _compute_metrics(
+    documents: dict[str, dict[int, tuple[str, str | None]]],
+    cache: MetricsCache | None = None,
+    workers: int = 1,
+) -> tuple[dict[str, dict[int, dict]], int]:
+    """Page metrics for every document, computing only pages not in cache.
+
+    Misses are spread over `workers` processes (0 = one per CPU) and
+    written back to the cache. Returns ({doc_id: {page_num: metrics}},
+    number of pages computed).
+    """
+    results: dict[str, dict[int, dict]] = {doc_id: {} for doc_id in documents}
+    keys = {}
+    for doc_id, pages in documents.items():
+        for page_num, (gale_text, gemini_text) in pages.items():
+            if gemini_text is None:
+                results[doc_id][page_num] = {"error": "Gemini OCR not found"}
+            else:
+                keys[doc_id, page_num] = MetricsCache.key(gale_text, gemini_text)
+
+    cached = cache.get_many(list(keys.values())) if cache is not None else {}
+    missing = [page for page, key in keys.items() if key not in cached]
+    refs = [documents[doc_id][page_num][0] for doc_id, page_num in missing]
+    hyps = [documents[doc_id][page_num][1] for doc_id, page_num in missing]
+
+    workers = min(workers or os.cpu_count() or 1, max(1, len(missing)))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(missing) // (workers * 4))
+            computed = list(pool.map(compute_page_metrics, refs, hyps, chunksize=chunksize))
+    else:
+        computed = list(map(compute_page_metrics, refs, hyps))
+
+    fresh = {keys[page]: metrics for page, metrics in zip(missing, computed)}
+    if cache is not None and fresh:
+        cache.put_many(fresh)
+    for (doc_id, page_num), key in keys.items():
+        results[doc_id][page_num] = cached[key] if key in cached else fresh[key]
+    for doc_id in results:
+        results[doc_id] = dict(sorted(results[doc_id].items()))
+    return results, len(missing)
+
+
+def _document_result(doc_id: str, page_metrics: dict[int, dict]) -> dict:
+    """Per-document summary of its page metrics."""
+    # Compute averages (exclude pages with errors)
+    valid = [m for m in page_metrics.values() if "wer" in m]
+    avg_wer = sum(m["wer"] for m in valid) / len(valid) if valid else None
+    avg_cer = sum(m["cer"] for m in valid) / len(valid) if valid else None
+
+    return {
+        "doc_id": doc_id,
+        "pages_compared": len(valid),
+        "page_metrics": page_metrics,
+        "avg_wer": round(avg_wer, 4) if avg_wer is not None else None,
+        "avg_cer": round(avg_cer, 4) if avg_cer is not None else None,
+        **_weighted(valid),
     }
 
 
@@ -72,6 +251,7 @@ def evaluate_document(
     doc_id: str,
     text_dir: Path,
     ocr_dir: Path,
+    cache: MetricsCache | None = None,
 ) -> dict:
     """Evaluate Gemini OCR vs Gale baseline for one document.
 
@@ -79,9 +259,11 @@ def evaluate_document(
         doc_id: Sanitized document ID (e.g., "GALE_AAA111").
         text_dir: Directory containing Gale baseline text files.
         ocr_dir: Parent directory containing per-doc OCR output subdirs.
+        cache: Metrics cache; pages whose texts are unchanged aren't recomputed.
 
     Returns:
-        Dict with doc_id, pages_compared, page_metrics, avg_wer, avg_cer.
+        Dict with doc_id, pages_compared, page_metrics, avg_wer, avg_cer
+        (per-page means) and weighted_wer, weighted_cer with their totals.
     """
     gale_path = text_dir / f"{doc_id}.txt"
     if not gale_path.exists():
@@ -92,38 +274,20 @@ def evaluate_document(
             "page_metrics": {},
             "avg_wer": None,
             "avg_cer": None,
+            **_weighted([]),
         }
 
-    gale_pages = parse_gale_text(gale_path.read_text(encoding="utf-8"))
-    page_metrics = {}
-
-    for page_num, gale_text in sorted(gale_pages.items()):
-        gemini_text = load_gemini_page(ocr_dir, doc_id, page_num)
-        if gemini_text is None:
-            page_metrics[page_num] = {"error": "Gemini OCR not found"}
-            continue
-
-        metrics = compute_page_metrics(gale_text, gemini_text)
-        page_metrics[page_num] = metrics
-
-    # Compute averages (exclude pages with errors)
-    valid = [m for m in page_metrics.values() if "wer" in m]
-    avg_wer = sum(m["wer"] for m in valid) / len(valid) if valid else None
-    avg_cer = sum(m["cer"] for m in valid) / len(valid) if valid else None
-
-    return {
-        "doc_id": doc_id,
-        "pages_compared": len(valid),
-        "page_metrics": page_metrics,
-        "avg_wer": round(avg_wer, 4) if avg_wer is not None else None,
-        "avg_cer": round(avg_cer, 4) if avg_cer is not None else None,
-    }
+    documents = {doc_id: _load_document(doc_id, text_dir, ocr_dir)}
+    page_metrics, _ = _compute_metrics(documents, cache)
+    return _document_result(doc_id, page_metrics[doc_id])
 
 
 def evaluate_volume(
     volume_id: str,
     volume_dir: Path,
     sample: int | None = None,
+    workers: int = EVAL_WORKERS,
+    cache: MetricsCache | None = None,
 ) -> dict:
     """Evaluate all documents in a volume.
 
@@ -131,9 +295,13 @@ def evaluate_volume(
         volume_id: Volume identifier.
         volume_dir: Path to volume directory (contains text/ and ocr/).
         sample: If set, only evaluate this many documents (random sample).
+        workers: Processes to spread recomputed pages over (0 = one per CPU, 1 = serial).
+        cache: Metrics cache; only pages missing from it are recomputed.
 
     Returns:
-        Dict with volume_id, documents (list of doc results), overall avg_wer/cer.
+        Dict with volume_id, documents (list of doc results), overall
+        avg_wer/cer (mean of document means), weighted_wer/cer (total
+        errors over total reference length) and pages_recomputed.
     """
     text_dir = volume_dir / "text"
     ocr_dir = volume_dir / "ocr"
@@ -153,11 +321,13 @@ def evaluate_volume(
         import random
         doc_ids = random.sample(doc_ids, sample)
 
-    doc_results = []
-    for doc_id in doc_ids:
-        result = evaluate_document(doc_id, text_dir, ocr_dir)
-        doc_results.append(result)
-        print(f"  {doc_id}: WER={result['avg_wer']}, CER={result['avg_cer']} "
+    started = time.monotonic()
+    documents = {doc_id: _load_document(doc_id, text_dir, ocr_dir) for doc_id in doc_ids}
+    page_metrics, recomputed = _compute_metrics(documents, cache, workers)
+    doc_results = [_document_result(doc_id, page_metrics[doc_id]) for doc_id in doc_ids]
+
+    for result in doc_results:
+        print(f"  {result['doc_id']}: WER={result['avg_wer']}, CER={result['avg_cer']} "
               f"({result['pages_compared']} pages)")
 
     # Overall averages
@@ -165,10 +335,19 @@ def evaluate_volume(
     overall_wer = sum(d["avg_wer"] for d in valid) / len(valid) if valid else None
     overall_cer = sum(d["avg_cer"] for d in valid) / len(valid) if valid else None
 
+    weighted = _weighted(valid)
+    pages = sum(d["pages_compared"] for d in doc_results)
+    elapsed = time.monotonic() - started
+    print(f"  Evaluated {pages} pages in {elapsed:.1f}s "
+          f"({recomputed} recomputed, {pages - recomputed} from cache)")
+
     return {
         "volume_id": volume_id,
         "documents": doc_results,
         "total_documents": len(doc_results),
+        "pages_compared": pages,
+        "pages_recomputed": recomputed,
         "overall_wer": round(overall_wer, 4) if overall_wer is not None else None,
         "overall_cer": round(overall_cer, 4) if overall_cer is not None else None,
+        **weighted,
     }
@@ -10,6 +10,7 @@ from PIL import Image
 from pypdf import PdfReader
 
 from src.ocr.config import IMAGE_FORMAT, IMAGE_QUALITY
+from src.page_store import PageStore
 
 
 def extract_pages_from_pdf(
@@ -38,17 +39,19 @@ def extract_pages_from_pdf(
         # pypdf doesn't render pages directly; convert page to image via
         # extracting embedded images or using pdf2image-style approach.
         # For PDFs with embedded images (like scanned docs), extract the image.
+        img_path = output_dir / f"page_{page_num:04d}.jpg"
+        # The file may be a PageStore hardlink; unlink so writing can't alter the blob
+        img_path.unlink(missing_ok=True)
+
         images = page.images
         if images:
             # Use the first (usually only) image on the page
             img_data = images[0].data
-            img_path = output_dir / f"page_{page_num:04d}.jpg"
             with open(img_path, "wb") as f:
                 f.write(img_data)
         else:
             # Blank or text-only page — create a placeholder image
             img = Image.new("RGB", (612, 792), color=(255, 255, 255))
-            img_path = output_dir / f"page_{page_num:04d}.jpg"
             img.save(str(img_path), IMAGE_FORMAT, quality=IMAGE_QUALITY)
 
     return num_pages
@@ -57,17 +60,23 @@ def extract_pages_from_pdf(
 def extract_volume_pages(
     docs_dir: Path,
     images_dir: Path,
+    ingest: bool = True,
 ) -> dict:
     """Extract pages from all document PDFs in a volume.
 
-    Processes PDFs in sorted filename order with continuous page numbering.
+    Processes PDFs in sorted filename order with continuous page numbering,
+    then ingests the images into the volume's PageStore (images_dir.parent)
+    so repeated pages are stored and OCR'd once.
 
     Args:
         docs_dir: Directory containing document PDFs.
         images_dir: Directory to save extracted images.
+        ingest: Ingest into the PageStore. Callers that extract into a
+            per-document images_dir/{doc_id} ingest it themselves.
 
     Returns:
-        Dict with total_pages and doc_page_map (doc_id -> [start, end] pages).
+        Dict with total_pages, unique_pages (if ingested) and doc_page_map
+        (doc_id -> [start, end] pages).
     """
     pdf_files = sorted(f for f in docs_dir.iterdir() if f.suffix.lower() == ".pdf")
 
@@ -90,4 +99,7 @@ def extract_volume_pages(
         current_page += num_pages
 
     total_pages = current_page - 1
-    return {"total_pages": total_pages, "doc_page_map": doc_page_map}
+    result = {"total_pages": total_pages, "doc_page_map": doc_page_map}
+    if ingest:
+        result["unique_pages"] = PageStore(images_dir.parent).ingest()["unique"]
+    return result
@@ -1,5 +1,7 @@
 # src/ocr/gemini_ocr.py
 """Send page images to Gemini Vision for OCR transcription."""
+import hashlib
+import io
 import json
 import re
 from datetime import datetime, timezone
@@ -7,7 +9,52 @@ from pathlib import Path
 
 from PIL import Image
 
-from src.ocr.config import OCR_PROMPTS, OCR_PROMPT, GEMINI_MODEL
+from src.ocr.cache import ResponseCache
+from src.ocr.config import (
+    GEMINI_MODEL,
+    IMAGE_QUALITY,
+    OCR_MAX_IMAGE_EDGE,
+    OCR_OUTPUT_TOKENS,
+    OCR_PROMPT,
+    OCR_PROMPTS,
+)
+from src.ocr.rate_limit import (
+    GeminiRateLimiter,
+    estimate_image_tokens,
+    estimate_text_tokens,
+    is_rate_limited,
+    usage_tokens,
+)
+
+# Formats Gemini accepts as inline image data
+INLINE_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
+
+
+def load_image_part(image: Path | bytes, max_edge: int = OCR_MAX_IMAGE_EDGE) -> dict:
+    """Inline image part ({"mime_type", "data"}) for a Gemini request.
+
+    image is a path or the file's bytes. The file's own bytes are sent
+    unchanged: PIL only reads the header for the format and size. The image
+    is decoded and re-encoded as JPEG only if its long edge exceeds
+    max_edge (0 = never) or its format can't be sent inline.
+    """
+    data = image if isinstance(image, bytes) else Path(image).read_bytes()
+    with Image.open(io.BytesIO(data)) as img:
+        mime_type = Image.MIME.get(img.format)
+        if mime_type in INLINE_MIME_TYPES and not (max_edge and max(img.size) > max_edge):
+            return {"mime_type": mime_type, "data": data}
+
+        img = img.convert("RGB")
+        if max_edge:
+            img.thumbnail((max_edge, max_edge))
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=IMAGE_QUALITY)
+        return {"mime_type": "image/jpeg", "data": buf.getvalue()}
+
+
+def count_illegible(text: str) -> int:
+    """Number of [illegible] markers in a transcription."""
+    return len(re.findall(r"\[illegible\]", text, re.IGNORECASE))
 
 
 def build_page_metadata(
@@ -18,7 +65,7 @@ def build_page_metadata(
     model: str,
 ) -> dict:
     """Build metadata dict for an OCR'd page."""
-    illegible_count = len(re.findall(r"\[illegible\]", text, re.IGNORECASE))
+    illegible_count = count_illegible(text)
     return {
         "page_num": page_num,
         "volume_id": volume_id,
@@ -30,6 +77,34 @@ def build_page_metadata(
     }
 
 
+def save_page_output(
+    output_dir: Path,
+    page_num: int,
+    volume_id: str,
+    source_document: str,
+    text: str,
+    prompt_key: str = "general",
+) -> None:
+    """Write a transcription as page_NNNN.txt plus its page_NNNN.json metadata."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Save plain text
+    txt_path = output_dir / f"page_{page_num:04d}.txt"
+    txt_path.write_text(text, encoding="utf-8")
+
+    # Save metadata JSON
+    metadata = build_page_metadata(
+        page_num=page_num,
+        volume_id=volume_id,
+        source_document=source_document,
+        text=text,
+        model=GEMINI_MODEL,
+    )
+    metadata["prompt_key"] = prompt_key
+    json_path = output_dir / f"page_{page_num:04d}.json"
+    json_path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+
+
 async def ocr_single_page(
     model,
     image_path: Path,
@@ -38,6 +113,8 @@ async def ocr_single_page(
     source_document: str,
     output_dir: Path,
     prompt_key: str = "general",
+    cache: ResponseCache | None = None,
+    limiter: GeminiRateLimiter | None = None,
 ) -> bool:
     """Run Gemini Vision OCR on a single page image.
 
@@ -49,6 +126,8 @@ async def ocr_single_page(
         source_document: Source document ID (e.g., "GALE_AAA111").
         output_dir: Directory to save .txt and .json output.
         prompt_key: Which prompt variant to use (general/tabular/handwritten).
+        cache: Response cache; a hit skips the API call.
+        limiter: Shared RPM/TPM budget the request is paced by.
 
     Returns:
         True on success, False on failure.
@@ -57,28 +136,34 @@ async def ocr_single_page(
 
     try:
         prompt = OCR_PROMPTS.get(prompt_key, OCR_PROMPT)
-        img = Image.open(image_path)
-        response = await model.generate_content_async([prompt, img])
-        text = response.text
-
-        # Save plain text
-        txt_path = output_dir / f"page_{page_num:04d}.txt"
-        txt_path.write_text(text, encoding="utf-8")
-
-        # Save metadata JSON
-        metadata = build_page_metadata(
-            page_num=page_num,
-            volume_id=volume_id,
-            source_document=source_document,
-            text=text,
-            model=GEMINI_MODEL,
-        )
-        metadata["prompt_key"] = prompt_key
-        json_path = output_dir / f"page_{page_num:04d}.json"
-        json_path.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+        data = Path(image_path).read_bytes()  # read once for the cache key, request and estimate
+        text = cache_key = None
+        if cache is not None:
+            cache_key = ResponseCache.key(
+                "ocr", model, prompt, hashlib.sha256(data).hexdigest(), max_edge=OCR_MAX_IMAGE_EDGE,
+            )
+            text = cache.get(cache_key)
+        if text is None:
+            image = load_image_part(data)
+            if limiter is not None:
+                estimate = (
+                    estimate_image_tokens(data)
+                    + estimate_text_tokens(prompt)
+                    + OCR_OUTPUT_TOKENS
+                )
+                await limiter.acquire(estimate)
+            response = await model.generate_content_async([prompt, image])
+            text = response.text
+            if limiter is not None:
+                limiter.settle(estimate, usage_tokens(response))
+            if cache is not None:
+                cache.put(cache_key, text)
 
+        save_page_output(output_dir, page_num, volume_id, source_document, text, prompt_key)
         return True
 
     except Exception as e:
+        if limiter is not None and is_rate_limited(e):
+            limiter.throttled(e)
         print(f"  OCR failed for page {page_num}: {e}")
         return False
@@ -1,28 +1,223 @@
 # src/ocr/manifest.py
-"""OCR progress tracking via manifest files."""
+"""OCR progress tracking via manifest files.
+
+Progress lives in ocr_manifest.sqlite (see src.manifest_db) while a pipeline
+runs; ocr_manifest.json is exported from it for compatibility and is imported
+the first time the database is created.
+"""
 import json
+from collections import Counter
 from pathlib import Path
 
+from src.manifest_db import ManifestDB, db_path_for, write_json_atomic
 
-def load_ocr_manifest(path: Path) -> dict:
-    """Load OCR manifest from JSON, or return empty manifest."""
-    if path.exists():
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
+PAGE = "page"
+CORRECTION = "correction"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"  # correction pre-filtered; the error column holds the reason
+
+# Set once an int page key is recorded (flat layout via update_manifest_page);
+# the database stores keys as text, so to_dict() turns those back into ints
+INT_KEYS = "int_page_keys"
+
+DERIVED_KEYS = (
+    "completed_pages", "failed_pages", "corrected_pages", "failed_corrections",
+    "skipped_corrections", "correction_skip_counts",
+)
+
+
+def _empty_manifest() -> dict:
     return {
         "volume_id": "",
         "total_pages": 0,
         "completed_pages": [],
         "failed_pages": [],
+        "corrected_pages": [],
+        "failed_corrections": [],
+        "skipped_corrections": [],
+        "correction_skip_counts": {},
         "doc_page_map": {},
     }
 
 
+class OcrManifest:
+    """Page-level OCR (and post-correction) progress in SQLite with O(1) completion checks.
+
+    Use as a context manager; call export_json() to refresh the JSON copy.
+    """
+
+    def __init__(self, json_path: Path):
+        self.json_path = json_path
+        db_file = db_path_for(json_path)
+        fresh = not db_file.exists()
+        self.db = ManifestDB(db_file)
+        if fresh and json_path.exists():
+            with open(json_path, encoding="utf-8") as f:
+                self.replace(json.load(f))
+        self.total_pages = self.db.get_meta("total_pages", 0)
+        self._int_keys = self.db.get_meta(INT_KEYS, False)
+
+    def __enter__(self) -> "OcrManifest":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def set_volume(self, volume_id: str, total_pages: int) -> None:
+        self.db.set_meta("volume_id", volume_id)
+        self.db.set_meta("total_pages", total_pages)
+        self.total_pages = total_pages
+
+    def is_completed(self, page_key) -> bool:
+        return self.db.status(PAGE, page_key) == DONE
+
+    def completed_keys(self) -> set[str]:
+        return {key for key, _ in self.db.items(PAGE, DONE)}
+
+    @property
+    def completed_count(self) -> int:
+        return self.db.count(PAGE, DONE)
+
+    @property
+    def failed_count(self) -> int:
+        return self.db.count(PAGE, FAILED)
+
+    def _note_key_types(self, page_keys) -> None:
+        if not self._int_keys and any(isinstance(key, int) for key in page_keys):
+            self._int_keys = True
+            self.db.set_meta(INT_KEYS, True)
+
+    def _json_key(self, key: str) -> str | int:
+        """A stored key in the type it was recorded with."""
+        return int(key) if self._int_keys and key.isdigit() else key
+
+    def mark_page(self, page_key, success: bool, error: str = "") -> None:
+        """Record the result of a single page OCR (batched commit)."""
+        self._note_key_types([page_key])
+        self.db.mark(PAGE, page_key, DONE if success else FAILED, error)
+
+    def mark_pages(self, results: list[tuple[str, bool, str]]) -> None:
+        """Record (page_key, success, error) results in one transaction."""
+        self._note_key_types([page_key for page_key, _, _ in results])
+        self.db.mark_many(PAGE, [
+            (page_key, DONE if success else FAILED, error)
+            for page_key, success, error in results
+        ])
+
+    def corrected_keys(self) -> set[str]:
+        return {key for key, _ in self.db.items(CORRECTION, DONE)}
+
+    @property
+    def corrected_count(self) -> int:
+        return self.db.count(CORRECTION, DONE)
+
+    def mark_corrections(self, results: list[tuple[str, bool, str]]) -> None:
+        """Record (page_key, success, error) post-correction results in one transaction."""
+        self._note_key_types([page_key for page_key, _, _ in results])
+        self.db.mark_many(CORRECTION, [
+            (page_key, DONE if success else FAILED, error)
+            for page_key, success, error in results
+        ])
+
+    def skipped_correction_keys(self) -> set[str]:
+        return {key for key, _ in self.db.items(CORRECTION, SKIPPED)}
+
+    def correction_skip_reasons(self) -> dict[str, str]:
+        """Pre-filter reason per skipped page key."""
+        return dict(self.db.items(CORRECTION, SKIPPED))
+
+    def correction_skip_counts(self) -> dict[str, int]:
+        """Pages the correction pre-filter skipped, per reason."""
+        return dict(Counter(reason for _, reason in self.db.items(CORRECTION, SKIPPED)))
+
+    def mark_correction_skips(self, skips: list[tuple[str, str]]) -> None:
+        """Record (page_key, reason) for pages the correction pre-filter let through uncorrected."""
+        self._note_key_types([page_key for page_key, _ in skips])
+        self.db.mark_many(CORRECTION, [(page_key, SKIPPED, reason) for page_key, reason in skips])
+
+    def replace(self, data: dict) -> None:
+        """Overwrite the stored progress with a manifest dict."""
+        self.db.clear(PAGE)
+        self.db.clear(CORRECTION)
+        self._int_keys = False
+        self.db.set_meta(INT_KEYS, False)
+        for key, value in data.items():
+            if key not in DERIVED_KEYS:
+                self.db.set_meta(key, value)
+        for page_key in data.get("completed_pages", []):
+            self.mark_page(page_key, success=True)
+        # The JSON form keeps failures of pages that later succeeded; drop them
+        for failure in data.get("failed_pages", []):
+            if not self.is_completed(failure["page"]):
+                self.mark_page(failure["page"], success=False, error=failure.get("error", ""))
+        corrections = [(page_key, True, "") for page_key in data.get("corrected_pages", [])]
+        corrected = set(data.get("corrected_pages", []))
+        corrections += [
+            (failure["page"], False, failure.get("error", ""))
+            for failure in data.get("failed_corrections", [])
+            if failure["page"] not in corrected
+        ]
+        if corrections:
+            self.mark_corrections(corrections)
+        skips = [
+            (skip["page"], skip.get("reason", ""))
+            for skip in data.get("skipped_corrections", [])
+            if skip["page"] not in corrected
+        ]
+        if skips:
+            self.mark_correction_skips(skips)
+        self.total_pages = data.get("total_pages", 0)
+        self.db.flush()
+
+    def to_dict(self) -> dict:
+        """The manifest in its JSON form."""
+        manifest = _empty_manifest()
+        manifest.update(self.db.meta())
+        manifest.pop(INT_KEYS, None)
+        key = self._json_key
+        manifest["completed_pages"] = [key(k) for k, _ in self.db.items(PAGE, DONE)]
+        manifest["failed_pages"] = [
+            {"page": key(k), "error": error} for k, error in self.db.items(PAGE, FAILED)
+        ]
+        manifest["corrected_pages"] = [key(k) for k, _ in self.db.items(CORRECTION, DONE)]
+        manifest["failed_corrections"] = [
+            {"page": key(k), "error": error} for k, error in self.db.items(CORRECTION, FAILED)
+        ]
+        manifest["skipped_corrections"] = [
+            {"page": key(k), "reason": reason} for k, reason in self.db.items(CORRECTION, SKIPPED)
+        ]
+        manifest["correction_skip_counts"] = self.correction_skip_counts()
+        return manifest
+
+    def export_json(self) -> dict:
+        """Commit pending writes and rewrite ocr_manifest.json. Returns the dict."""
+        self.db.flush()
+        manifest = self.to_dict()
+        write_json_atomic(self.json_path, manifest)
+        return manifest
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def load_ocr_manifest(path: Path) -> dict:
+    """Load OCR manifest (SQLite if present, else JSON), or return empty manifest."""
+    if db_path_for(path).exists():
+        with OcrManifest(path) as manifest:
+            return manifest.to_dict()
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return _empty_manifest()
+
+
 def save_ocr_manifest(path: Path, data: dict) -> None:
-    """Save OCR manifest to JSON."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    """Save OCR manifest to JSON, keeping an existing SQLite manifest in sync."""
+    if db_path_for(path).exists():
+        with OcrManifest(path) as manifest:
+            manifest.replace(data)
+    write_json_atomic(path, data)
 
 
 def update_manifest_page(
@@ -34,7 +229,8 @@ def update_manifest_page(
     """Update manifest with result of a single page OCR.
 
     page_key is either an int (flat layout) or "doc_id/page_num" (per-doc).
-    Modifies manifest dict in-place.
+    Modifies manifest dict in-place. Long-running callers should use
+    OcrManifest.mark_page() instead, which doesn't scan completed_pages.
     """
     # Normalize to consistent type for comparison
     key = str(page_key) if not isinstance(page_key, int) else page_key
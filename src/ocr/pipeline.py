@@ -5,12 +5,30 @@ Coordinates page image extraction and Gemini Vision OCR
 with configurable concurrency and resume support.
 """
 import asyncio
+import json
+import shutil
+import signal
+from concurrent.futures import Future
+from contextlib import suppress
 from pathlib import Path
 
-from src.ocr.config import GEMINI_API_KEY, GEMINI_MODEL, OCR_CONCURRENCY, OCR_MAX_RETRIES, OCR_RETRY_BACKOFF
-from src.ocr.correct import correct_single_page
+from src.ocr.cache import ResponseCache
+from src.ocr.classify import AUTO_PROMPT, PromptRouter
+from src.ocr.config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    OCR_CHECKPOINT_BATCH,
+    OCR_CHECKPOINT_INTERVAL,
+    OCR_CONCURRENCY,
+    OCR_CORRECT_CONCURRENCY,
+    OCR_MAX_RETRIES,
+    OCR_RETRY_BACKOFF,
+)
+from src.ocr.correct import CorrectionBatcher, CorrectionFilter
 from src.ocr.gemini_ocr import ocr_single_page
-from src.ocr.manifest import load_ocr_manifest, save_ocr_manifest, update_manifest_page
+from src.ocr.manifest import CORRECTION, PAGE, SKIPPED, OcrManifest, load_ocr_manifest
+from src.ocr.rate_limit import GeminiRateLimiter
+from src.page_store import PageStore
 
 
 def get_gemini_model():
@@ -20,45 +38,244 @@ def get_gemini_model():
     return genai.GenerativeModel(GEMINI_MODEL)
 
 
-def _discover_pages(images_dir: Path) -> list[dict]:
+def _local_page_images(images_dir: Path) -> list[Path]:
+    """page_*.jpg files in per-document subdirs, else in the flat layout."""
+    if not images_dir.exists():
+        return []
+    subdirs = sorted(
+        d for d in images_dir.iterdir()
+        if d.is_dir() and list(d.glob("page_*.jpg"))
+    )
+    if subdirs:
+        return [img_path for doc_dir in subdirs for img_path in sorted(doc_dir.glob("page_*.jpg"))]
+    return sorted(images_dir.glob("page_*.jpg"))
+
+
+def _discover_pages(images_dir: Path, image_paths: list[Path] | None = None) -> list[dict]:
     """Discover page images in per-document subdirs or flat layout.
 
-    Returns list of dicts: {image_path, page_num, doc_id, page_key}.
+    Returns list of dicts: {image_path, page_num, doc_id, page_key, content_hash}.
     page_key is a unique identifier for manifest tracking:
     - Per-doc: "GALE_AAA111/3" (doc_id + page_num)
     - Flat: "3" (just page_num, as string for consistency)
+
+    Pages indexed in the volume's PageStore resolve to their blob, with
+    content_hash set to its SHA-256; otherwise content_hash is None.
+
+    image_paths lists pages that may not exist yet (still downloading);
+    indexed ones then resolve to their blob path from the index alone.
     """
     entries = []
+    store = PageStore(images_dir.parent)
+    expected = image_paths is not None
+    if not expected:
+        image_paths = _local_page_images(images_dir)
+
+    for img_path in image_paths:
+        relative = img_path.relative_to(images_dir)
+        doc_id = relative.parent.as_posix() if relative.parent.parts else ""
+        page_num = int(img_path.stem.split("_")[1])
+        if expected:
+            content_hash = store.lookup(doc_id, page_num)
+            image_path = store.blob_path(content_hash) if content_hash else img_path
+        else:
+            image_path, content_hash = store.resolve_image(img_path)
+        entries.append({
+            "image_path": image_path,
+            "page_num": page_num,
+            "doc_id": doc_id,
+            "page_key": f"{doc_id}/{page_num}" if doc_id else str(page_num),
+            "content_hash": content_hash,
+        })
 
-    # Check for per-document subdirectories first
-    subdirs = sorted(
-        d for d in images_dir.iterdir()
-        if d.is_dir() and list(d.glob("page_*.jpg"))
-    ) if images_dir.exists() else []
+    return entries
 
-    if subdirs:
-        for doc_dir in subdirs:
-            doc_id = doc_dir.name
-            for img_path in sorted(doc_dir.glob("page_*.jpg")):
-                page_num = int(img_path.stem.split("_")[1])
-                entries.append({
-                    "image_path": img_path,
-                    "page_num": page_num,
-                    "doc_id": doc_id,
-                    "page_key": f"{doc_id}/{page_num}",
-                })
-    else:
-        # Flat layout fallback
-        for img_path in sorted(images_dir.glob("page_*.jpg")):
-            page_num = int(img_path.stem.split("_")[1])
-            entries.append({
-                "image_path": img_path,
-                "page_num": page_num,
-                "doc_id": "",
-                "page_key": str(page_num),
-            })
 
-    return entries
+def _ocr_output_dir(ocr_dir: Path, entry: dict) -> Path:
+    """OCR output directory for a page entry (per-doc subdir or flat)."""
+    return ocr_dir / entry["doc_id"] if entry["doc_id"] else ocr_dir
+
+
+def _split_duplicates(page_entries: list[dict]) -> tuple[list[dict], list[tuple[dict, dict]]]:
+    """Split entries into unique images and (duplicate, first-seen source) pairs.
+
+    Only entries with a content_hash (indexed in the PageStore) can be duplicates.
+    """
+    first_seen: dict[str, dict] = {}
+    unique = []
+    duplicates = []
+    for entry in page_entries:
+        content_hash = entry.get("content_hash")
+        if content_hash and content_hash in first_seen:
+            duplicates.append((entry, first_seen[content_hash]))
+            continue
+        if content_hash:
+            first_seen[content_hash] = entry
+        unique.append(entry)
+    return unique, duplicates
+
+
+def _copy_duplicate_ocr(entry: dict, source: dict, ocr_dir: Path) -> bool:
+    """Reuse the OCR output of an identical image for a duplicate page.
+
+    Copies page_NNNN.txt (and .raw.txt if present) and rewrites the metadata
+    JSON with the duplicate's page_num/source_document plus duplicate_of.
+    Returns False if the source page has no output yet.
+    """
+    src_dir = _ocr_output_dir(ocr_dir, source)
+    src_stem = f"page_{source['page_num']:04d}"
+    if not (src_dir / f"{src_stem}.txt").exists():
+        return False
+
+    dst_dir = _ocr_output_dir(ocr_dir, entry)
+    dst_stem = f"page_{entry['page_num']:04d}"
+    dst_dir.mkdir(parents=True, exist_ok=True)
+
+    for suffix in (".txt", ".raw.txt"):
+        src = src_dir / f"{src_stem}{suffix}"
+        if src.exists():
+            shutil.copyfile(src, dst_dir / f"{dst_stem}{suffix}")
+
+    src_json = src_dir / f"{src_stem}.json"
+    metadata = json.loads(src_json.read_text(encoding="utf-8")) if src_json.exists() else {}
+    metadata.update({
+        "page_num": entry["page_num"],
+        "source_document": entry["doc_id"],
+        "duplicate_of": source["page_key"],
+    })
+    (dst_dir / f"{dst_stem}.json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    return True
+
+
+class CheckpointWriter:
+    """Background task that batches page results into the OCR manifest.
+
+    record() (and record_correction() / skip_correction() for the
+    post-correction stage) only queues the result, so OCR coroutines never
+    touch the disk.
+    The writer commits everything queued as one manifest transaction, in a
+    worker thread, every `interval` seconds or as soon as `batch_size`
+    results are waiting. Use as an async context manager: leaving it (also
+    on cancellation, Ctrl-C or SIGTERM) flushes whatever is still queued.
+    """
+
+    def __init__(
+        self,
+        manifest: OcrManifest,
+        interval: float = OCR_CHECKPOINT_INTERVAL,
+        batch_size: int = OCR_CHECKPOINT_BATCH,
+    ):
+        self.manifest = manifest
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self.completed = manifest.completed_count
+        self.corrected = manifest.corrected_count
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._due = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._signal_installed = False
+
+    async def __aenter__(self) -> "CheckpointWriter":
+        self._task = asyncio.create_task(self._run())
+        self._install_sigterm(asyncio.current_task())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def record(self, page_key: str, success: bool, error: str = "") -> None:
+        """Queue one page result; never blocks."""
+        if success:
+            self.completed += 1
+        self._put((PAGE, page_key, success, error))
+
+    def record_correction(self, page_key: str, success: bool, error: str = "") -> None:
+        """Queue one page's post-correction result; never blocks."""
+        if success:
+            self.corrected += 1
+        self._put((CORRECTION, page_key, success, error))
+
+    def skip_correction(self, page_key: str, reason: str) -> None:
+        """Queue a page the correction pre-filter kept from the model; never blocks."""
+        self._put((SKIPPED, page_key, reason))
+
+    def _put(self, result: tuple) -> None:
+        self._queue.put_nowait(result)
+        if self._queue.qsize() >= self.batch_size:
+            self._due.set()
+
+    async def flush(self) -> None:
+        """Commit every queued result now."""
+        async with self._write_lock:
+            batches: dict[str, list[tuple]] = {PAGE: [], CORRECTION: [], SKIPPED: []}
+            while not self._queue.empty():
+                kind, *result = self._queue.get_nowait()
+                batches[kind].append(tuple(result))
+            writers = {
+                PAGE: self.manifest.mark_pages,
+                CORRECTION: self.manifest.mark_corrections,
+                SKIPPED: self.manifest.mark_correction_skips,
+            }
+            for kind, batch in batches.items():
+                if batch:
+                    await asyncio.to_thread(writers[kind], batch)
+
+    async def close(self) -> None:
+        """Stop the writer task and flush what is left."""
+        self._remove_sigterm()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._due.wait(), self.interval)
+            self._due.clear()
+            await self.flush()
+
+    def _install_sigterm(self, owner: asyncio.Task | None) -> None:
+        # SIGINT already cancels the main task under asyncio.run(); make
+        # SIGTERM do the same so __aexit__ gets to flush
+        if owner is None:
+            return
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, owner.cancel)
+        except (NotImplementedError, RuntimeError, ValueError):
+            return  # Windows or not on the main thread
+        self._signal_installed = True
+
+    def _remove_sigterm(self) -> None:
+        if self._signal_installed:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGTERM)
+            self._signal_installed = False
+
+
+async def _copy_duplicates(
+    checkpoint: CheckpointWriter,
+    duplicates: list[tuple[dict, dict]],
+    ocr_dir: Path,
+    volume_id: str,
+) -> None:
+    """Give each pending duplicate page the OCR output of its completed source."""
+    manifest = checkpoint.manifest
+    pending = [
+        (entry, source) for entry, source in duplicates
+        if not manifest.is_completed(entry["page_key"])
+    ]
+    if not pending:
+        return
+    await checkpoint.flush()
+    reused = 0
+    for entry, source in pending:
+        if manifest.is_completed(source["page_key"]) and _copy_duplicate_ocr(entry, source, ocr_dir):
+            checkpoint.record(entry["page_key"], success=True)
+            reused += 1
+    print(f"[{volume_id}] Reused OCR for {reused}/{len(pending)} duplicate pages")
 
 
 async def _ocr_with_retry(
@@ -69,15 +286,38 @@ async def _ocr_with_retry(
     volume_id: str,
     source_document: str,
     output_dir: Path,
-    manifest: dict,
-    manifest_path: Path,
+    checkpoint: CheckpointWriter,
     page_key: str = "",
     prompt_key: str = "general",
-) -> None:
-    """OCR a single page with retries and concurrency control."""
+    ready: Future | None = None,
+    cache: ResponseCache | None = None,
+    limiter: GeminiRateLimiter | None = None,
+    router: PromptRouter | None = None,
+) -> bool:
+    """OCR a single page with retries, concurrency and rate control.
+
+    ready is the page image's pending download, awaited before taking a
+    concurrency slot. With a router, prompt_key is replaced by the prompt
+    it picks for this page. limiter paces each attempt against the RPM/TPM
+    budget; after a 429 it holds every caller back, so the retry backoff
+    here only covers other failures.
+
+    Returns True once the page is transcribed.
+    """
     if not page_key:
         page_key = str(page_num)
 
+    if ready is not None:
+        try:
+            await asyncio.wrap_future(ready)
+        except Exception as e:
+            checkpoint.record(page_key, success=False, error=f"download failed: {e}")
+            print(f"  [{volume_id}] {page_key} FAILED: image download failed")
+            return False
+
+    if router is not None:
+        prompt_key = await asyncio.to_thread(router.route, image_path, source_document, page_num)
+
     async with semaphore:
         last_error = ""
         for attempt in range(1, OCR_MAX_RETRIES + 1):
@@ -89,33 +329,24 @@ async def _ocr_with_retry(
                 source_document=source_document,
                 output_dir=output_dir,
                 prompt_key=prompt_key,
+                cache=cache,
+                limiter=limiter,
             )
             if success:
-                update_manifest_page(manifest, page_key, success=True)
-                save_ocr_manifest(manifest_path, manifest)
-                completed = len(manifest["completed_pages"])
-                total = manifest["total_pages"]
+                checkpoint.record(page_key, success=True)
+                completed = checkpoint.completed
+                total = checkpoint.manifest.total_pages
                 print(f"  [{volume_id}] {page_key} done ({completed}/{total})")
-                return
+                return True
 
             last_error = f"attempt {attempt} failed"
             if attempt < OCR_MAX_RETRIES:
                 wait = OCR_RETRY_BACKOFF ** attempt
                 await asyncio.sleep(wait)
 
-        update_manifest_page(manifest, page_key, success=False, error=last_error)
-        save_ocr_manifest(manifest_path, manifest)
+        checkpoint.record(page_key, success=False, error=last_error)
         print(f"  [{volume_id}] {page_key} FAILED after {OCR_MAX_RETRIES} attempts")
-
-
-async def _correct_with_semaphore(
-    semaphore: asyncio.Semaphore,
-    model,
-    txt_path: Path,
-) -> None:
-    """Run correction on a single page with concurrency control."""
-    async with semaphore:
-        await correct_single_page(model, txt_path)
+        return False
 
 
 async def run_ocr_pipeline(
@@ -124,6 +355,11 @@ async def run_ocr_pipeline(
     concurrency: int = OCR_CONCURRENCY,
     correct: bool = False,
     prompt_key: str = "general",
+    download=None,
+    cache: ResponseCache | None = None,
+    limiter: GeminiRateLimiter | None = None,
+    correct_concurrency: int = OCR_CORRECT_CONCURRENCY,
+    prefilter: bool = True,
 ) -> dict:
     """Run OCR pipeline on all page images in a volume directory.
 
@@ -134,101 +370,216 @@ async def run_ocr_pipeline(
     Writes output mirroring input structure:
     - Per-document: volume_dir/ocr/{doc_id}/page_NNNN.{txt,json}
     - Flat: volume_dir/ocr/page_NNNN.{txt,json}
+
+    Page results are queued to a CheckpointWriter, which commits them to
+    ocr_manifest.sqlite in batches; ocr_manifest.json is exported when the
+    run finishes.
+
+    prompt_key "auto" picks the prompt per page with a PromptRouter
+    (Gale baseline text in volume_dir/text, else the image); the key used
+    is recorded in each page's JSON.
+
+    With correct=True, each page is post-corrected as soon as its OCR
+    completes, so the two stages overlap. OCR holds at most `concurrency`
+    requests in flight and correction at most `correct_concurrency`;
+    correction results are tracked in the manifest (corrected_pages /
+    failed_corrections), and a re-run corrects completed pages that were
+    not corrected yet. With prefilter, a CorrectionFilter keeps pages that
+    look clean, mostly illegible or tabular from the correction model; they
+    are listed as skipped_corrections, and the thresholds used are stored
+    as correction_filter.
+
+    With a started src.gcs_download.VolumeDownload, pages are taken from
+    its listing and each is OCR'd as soon as its image has downloaded.
+
+    With a ResponseCache, pages (and corrections) whose image, prompt and
+    model were seen before reuse the cached response.
+
+    OCR and correction requests share one GeminiRateLimiter (a default
+    one from GEMINI_RPM / GEMINI_TPM unless given), so the run stays just
+    under quota instead of bouncing off 429s.
     """
     images_dir = volume_dir / "images"
     ocr_dir = volume_dir / "ocr"
     manifest_path = volume_dir / "ocr_manifest.json"
 
     # Discover all page images (per-doc subdirs or flat)
-    page_entries = _discover_pages(images_dir)
+    page_entries = _discover_pages(images_dir, download.pages if download else None)
     if not page_entries:
         print(f"[{volume_id}] No images found in {images_dir}")
         return load_ocr_manifest(manifest_path)
 
-    # Load or create manifest
-    manifest = load_ocr_manifest(manifest_path)
-    manifest["volume_id"] = volume_id
-    manifest["total_pages"] = len(page_entries)
+    with OcrManifest(manifest_path) as manifest:
+        manifest.set_volume(volume_id, len(page_entries))
+        async with CheckpointWriter(manifest) as checkpoint:
+            await _run_pages(
+                checkpoint, page_entries, ocr_dir, volume_id, concurrency, correct, prompt_key,
+                download.futures if download else {}, cache,
+                limiter or GeminiRateLimiter(), correct_concurrency,
+                CorrectionFilter() if prefilter else None,
+            )
+        result = await asyncio.to_thread(manifest.export_json)
+
+    completed = len(result["completed_pages"])
+    failed = len(result["failed_pages"])
+    print(f"[{volume_id}] OCR complete: {completed} done, {failed} failed")
+    return result
+
+
+async def _run_pages(
+    checkpoint: CheckpointWriter,
+    page_entries: list[dict],
+    ocr_dir: Path,
+    volume_id: str,
+    concurrency: int,
+    correct: bool,
+    prompt_key: str,
+    downloads: dict[Path, Future] | None = None,
+    cache: ResponseCache | None = None,
+    limiter: GeminiRateLimiter | None = None,
+    correct_concurrency: int = OCR_CORRECT_CONCURRENCY,
+    prefilter: CorrectionFilter | None = None,
+) -> None:
+    """OCR (and optionally correct) every page not yet completed in the manifest.
+
+    Corrections go through a CorrectionBatcher, so pages finishing OCR
+    around the same time share requests.
+
+    downloads maps image paths still being fetched to their Futures.
+    Pages the prefilter rejects are recorded as skipped corrections; without
+    a prefilter, pages skipped on an earlier run are corrected too.
+    """
+    downloads = downloads or {}
+    manifest = checkpoint.manifest
+
+    # Identical images (same PageStore hash) are OCR'd once; duplicates reuse it
+    unique_entries, duplicates = _split_duplicates(page_entries)
 
-    # Determine which pages still need OCR
-    completed = set(manifest["completed_pages"])
+    # Determine which pages still need OCR, and which OCR'd pages still need correction
+    completed = manifest.completed_keys()
+    corrected = manifest.corrected_keys() if correct else set()
+    if prefilter is not None:
+        corrected |= manifest.skipped_correction_keys()
     pages_to_process = [
-        entry for entry in page_entries
+        entry for entry in unique_entries
         if entry["page_key"] not in completed
     ]
+    pages_to_correct = [
+        entry for entry in unique_entries
+        if correct and entry["page_key"] in completed and entry["page_key"] not in corrected
+    ]
+    duplicates_pending = [
+        (entry, source) for entry, source in duplicates
+        if entry["page_key"] not in completed
+        or (correct and entry["page_key"] not in corrected)
+    ]
 
-    if not pages_to_process:
+    if not pages_to_process and not pages_to_correct and not duplicates_pending:
         print(f"[{volume_id}] All {len(page_entries)} pages already OCR'd")
-        return manifest
+        return
 
     print(f"[{volume_id}] Processing {len(pages_to_process)} pages "
-          f"({len(completed)} already done, concurrency={concurrency})")
+          f"({len(completed)} already done, {len(duplicates_pending)} duplicate images, "
+          f"concurrency={concurrency})")
+    if correct:
+        print(f"[{volume_id}] Correcting pages as their OCR completes "
+              f"({len(pages_to_correct)} OCR'd earlier, correct_concurrency={correct_concurrency})")
 
     model = get_gemini_model()
     semaphore = asyncio.Semaphore(concurrency)
+    router = PromptRouter(ocr_dir.parent / "text") if prompt_key == AUTO_PROMPT else None
+    batcher = CorrectionBatcher(model, asyncio.Semaphore(correct_concurrency), cache, limiter)
+    if correct and prefilter is not None:
+        manifest.db.set_meta("correction_filter", prefilter.thresholds())
+
+    async def correct_entry(entry: dict) -> None:
+        txt_path = _ocr_output_dir(ocr_dir, entry) / f"page_{entry['page_num']:04d}.txt"
+        if prefilter is not None and txt_path.exists():
+            text = await asyncio.to_thread(txt_path.read_text, encoding="utf-8")
+            reason = prefilter.skip_reason(text)
+            if reason is not None:
+                checkpoint.skip_correction(entry["page_key"], reason)
+                return
+        success = await batcher.correct(txt_path)
+        checkpoint.record_correction(entry["page_key"], success, "" if success else "correction failed")
 
-    tasks = [
-        _ocr_with_retry(
+    async def ocr_entry(entry: dict) -> None:
+        success = await _ocr_with_retry(
             semaphore=semaphore,
             model=model,
             image_path=entry["image_path"],
             page_num=entry["page_num"],
             volume_id=volume_id,
             source_document=entry["doc_id"],
-            output_dir=ocr_dir / entry["doc_id"] if entry["doc_id"] else ocr_dir,
-            manifest=manifest,
-            manifest_path=manifest_path,
+            output_dir=_ocr_output_dir(ocr_dir, entry),
+            checkpoint=checkpoint,
             page_key=entry["page_key"],
             prompt_key=prompt_key,
+            ready=downloads.get(entry["image_path"]),
+            cache=cache,
+            limiter=limiter,
+            router=router,
+        )
+        # The OCR slot is released by now; correction runs on its own budget
+        if success and correct:
+            await correct_entry(entry)
+
+    async with batcher:
+        await asyncio.gather(
+            *(ocr_entry(entry) for entry in pages_to_process),
+            *(correct_entry(entry) for entry in pages_to_correct),
         )
-        for entry in pages_to_process
-    ]
 
-    await asyncio.gather(*tasks)
+        if router is not None:
+            print(f"[{volume_id}] Prompt routing: {router.summary()}")
+
+        # Sources are corrected by now, so copies carry the corrected text and .raw.txt
+        await _copy_duplicates(checkpoint, duplicates_pending, ocr_dir, volume_id)
+
+        if correct:
+            await checkpoint.flush()
+            # A duplicate takes its source's correction result; only the rest are corrected
+            source_corrected = manifest.corrected_keys()
+            source_skipped = manifest.correction_skip_reasons()
+            uncorrected = []
+            for entry, source in duplicates_pending:
+                if not manifest.is_completed(entry["page_key"]):
+                    continue
+                if source["page_key"] in source_corrected:
+                    raw_path = _ocr_output_dir(ocr_dir, entry) / f"page_{entry['page_num']:04d}.raw.txt"
+                    if not raw_path.exists():
+                        # Copied before its source was corrected (on an earlier run)
+                        await asyncio.to_thread(_copy_duplicate_ocr, entry, source, ocr_dir)
+                    checkpoint.record_correction(entry["page_key"], success=True)
+                elif source["page_key"] in source_skipped:
+                    checkpoint.skip_correction(entry["page_key"], source_skipped[source["page_key"]])
+                else:
+                    uncorrected.append(entry)
+            await asyncio.gather(*(correct_entry(entry) for entry in uncorrected))
 
-    # Post-correction pass (optional)
     if correct:
-        print(f"[{volume_id}] Running post-correction pass...")
-        ocr_files = sorted(ocr_dir.rglob("page_*.txt"))
-        # Exclude .raw.txt backups
-        ocr_files = [f for f in ocr_files if not f.name.endswith(".raw.txt")]
-
-        correction_tasks = [
-            _correct_with_semaphore(semaphore, model, txt_path)
-            for txt_path in ocr_files
-        ]
-        await asyncio.gather(*correction_tasks)
-        print(f"[{volume_id}] Correction complete")
-
-    save_ocr_manifest(manifest_path, manifest)
-    completed = len(manifest["completed_pages"])
-    failed = len(manifest["failed_pages"])
-    print(f"[{volume_id}] OCR complete: {completed} done, {failed} failed")
-    return manifest
+        await checkpoint.flush()
+        skipped = ", ".join(
+            f"{n} {reason}" for reason, n in sorted(manifest.correction_skip_counts().items())
+        )
+        print(f"[{volume_id}] Correction complete ({checkpoint.corrected} pages corrected "
+              f"in {batcher.requests} requests{f'; skipped {skipped}' if skipped else ''})")
 
 
 def download_images_from_gcs(volume_id: str, local_dir: Path) -> int:
     """Download page images from GCS to local directory.
 
     Uses lazy import to avoid protobuf issues on Python 3.14.
-    Skips files that already exist locally.
+    Downloads run concurrently and keep the images/{doc_id}/ layout;
+    files whose size and MD5 already match are skipped.
     Returns count of files downloaded.
-    """
-    from src.gcs_upload import get_bucket
-    bucket = get_bucket()
-    prefix = f"{volume_id}/images/"
 
-    local_dir.mkdir(parents=True, exist_ok=True)
-    count = 0
-    for blob in bucket.list_blobs(prefix=prefix):
-        filename = blob.name.split("/")[-1]
-        if not filename:
-            continue
-        local_path = local_dir / filename
-        if not local_path.exists():
-            blob.download_to_filename(str(local_path))
-            count += 1
-    return count
+    For volumes uploaded with a PageStore index, only the index and the
+    unique blobs are downloaded; images/ is then rebuilt as links to them.
+    """
+    from src.gcs_download import VolumeDownload
+    with VolumeDownload(volume_id, local_dir.parent) as download:
+        return download.wait()
 
 
 def upload_ocr_to_gcs(volume_id: str, ocr_dir: Path) -> int:
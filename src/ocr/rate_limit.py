@@ -0,0 +1,172 @@
+# src/ocr/rate_limit.py
+"""RPM/TPM-aware rate limiting for Gemini requests.
+
+An asyncio.Semaphore only bounds how many requests are in flight, so a fast
+run still overshoots the per-minute quotas and spends its time in 429
+backoff. GeminiRateLimiter paces requests with two token buckets, one for
+requests and one for tokens, refilled continuously at GEMINI_QUOTA_HEADROOM
+of GEMINI_RPM / GEMINI_TPM. Each OCR or correction call acquires its
+estimated token cost before it is sent:
+
+- page images are costed like Gemini does: 258 tokens for an image up to
+  384px, else 258 per 768x768 tile; text at ~4 characters per token
+- estimates are settled against response.usage_metadata when present
+- a 429 pauses every caller (Retry-After, else GEMINI_THROTTLE_PAUSE) and
+  empties the buckets, instead of each coroutine sleeping on its own
+"""
+import asyncio
+import io
+import math
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from src.ocr.config import (
+    GEMINI_BURST_SECONDS,
+    GEMINI_QUOTA_HEADROOM,
+    GEMINI_RPM,
+    GEMINI_THROTTLE_PAUSE,
+    GEMINI_TPM,
+    OCR_MAX_IMAGE_EDGE,
+)
+from src.rate_control import parse_retry_after
+
+IMAGE_TILE = 768
+IMAGE_TILE_TOKENS = 258
+SMALL_IMAGE_EDGE = 384
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Rough token count of text (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def estimate_image_tokens(image: Path | bytes, max_edge: int = OCR_MAX_IMAGE_EDGE) -> int:
+    """Tokens Gemini bills for an image (path or file bytes), from its header size (no decode)."""
+    with Image.open(io.BytesIO(image) if isinstance(image, bytes) else image) as img:
+        width, height = img.size
+    if max_edge and max(width, height) > max_edge:
+        scale = max_edge / max(width, height)
+        width, height = round(width * scale), round(height * scale)
+    if width <= SMALL_IMAGE_EDGE and height <= SMALL_IMAGE_EDGE:
+        return IMAGE_TILE_TOKENS
+    return IMAGE_TILE_TOKENS * math.ceil(width / IMAGE_TILE) * math.ceil(height / IMAGE_TILE)
+
+
+def usage_tokens(response) -> int | None:
+    """Total tokens reported in a response's usage_metadata, if any."""
+    total = getattr(getattr(response, "usage_metadata", None), "total_token_count", None)
+    return total if isinstance(total, int) else None
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True for a quota / 429 error from the Gemini SDK.
+
+    Decided from the exception type or its status code, never the message,
+    so an unrelated error that mentions 429 (a page number) doesn't count.
+    """
+    response = getattr(error, "response", None)
+    return (
+        type(error).__name__ in ("ResourceExhausted", "TooManyRequests")
+        or 429 in (getattr(error, "code", None), getattr(error, "status_code", None))
+        or getattr(response, "status_code", None) == 429
+    )
+
+
+class _Bucket:
+    """Continuously refilled token bucket that may go into debt."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """Seconds until cost (capped at capacity) is available."""
+        self._refill(now)
+        need = min(cost, self.capacity)
+        return 0.0 if self.level >= need else (need - self.level) / self.rate
+
+    def take(self, cost: float) -> None:
+        self.level = min(self.capacity, self.level - cost)
+
+
+class GeminiRateLimiter:
+    """Shared RPM/TPM budget for one event loop's Gemini calls.
+
+    rpm or tpm of 0 leaves that dimension unlimited.
+    """
+
+    def __init__(
+        self,
+        rpm: int = GEMINI_RPM,
+        tpm: int = GEMINI_TPM,
+        headroom: float = GEMINI_QUOTA_HEADROOM,
+        burst_seconds: float = GEMINI_BURST_SECONDS,
+    ):
+        self._requests = self._bucket(rpm, headroom, burst_seconds, minimum=1)
+        self._tokens = self._bucket(tpm, headroom, burst_seconds, minimum=1)
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.requests = 0
+        self.tokens = 0
+        self.throttled_count = 0
+
+    @staticmethod
+    def _bucket(per_minute: int, headroom: float, burst_seconds: float, minimum: float):
+        if not per_minute:
+            return None
+        rate = per_minute * headroom / 60
+        return _Bucket(rate, max(minimum, rate * burst_seconds))
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request costing `tokens` fits the budget, then spend it.
+
+        Callers are served in arrival order.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if self._requests:
+                    wait = max(wait, self._requests.wait_time(1, now))
+                if self._tokens:
+                    wait = max(wait, self._tokens.wait_time(tokens, now))
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            if self._requests:
+                self._requests.take(1)
+            if self._tokens:
+                self._tokens.take(tokens)
+            self.requests += 1
+            self.tokens += tokens
+
+    def settle(self, estimated: int, actual: int | None) -> None:
+        """Correct the token budget once a response reports its real usage."""
+        if actual is None or not self._tokens:
+            return
+        self._tokens.take(actual - estimated)
+        self.tokens += actual - estimated
+
+    def throttled(self, error: Exception | None = None) -> None:
+        """Back every caller off after a 429, honouring Retry-After if the error has one."""
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            retry_after = parse_retry_after(getattr(response, "headers", {}).get("Retry-After"))
+        pause = retry_after if retry_after is not None else GEMINI_THROTTLE_PAUSE
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + pause)
+        for bucket in (self._requests, self._tokens):
+            if bucket:
+                bucket.wait_time(0, now)  # bring the refill up to date before emptying
+                bucket.level = min(bucket.level, 0.0)
+        self.throttled_count += 1
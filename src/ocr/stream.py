@@ -0,0 +1,180 @@
+# src/ocr/stream.py
+"""Streaming scrape -> OCR pipeline.
+
+The batch flow scrapes a whole volume to disk (and GCS) before
+run_ocr_pipeline discovers its pages. Here scrape_volume runs in a worker
+thread and hands each finished document's pages to an asyncio queue that
+OCR workers consume directly, so the first transcriptions arrive seconds
+after scraping starts and wall time approaches max(scrape, OCR).
+
+- Backpressure: the queue holds at most OCR_STREAM_QUEUE pages; when OCR
+  falls behind, the scraper blocks before handing over the next document.
+- Checkpoints: the scraper commits manifest.sqlite per document and OCR
+  results go through a CheckpointWriter into ocr_manifest.sqlite. On a
+  re-run, pages already on disk are queued first (completed ones are
+  skipped) and the scraper resumes after its last finished document.
+- Shutdown: if a consumer fails or the run is cancelled, the other tasks
+  are cancelled and a scraper blocked on the full queue gives up within
+  STOP_POLL seconds.
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from src.ocr.cache import ResponseCache
+from src.ocr.classify import AUTO_PROMPT, PromptRouter
+from src.ocr.config import OCR_CONCURRENCY, OCR_STREAM_QUEUE
+from src.ocr.manifest import OcrManifest
+from src.ocr.rate_limit import GeminiRateLimiter
+from src.ocr.pipeline import (
+    CheckpointWriter,
+    _copy_duplicate_ocr,
+    _discover_pages,
+    _ocr_output_dir,
+    _ocr_with_retry,
+    get_gemini_model,
+)
+from src.scraper import scrape_volume
+
+STOP_POLL = 0.5  # seconds between stop checks while the scraper waits on a full queue
+
+
+async def run_stream_pipeline(
+    session: requests.Session,
+    volume_id: str,
+    doc_ids: list[str],
+    output_dir: Path,
+    concurrency: int = OCR_CONCURRENCY,
+    prompt_key: str = "general",
+    queue_size: int = OCR_STREAM_QUEUE,
+    cache: ResponseCache | None = None,
+    limiter: GeminiRateLimiter | None = None,
+    **scrape_options,
+) -> dict:
+    """Scrape a volume and OCR its pages as each document lands.
+
+    scrape_options are passed through to scrape_volume (resume,
+    max_workers, engine, adaptive, fetch, ...).
+
+    Returns the exported OCR manifest dict.
+    """
+    volume_dir = output_dir / volume_id
+    images_dir = volume_dir / "images"
+    ocr_dir = volume_dir / "ocr"
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    stopped = threading.Event()
+
+    def on_document(doc_id: str, doc_images_dir: Path) -> None:
+        # Runs on the scraper thread; blocks while the queue is full
+        for entry in _discover_pages(images_dir, sorted(doc_images_dir.glob("page_*.jpg"))):
+            if stopped.is_set():
+                raise RuntimeError("stream pipeline stopped")
+            future = asyncio.run_coroutine_threadsafe(queue.put(entry), loop)
+            while True:
+                try:
+                    future.result(timeout=STOP_POLL)
+                    break
+                except concurrent.futures.TimeoutError:
+                    if stopped.is_set():
+                        future.cancel()
+                        raise RuntimeError("stream pipeline stopped")
+
+    async def produce() -> None:
+        try:
+            for entry in _discover_pages(images_dir):
+                await queue.put(entry)
+            await asyncio.to_thread(
+                scrape_volume, session, volume_id, doc_ids, output_dir,
+                on_document=on_document, **scrape_options,
+            )
+        finally:
+            if not stopped.is_set():
+                for _ in range(concurrency):
+                    await queue.put(None)
+
+    started = time.monotonic()
+    first_done = None
+
+    with OcrManifest(volume_dir / "ocr_manifest.json") as manifest:
+        completed = manifest.completed_keys()
+        manifest.set_volume(volume_id, manifest.total_pages)
+        seen: set[str] = set()
+        # content hash -> (first page with that image, set once it is OCR'd)
+        sources: dict[str, tuple[dict, asyncio.Event]] = {}
+
+        async with CheckpointWriter(manifest) as checkpoint:
+            model = get_gemini_model()
+            semaphore = asyncio.Semaphore(concurrency)
+            limiter = limiter or GeminiRateLimiter()
+            router = PromptRouter(volume_dir / "text") if prompt_key == AUTO_PROMPT else None
+
+            async def ocr_entry(entry: dict) -> None:
+                content_hash = entry["content_hash"]
+                if content_hash in sources:
+                    source, source_done = sources[content_hash]
+                    await source_done.wait()
+                    if entry["page_key"] not in completed and _copy_duplicate_ocr(entry, source, ocr_dir):
+                        checkpoint.record(entry["page_key"], success=True)
+                    return
+
+                done = asyncio.Event()
+                if content_hash:
+                    sources[content_hash] = (entry, done)
+                try:
+                    if entry["page_key"] not in completed:
+                        await _ocr_with_retry(
+                            semaphore=semaphore,
+                            model=model,
+                            image_path=entry["image_path"],
+                            page_num=entry["page_num"],
+                            volume_id=volume_id,
+                            source_document=entry["doc_id"],
+                            output_dir=_ocr_output_dir(ocr_dir, entry),
+                            checkpoint=checkpoint,
+                            page_key=entry["page_key"],
+                            prompt_key=prompt_key,
+                            cache=cache,
+                            limiter=limiter,
+                            router=router,
+                        )
+                finally:
+                    done.set()
+
+            async def consume() -> None:
+                nonlocal first_done
+                while (entry := await queue.get()) is not None:
+                    if entry["page_key"] in seen:
+                        continue
+                    seen.add(entry["page_key"])
+                    manifest.total_pages = max(manifest.total_pages, len(seen))
+                    before = checkpoint.completed
+                    await ocr_entry(entry)
+                    if first_done is None and checkpoint.completed > before:
+                        first_done = time.monotonic() - started
+                        print(f"[{volume_id}] First page transcribed after {first_done:.1f}s")
+
+            tasks = [asyncio.ensure_future(produce())]
+            tasks += [asyncio.ensure_future(consume()) for _ in range(concurrency)]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # On failure or cancellation nothing drains the queue any more:
+                # stop the scraper and the remaining tasks instead of waiting on them
+                stopped.set()
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        manifest.set_volume(volume_id, max(manifest.total_pages, len(seen)))
+        result = await asyncio.to_thread(manifest.export_json)
+
+    elapsed = time.monotonic() - started
+    print(f"[{volume_id}] Stream complete in {elapsed:.1f}s: "
+          f"{len(result['completed_pages'])} pages transcribed, "
+          f"{len(result['failed_pages'])} failed")
+    return result
@@ -0,0 +1,197 @@
+# src/page_store.py
+"""
+Content-addressed store for page images.
+
+Page bytes are kept once per volume under blobs/{sha[:2]}/{sha256}.jpg.
+The per-document layout images/{doc_id}/page_NNNN.jpg (or the legacy flat
+images/page_NNNN.jpg) becomes a thin index over it:
+
+- page_index.json maps {doc_id: {page_num: sha256}} ("" for the flat layout)
+- each page file is a hardlink to its blob, so existing readers keep
+  working unchanged (where the filesystem can't link, pages are copies
+  and are treated as unindexed, giving up the dedup but not correctness)
+
+Blank or repeated folios therefore share one file on disk, one GCS object
+and one OCR request.
+"""
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+INDEX_NAME = "page_index.json"
+BLOBS_DIR = "blobs"
+
+
+def file_sha256(path: Path) -> str:
+    """Hex SHA-256 of a file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Hardlink src to dst, falling back to a copy if linking isn't supported."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _same_file(a: Path, b: Path) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def _page_num(path: Path) -> int:
+    """page_0012.jpg -> 12"""
+    return int(path.stem.split("_")[1])
+
+
+class PageStore:
+    """SHA-256 blob store plus page index for one volume directory."""
+
+    def __init__(self, volume_dir: Path):
+        self.volume_dir = volume_dir
+        self.images_dir = volume_dir / "images"
+        self.blobs_dir = volume_dir / BLOBS_DIR
+        self.index_path = volume_dir / INDEX_NAME
+        self.index: dict[str, dict[str, str]] = {}
+        if self.index_path.exists():
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    @property
+    def has_index(self) -> bool:
+        return bool(self.index)
+
+    def save(self) -> None:
+        """Write page_index.json atomically."""
+        self.volume_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(INDEX_NAME + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.index_path)
+
+    # -- paths -----------------------------------------------------------------
+
+    def blob_path(self, sha: str) -> Path:
+        return self.blobs_dir / sha[:2] / f"{sha}.jpg"
+
+    def page_path(self, doc_id: str, page_num: int) -> Path:
+        doc_dir = self.images_dir / doc_id if doc_id else self.images_dir
+        return doc_dir / f"page_{page_num:04d}.jpg"
+
+    def lookup(self, doc_id: str, page_num: int) -> str | None:
+        """SHA-256 recorded for a page, or None if it isn't indexed."""
+        return self.index.get(doc_id, {}).get(str(page_num))
+
+    def resolve(self, doc_id: str, page_num: int) -> Path | None:
+        """Blob holding a page's bytes, or None if not indexed or missing."""
+        sha = self.lookup(doc_id, page_num)
+        if sha is None:
+            return None
+        blob = self.blob_path(sha)
+        return blob if blob.exists() else None
+
+    def resolve_image(self, image_path: Path) -> tuple[Path, str | None]:
+        """Map an images/ page file to (blob path, sha), or (image_path, None).
+
+        A page file rewritten since it was ingested (no longer linked to its
+        blob) is not resolved, so stale index entries are never used.
+        """
+        try:
+            relative = image_path.relative_to(self.images_dir)
+        except ValueError:
+            return image_path, None
+        doc_id = relative.parent.as_posix() if relative.parent.parts else ""
+        sha = self.lookup(doc_id, _page_num(image_path))
+        if sha is None:
+            return image_path, None
+        blob = self.blob_path(sha)
+        if not blob.exists():
+            return image_path, None
+        if image_path.exists() and not _same_file(image_path, blob):
+            return image_path, None
+        return blob, sha
+
+    def is_indexed_page(self, path: Path) -> bool:
+        """True if path is an images/ page file whose bytes live in a blob."""
+        return self.resolve_image(path)[1] is not None
+
+    # -- ingest ----------------------------------------------------------------
+
+    def ingest_page(self, doc_id: str, page_num: int) -> bool:
+        """Move one page file's bytes into the store and index it.
+
+        The page file is replaced by a hardlink to its blob. Pages already
+        linked to their indexed blob are skipped without re-hashing.
+        Returns True if the bytes were new to the store.
+        """
+        page = self.page_path(doc_id, page_num)
+        sha = self.lookup(doc_id, page_num)
+        if sha and _same_file(page, self.blob_path(sha)):
+            return False
+
+        sha = file_sha256(page)
+        blob = self.blob_path(sha)
+        is_new = not blob.exists()
+        if is_new:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            _link_or_copy(page, blob)
+
+        if not _same_file(page, blob):
+            tmp = page.with_name(page.name + ".link")
+            tmp.unlink(missing_ok=True)
+            _link_or_copy(blob, tmp)
+            os.replace(tmp, page)
+
+        self.index.setdefault(doc_id, {})[str(page_num)] = sha
+        return is_new
+
+    def ingest_document(self, doc_id: str) -> int:
+        """Ingest every page_*.jpg of one document ("" for flat). Returns new blobs."""
+        doc_dir = self.images_dir / doc_id if doc_id else self.images_dir
+        return sum(
+            1 for path in sorted(doc_dir.glob("page_*.jpg"))
+            if self.ingest_page(doc_id, _page_num(path))
+        )
+
+    def ingest(self) -> dict:
+        """Ingest the whole images/ tree and save the index.
+
+        Returns {"pages": total indexed pages, "unique": distinct blobs}.
+        """
+        if self.images_dir.exists():
+            for doc_dir in sorted(d for d in self.images_dir.iterdir() if d.is_dir()):
+                self.ingest_document(doc_dir.name)
+            self.ingest_document("")
+        self.save()
+        return self.stats()
+
+    def stats(self) -> dict:
+        shas = [sha for pages in self.index.values() for sha in pages.values()]
+        return {"pages": len(shas), "unique": len(set(shas))}
+
+    def materialize(self) -> int:
+        """Recreate images/ page files as links to their blobs (after a GCS pull).
+
+        Returns the number of page files created.
+        """
+        created = 0
+        for doc_id, pages in self.index.items():
+            for page_num, sha in pages.items():
+                page = self.page_path(doc_id, int(page_num))
+                blob = self.blob_path(sha)
+                if not blob.exists() or _same_file(page, blob):
+                    continue
+                page.parent.mkdir(parents=True, exist_ok=True)
+                page.unlink(missing_ok=True)
+                _link_or_copy(blob, page)
+                created += 1
+        return created
@@ -5,23 +5,369 @@ Each volume has images organized as:
     pdfs/{volume_id}/images/{doc_id}/page_NNNN.jpg
 
 Documents are sorted by doc_id, pages within each document by filename,
-producing a single continuous PDF per volume.
+producing a single continuous PDF per volume. Pages indexed in the
+volume's PageStore resolve to their blob, so identical images are
+converted once.
+
+Builds are incremental: each document is converted into a cached PDF
+fragment under pdfs/{volume_id}/pdf_fragments/, keyed by its pages' content
+hashes (or size and mtime for unindexed pages). A rebuild only regenerates
+documents whose pages changed and concatenates the fragments straight into
+the output file one fragment at a time, copying their already-encoded page
+streams, so peak memory is one fragment rather than the whole volume.
+
+Baseline/progressive 8-bit grayscale or RGB JPEGs are embedded as-is as
+DCTDecode image XObjects, sized from the JPEG header (passthrough), so
+pages are never decoded or re-compressed. Other images (CMYK, non-JPEG)
+fall back to a PIL conversion.
+
+PIL conversion is CPU-bound; with workers > 1 it runs in a process pool
+while pages are still appended in doc-then-page order. Only pages that need
+conversion go to the pool, so with passthrough (the default) extra workers
+help only volumes with fallback pages; they matter mostly with --reencode.
 """
+import gc
+import hashlib
+import io
+import json
+import os
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
 from pathlib import Path
+from typing import BinaryIO
+
 from PIL import Image
-from pypdf import PdfWriter, PdfReader
-import io
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import (
+    ArrayObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    StreamObject,
+)
+
+from src.config import PDF_RENDER_IN_FLIGHT
+from src.manifest_db import write_json_atomic
+from src.page_store import PageStore
+
+FRAGMENTS_DIR = "pdf_fragments"
+FRAGMENT_INDEX = "fragments.json"
+
+# SOFn markers carrying frame dimensions (excluding DHT, JPG and DAC)
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_JPEG_COLORSPACES = {1: "/DeviceGray", 3: "/DeviceRGB"}
+
+
+def jpeg_header(data: bytes) -> tuple[int, int, int, int] | None:
+    """(width, height, components, bits) from a JPEG's SOF segment, or None.
+
+    Walks the marker segments only; no pixel data is decoded.
+    """
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # no length field
+            i += 2
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / start of scan before any SOF
+            return None
+        length = int.from_bytes(data[i + 2:i + 4], "big")
+        if marker in _SOF_MARKERS:
+            if i + 10 > len(data):
+                return None
+            bits = data[i + 4]
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height, data[i + 9], bits
+        i += 2 + length
+    return None
+
+
+def _jpeg_image(data: bytes) -> StreamObject | None:
+    """A DCTDecode image XObject wrapping the JPEG's bytes unchanged, or None if unsupported."""
+    header = jpeg_header(data)
+    if header is None:
+        return None
+    width, height, components, bits = header
+    if components not in _JPEG_COLORSPACES or bits != 8 or not width or not height:
+        return None
+
+    image = StreamObject()
+    image.update({
+        NameObject("/Type"): NameObject("/XObject"),
+        NameObject("/Subtype"): NameObject("/Image"),
+        NameObject("/Width"): NumberObject(width),
+        NameObject("/Height"): NumberObject(height),
+        NameObject("/ColorSpace"): NameObject(_JPEG_COLORSPACES[components]),
+        NameObject("/BitsPerComponent"): NumberObject(8),
+        NameObject("/Filter"): NameObject("/DCTDecode"),
+    })
+    image.set_data(data)
+    return image
+
+
+def _add_indirect(writer: PdfWriter, obj):
+    """Register obj with the writer and return its IndirectObject.
+
+    pypdf has no public API for this; PdfWriter._add_object has been stable
+    since PyPDF2 and pyproject.toml pins pypdf below 7 so a major release
+    can't remove it unnoticed.
+    """
+    return writer._add_object(obj)
+
+
+def _add_image_page(writer: PdfWriter, image_ref) -> None:
+    """Append a page showing an image XObject already in the writer."""
+    image = image_ref.get_object()
+    width, height = int(image["/Width"]), int(image["/Height"])
+
+    # One image pixel per point, the same page size PIL's PDF writer uses
+    page = writer.add_blank_page(width=width, height=height)
+    contents = DecodedStreamObject()
+    contents.set_data(f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode())
+    page[NameObject("/Contents")] = _add_indirect(writer, contents)
+    page[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): image_ref}),
+    })
+
+
+def _page_fingerprint(img_path: Path, store: PageStore) -> str:
+    """Content hash of an indexed page, else its size and mtime."""
+    _, content_hash = store.resolve_image(img_path)
+    if content_hash:
+        return content_hash
+    stat = img_path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _document_key(pages: list[Path], store: PageStore, passthrough: bool) -> str:
+    """Cache key for a document's fragment: hash of its page names and fingerprints."""
+    digest = hashlib.sha256()
+    digest.update(b"passthrough\n" if passthrough else b"convert\n")
+    for img_path in pages:
+        digest.update(f"{img_path.name}={_page_fingerprint(img_path, store)}\n".encode())
+    return digest.hexdigest()
+
+
+def render_page_pdf(source_path: Path) -> bytes:
+    """Convert one image to a single-page PDF with PIL.
+
+    Module-level and returning bytes so it can run in a ProcessPoolExecutor.
+    """
+    img = Image.open(source_path).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, "PDF")
+    img.close()
+    return buf.getvalue()
+
+
+def build_document_fragment(
+    pages: list[Path],
+    store: PageStore,
+    fragment_path: Path,
+    converted: dict | None = None,
+    passthrough: bool = True,
+    executor: Executor | None = None,
+    in_flight: int = 1,
+    uses: Counter | None = None,
+) -> tuple[int, list[str]]:
+    """Convert one document's page images into a PDF fragment.
+
+    With passthrough, JPEGs are embedded without re-encoding. `converted`
+    maps content hash -> page object for the PIL fallback and is shared
+    across documents so duplicate images are converted once per build.
+    `uses` counts the pages per content hash still to be written in the
+    build; a converted page is dropped from `converted` after its last use,
+    so only images that actually repeat are held.
 
+    With an executor, PIL conversions are submitted to it while up to
+    in_flight pages wait in a queue; pages are appended strictly in order
+    as the head of the queue completes, so at most in_flight converted
+    pages are held in memory at once.
 
-def build_volume_pdf(images_dir: Path, output_path: Path) -> int:
+    Returns (pages written, names of skipped corrupt images).
+    """
+    if converted is None:
+        converted = {}
+    writer = PdfWriter()
+    image_refs = {}
+    skipped = []
+    pending = deque()  # (img_path, content_hash, payload) in page order
+    submitted = {}  # content hash -> future, for duplicates still in the queue
+
+    def append(img_path, content_hash, payload):
+        if content_hash and uses is not None:
+            uses[content_hash] -= 1
+        try:
+            if content_hash and content_hash in image_refs:
+                _add_image_page(writer, image_refs[content_hash])
+            elif content_hash and content_hash in converted:
+                writer.add_page(converted[content_hash])
+            elif isinstance(payload, StreamObject):
+                image_ref = _add_indirect(writer, payload)
+                if content_hash:
+                    image_refs[content_hash] = image_ref
+                _add_image_page(writer, image_ref)
+            else:
+                data = payload.result() if isinstance(payload, Future) else render_page_pdf(payload)
+                page = PdfReader(io.BytesIO(data)).pages[0]
+                writer.add_page(page)
+                if content_hash and (uses is None or uses[content_hash] > 0):
+                    converted[content_hash] = page
+        except Exception:
+            skipped.append(img_path.name)
+        if content_hash and uses is not None and uses[content_hash] <= 0:
+            converted.pop(content_hash, None)
+
+    for img_path in pages:
+        source_path, content_hash = store.resolve_image(img_path)
+        payload = source_path
+        if content_hash and (content_hash in image_refs or content_hash in converted):
+            payload = None
+        elif content_hash in submitted:
+            payload = submitted[content_hash]
+        elif passthrough:
+            try:
+                payload = _jpeg_image(source_path.read_bytes()) or source_path
+            except OSError:
+                pass
+        if executor is not None and isinstance(payload, Path):
+            payload = executor.submit(render_page_pdf, source_path)
+            if content_hash:
+                submitted[content_hash] = payload
+
+        pending.append((img_path, content_hash, payload))
+        while len(pending) >= max(in_flight, 1):
+            append(*pending.popleft())
+
+    while pending:
+        append(*pending.popleft())
+
+    fragment_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = fragment_path.with_name(fragment_path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        writer.write(f)
+    os.replace(tmp, fragment_path)
+    return len(writer.pages), skipped
+
+
+def write_concatenated_pdf(paths: list[Path], f: BinaryIO) -> int:
+    """Write the pages of the PDFs at paths, in order, as one PDF to f.
+
+    Unlike PdfWriter.append(), which holds every page of every input until
+    write(), each input's page objects are renumbered and written out as
+    soon as it is read, so only one input is in memory at a time.
+
+    Returns the number of pages written.
+    """
+    offsets = [0, 0]  # offsets[n - 1] is object n's file offset; 1 is the catalog, 2 the page tree
+    pages_ref = IndirectObject(2, 0, None)
+    kids = ArrayObject()
+
+    def write_object(number: int, obj) -> None:
+        offsets[number - 1] = f.tell()
+        f.write(f"{number} 0 obj\n".encode())
+        obj.write_to_stream(f)
+        f.write(b"\nendobj\n")
+
+    def copy_pages(path: Path) -> None:
+        renumbered = {}  # object number in this input -> number in the output
+        queue = deque()
+
+        def renumber(obj):
+            if isinstance(obj, IndirectObject):
+                if obj.idnum not in renumbered:
+                    offsets.append(0)
+                    renumbered[obj.idnum] = len(offsets)
+                    queue.append(obj)
+                return IndirectObject(renumbered[obj.idnum], 0, None)
+            if isinstance(obj, DictionaryObject):
+                for key, value in obj.items():
+                    obj[key] = renumber(value)
+            elif isinstance(obj, ArrayObject):
+                for i, value in enumerate(obj):
+                    obj[i] = renumber(value)
+            return obj
+
+        # reader.pages are copies with inherited attributes filled in; write
+        # those rather than the raw page objects, parented to the new tree
+        pages = list(PdfReader(path).pages)
+        for page in pages:
+            offsets.append(0)
+            renumbered[page.indirect_reference.idnum] = len(offsets)
+            kids.append(IndirectObject(len(offsets), 0, None))
+        for page in pages:
+            del page[NameObject("/Parent")]
+            renumber(page)
+            page[NameObject("/Parent")] = pages_ref
+            write_object(renumbered[page.indirect_reference.idnum], page)
+        while queue:
+            ref = queue.popleft()
+            write_object(renumbered[ref.idnum], renumber(ref.get_object()))
+
+    f.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+    for path in paths:
+        copy_pages(path)
+        # A PdfReader and its objects form reference cycles; collect them now
+        # so their stream data is freed before the next input is read
+        gc.collect()
+
+    write_object(2, DictionaryObject({
+        NameObject("/Type"): NameObject("/Pages"),
+        NameObject("/Kids"): kids,
+        NameObject("/Count"): NumberObject(len(kids)),
+    }))
+    write_object(1, DictionaryObject({
+        NameObject("/Type"): NameObject("/Catalog"),
+        NameObject("/Pages"): pages_ref,
+    }))
+
+    xref = f.tell()
+    f.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        f.write(f"{offset:010d} 00000 n \n".encode())
+    f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode())
+    return len(kids)
+
+
+def _load_fragment_index(fragments_dir: Path) -> dict:
+    index_path = fragments_dir / FRAGMENT_INDEX
+    if index_path.exists():
+        with open(index_path, encoding="utf-8") as f:
+            return json.load(f)
+    return {"volume_key": "", "documents": {}}
+
+
+def build_volume_pdf(
+    images_dir: Path,
+    output_path: Path,
+    passthrough: bool = True,
+    workers: int = 1,
+) -> int:
     """
     Build a single PDF from all page images across documents in a volume.
 
-    Processes images one at a time to avoid memory issues with large volumes.
+    Only documents whose pages changed since the last build are converted
+    again; the rest are reused from their cached fragments. If nothing
+    changed and output_path exists, it is left untouched.
 
     Args:
         images_dir: Directory containing per-document subdirectories of JPGs
         output_path: Path for the output PDF
+        passthrough: Embed JPEG bytes directly instead of re-encoding with PIL
+        workers: Processes for PIL conversion; 1 converts in this process.
+            Only fallback pages are converted unless passthrough is off
 
     Returns:
         Total number of pages in the PDF
@@ -32,48 +378,92 @@ def build_volume_pdf(images_dir: Path, output_path: Path) -> int:
     if not images_dir.exists():
         raise FileNotFoundError(f"Directory not found: {images_dir}")
 
-    # Collect all JPGs across all document subdirectories, sorted by doc then page
-    all_images = []
+    # Collect all JPGs per document subdirectory, sorted by doc then page
+    documents = {}
     for doc_dir in sorted(images_dir.iterdir()):
         if not doc_dir.is_dir():
             continue
         pages = sorted(doc_dir.glob("*.jpg"))
-        all_images.extend(pages)
+        if pages:
+            documents[doc_dir.name] = pages
 
-    if not all_images:
+    if not documents:
         raise FileNotFoundError(f"No JPG images found in {images_dir}")
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    writer = PdfWriter()
-    skipped = []
+    store = PageStore(images_dir.parent)
+    fragments_dir = images_dir.parent / FRAGMENTS_DIR
+    index = _load_fragment_index(fragments_dir)
+    cached = index["documents"]
+    converted = {}  # content hash -> converted PDF page, for duplicate images
 
-    for i, img_path in enumerate(all_images):
+    entries = {}
+    stale = {}
+    for doc_id, pages in documents.items():
+        key = _document_key(pages, store, passthrough)
+        entry = cached.get(doc_id)
+        if entry and entry["key"] == key and (fragments_dir / f"{doc_id}.pdf").exists():
+            entries[doc_id] = entry
+        else:
+            stale[doc_id] = key
+
+    if stale:
+        # Pages per content hash across the documents to convert
+        uses = Counter(
+            store.resolve_image(img_path)[1]
+            for doc_id in stale for img_path in documents[doc_id]
+        )
+        started = time.monotonic()
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
         try:
-            img = Image.open(img_path).convert("RGB")
-            buf = io.BytesIO()
-            img.save(buf, "PDF")
-            img.close()
-            buf.seek(0)
-            reader = PdfReader(buf)
-            writer.add_page(reader.pages[0])
-        except Exception:
-            skipped.append(img_path.name)
-            continue
+            for doc_id, key in stale.items():
+                count, skipped = build_document_fragment(
+                    documents[doc_id], store, fragments_dir / f"{doc_id}.pdf", converted,
+                    passthrough, executor, workers * PDF_RENDER_IN_FLIGHT if executor else 1,
+                    uses,
+                )
+                entries[doc_id] = {"key": key, "pages": count, "skipped": skipped}
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+        rendered = sum(len(documents[doc_id]) for doc_id in stale)
+        elapsed = time.monotonic() - started
+        print(f"  Rendered {rendered} pages in {elapsed:.1f}s "
+              f"({rendered / max(elapsed, 1e-6):.1f} pages/s, {max(workers, 1)} worker(s))")
+    entries = {doc_id: entries[doc_id] for doc_id in documents}
+    rebuilt = len(stale)
 
-        if (i + 1) % 200 == 0:
-            print(f"  {i + 1}/{len(all_images)} pages processed...")
+    # Drop fragments of documents that no longer exist
+    for doc_id in set(cached) - set(entries):
+        (fragments_dir / f"{doc_id}.pdf").unlink(missing_ok=True)
 
-    if not writer.pages:
+    total = sum(entry["pages"] for entry in entries.values())
+    if not total:
         raise FileNotFoundError(f"No valid images found in {images_dir}")
 
+    skipped = [name for entry in entries.values() for name in entry["skipped"]]
     if skipped:
         print(f"  WARNING: skipped {len(skipped)} corrupt images: {skipped[:10]}")
 
-    with open(output_path, "wb") as f:
-        writer.write(f)
+    volume_key = hashlib.sha256(
+        "".join(f"{doc_id}={entry['key']}\n" for doc_id, entry in entries.items()).encode()
+    ).hexdigest()
+    if volume_key == index["volume_key"] and output_path.exists():
+        print(f"{output_path.name} is up to date: {total} pages from {len(entries)} documents")
+        return total
+
+    tmp = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        write_concatenated_pdf(
+            [fragments_dir / f"{doc_id}.pdf" for doc_id, entry in entries.items() if entry["pages"]],
+            f,
+        )
+    os.replace(tmp, output_path)
 
-    doc_count = sum(1 for d in images_dir.iterdir() if d.is_dir())
-    total = len(writer.pages)
-    print(f"Built {output_path.name}: {total} pages from {doc_count} documents")
+    write_json_atomic(
+        fragments_dir / FRAGMENT_INDEX, {"volume_key": volume_key, "documents": entries},
+    )
+    print(f"Built {output_path.name}: {total} pages from {len(entries)} documents "
+          f"({rebuilt} rebuilt, {len(entries) - rebuilt} cached)")
     return total
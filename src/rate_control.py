@@ -0,0 +1,260 @@
+# src/rate_control.py
+"""
+Adaptive (AIMD) concurrency control for requests to Gale.
+
+One AdaptiveLimiter is shared by the dviViewer metadata calls and the page
+image downloads of a scrape. Every request takes a slot; when it finishes the
+limiter is told how it went:
+
+- Healthy responses grow the limit additively (about +1 per limit's worth)
+- 429/5xx, timeouts, undersized image bodies, empty JSON and a p95 latency
+  well above the best p95 seen so far halve it (at most once per cooldown)
+- Failures that say nothing about load (a 404 or 403, a dropped connection)
+  free the slot and leave the limit alone
+- A Retry-After header pauses every caller until it has elapsed
+"""
+import asyncio
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Iterator
+
+import requests
+
+from src.config import (
+    ADAPTIVE_COOLDOWN,
+    ADAPTIVE_LATENCY_FACTOR,
+    ADAPTIVE_LATENCY_WINDOW,
+    ADAPTIVE_MAX_WORKERS,
+    ADAPTIVE_MIN_WORKERS,
+    RETRY_AFTER_MAX,
+)
+
+
+def parse_retry_after(value) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds.
+
+    Clamped to RETRY_AFTER_MAX so a bogus or hostile value can't stall a
+    scrape (or the limiter's pause) for hours.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), RETRY_AFTER_MAX)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    delay = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, delay), RETRY_AFTER_MAX)
+
+
+def is_throttle_status(status_code) -> bool:
+    """True for HTTP statuses that mean the server wants us to slow down."""
+    return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
+
+def is_congestion_error(error: BaseException, status_code=None) -> bool:
+    """True if a failed request points at server load.
+
+    That is a throttle status, a timeout, or a body the caller rejected as
+    short or empty (its checks raise ValueError). Any other HTTP error
+    status and connection errors are not load signals.
+    """
+    if isinstance(status_code, int) and status_code >= 400:
+        return is_throttle_status(status_code)
+    if isinstance(error, (requests.Timeout, TimeoutError, ValueError)):
+        return True
+    httpx = sys.modules.get("httpx")  # async engine; only loaded when in use
+    return httpx is not None and isinstance(error, httpx.TimeoutException)
+
+
+def retry_delay(attempt: int, retry_after: float | None = None) -> float:
+    """Seconds to wait before retry `attempt`: Retry-After if given, else 2**attempt."""
+    if retry_after is not None:
+        return retry_after
+    return float(2 ** attempt)
+
+
+class RequestOutcome:
+    """Result of one request, filled in by the caller inside AdaptiveLimiter.request().
+
+    ok is True on success, False for a failure that signals congestion and
+    None for one that doesn't (see fail()).
+    """
+
+    def __init__(self):
+        self.ok: bool | None = False
+        self.latency: float | None = None
+        self.retry_after: float | None = None
+        self.status_code: int | None = None
+        self._started = time.monotonic()
+
+    def observe(self, response) -> None:
+        """Record latency, status and Retry-After from a response as soon as it arrives."""
+        self.latency = time.monotonic() - self._started
+        self.status_code = response.status_code
+        self.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+    def fail(self, error: BaseException) -> None:
+        """Mark the request failed with error; only congestion errors back off the limiter."""
+        self.ok = False if is_congestion_error(error, self.status_code) else None
+
+
+class AdaptiveLimiter:
+    """Thread-safe AIMD limit on concurrent in-flight requests."""
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = ADAPTIVE_MIN_WORKERS,
+        max_limit: int = ADAPTIVE_MAX_WORKERS,
+        latency_factor: float = ADAPTIVE_LATENCY_FACTOR,
+        latency_window: int = ADAPTIVE_LATENCY_WINDOW,
+        cooldown: float = ADAPTIVE_COOLDOWN,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.limit = float(min(self.max_limit, max(min_limit, initial)))
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._best_p95: float | None = None
+
+    @property
+    def current_limit(self) -> int:
+        """The whole number of requests currently allowed in flight."""
+        return max(self.min_limit, int(self.limit))
+
+    def acquire(self) -> None:
+        """Block until a request slot is free and no Retry-After pause is active."""
+        with self._cond:
+            while True:
+                pause = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self._in_flight < self.current_limit:
+                    self._in_flight += 1
+                    return
+                else:
+                    self._cond.wait()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free and no Retry-After pause is active; never blocks."""
+        with self._cond:
+            if self._paused_until > time.monotonic() or self._in_flight >= self.current_limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(
+        self,
+        ok: bool | None,
+        latency: float | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        """Free a slot and adjust the limit from the request's outcome.
+
+        ok=None is a failure unrelated to load: the limit is left as it is.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            now = time.monotonic()
+
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+            if ok is None:
+                self._cond.notify_all()
+                return
+
+            congested = False
+            if ok and latency is not None:
+                self._latencies.append(latency)
+                congested = self._latency_congested()
+
+            if not ok or congested:
+                self._decrease(now)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            self._cond.notify_all()
+
+    @contextmanager
+    def request(self) -> Iterator[RequestOutcome]:
+        """Hold a slot for one request; set outcome.ok = True if it succeeded.
+
+        An exception raised inside the block is classified with outcome.fail().
+        """
+        self.acquire()
+        outcome = RequestOutcome()
+        try:
+            yield outcome
+        except Exception as e:
+            if outcome.ok is False:
+                outcome.fail(e)
+            raise
+        finally:
+            self.release(outcome.ok, outcome.latency, outcome.retry_after)
+
+    @asynccontextmanager
+    async def request_async(self, poll: float = 0.05) -> AsyncIterator[RequestOutcome]:
+        """request() for coroutines: waits for a slot without blocking the event loop."""
+        while not self.try_acquire():
+            await asyncio.sleep(poll)
+        outcome = RequestOutcome()
+        try:
+            yield outcome
+        except Exception as e:
+            if outcome.ok is False:
+                outcome.fail(e)
+            raise
+        finally:
+            self.release(outcome.ok, outcome.latency, outcome.retry_after)
+
+    def _decrease(self, now: float) -> None:
+        # One overload episode produces a burst of failures; halve once per
+        # cooldown so the burst doesn't collapse the limit to the floor
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit / 2)
+
+    def _latency_congested(self) -> bool:
+        """True when a full window's p95 latency exceeds the best p95 by latency_factor."""
+        if len(self._latencies) < self._latencies.maxlen:
+            return False
+
+        ordered = sorted(self._latencies)
+        p95 = ordered[int(0.95 * (len(ordered) - 1))]
+        self._latencies.clear()
+
+        if self._best_p95 is None or p95 < self._best_p95:
+            self._best_p95 = p95
+            return False
+        return p95 > self._best_p95 * self.latency_factor
+
+
+def request_slot(limiter: AdaptiveLimiter | None):
+    """limiter.request(), or an untracked outcome when no limiter is in use."""
+    if limiter is None:
+        return nullcontext(RequestOutcome())
+    return limiter.request()
+
+
+def request_slot_async(limiter: AdaptiveLimiter | None):
+    """limiter.request_async(), or an untracked outcome when no limiter is in use."""
+    if limiter is None:
+        return nullcontext(RequestOutcome())
+    return limiter.request_async()
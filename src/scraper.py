@@ -10,16 +10,24 @@ The dviViewer/getDviDocument endpoint returns JSON with:
 This replaces the old pdfGenerator/html approach which always returned disclaimers.
 """
 import json
+import os
 import re
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
+from typing import Callable
 from urllib.parse import unquote
 
 import requests
 from bs4 import BeautifulSoup
 
 from src.config import (
+    ADAPTIVE_MAX_WORKERS,
+    ASYNC_MAX_IN_FLIGHT,
     GALE_BASE_URL,
     DVI_DOCUMENT_URL,
     IMAGE_DOWNLOAD_URL,
@@ -28,13 +36,29 @@ from src.config import (
     GALE_PROD_ID,
     GALE_PRODUCT_CODE,
     GALE_USER_GROUP,
+    DOWNLOAD_CHUNK_SIZE,
     DOWNLOAD_DELAY,
     MAX_RETRIES,
     MAX_WORKERS,
     PDF_DOWNLOAD_TIMEOUT,
+    PREFETCH_DOCS,
     REQUEST_TIMEOUT,
     SEARCH_RESULTS_PER_PAGE,
 )
+from src.manifest_db import ManifestDB, db_path_for, write_json_atomic
+from src.page_store import PageStore
+from src.rate_control import (
+    AdaptiveLimiter,
+    is_throttle_status,
+    request_slot,
+    retry_delay,
+)
+
+# Query parameters for full-resolution JPEGs from the image server
+IMAGE_PARAMS = {"legacy": "no", "scale": "1.0", "format": "jpeg"}
+
+MIN_PAGE_BYTES = 1000  # smaller bodies are error pages, not scans
+JPEG_EOI = b"\xff\xd9"  # JPEG end-of-image marker
 
 
 def sanitize_doc_id(doc_id: str) -> str:
@@ -125,7 +149,11 @@ def discover_doc_ids(session: requests.Session, search_url: str) -> list[str]:
 # ---------------------------------------------------------------------------
 
 
-def get_document_data(session: requests.Session, doc_id: str) -> dict:
+def get_document_data(
+    session: requests.Session,
+    doc_id: str,
+    limiter: AdaptiveLimiter | None = None,
+) -> dict:
     """Call dviViewer/getDviDocument API to get document metadata and page tokens.
 
     Returns parsed JSON with:
@@ -133,7 +161,9 @@ def get_document_data(session: requests.Session, doc_id: str) -> dict:
     - originalDocument.pageOcrTextMap: OCR text per page
     - originalDocument.formatPdfRecordIdsForDviDownload: for BulkPDF
 
-    Retries up to MAX_RETRIES on empty/non-JSON responses (session expiry).
+    Retries up to MAX_RETRIES on empty/non-JSON responses (session expiry)
+    and on 429/5xx, waiting for Retry-After when the server sends one.
+    If a limiter is given, each attempt holds one of its slots.
     """
     params = {
         "docId": doc_id,
@@ -148,78 +178,212 @@ def get_document_data(session: requests.Session, doc_id: str) -> dict:
     }
 
     for attempt in range(1, MAX_RETRIES + 1):
-        response = session.get(
-            DVI_DOCUMENT_URL, params=params, headers=headers,
-            timeout=REQUEST_TIMEOUT,
-        )
-        response.raise_for_status()
-
-        if not response.content or not response.content.strip():
-            preview = "(empty)"
-            print(f"    Retry {attempt}/{MAX_RETRIES}: empty response for {doc_id}")
-            if attempt < MAX_RETRIES:
-                time.sleep(2 ** attempt)
-                continue
-            raise ValueError(
-                f"Empty API response for {doc_id} after {MAX_RETRIES} retries "
-                f"(session may have expired)"
+        with request_slot(limiter) as outcome:
+            response = session.get(
+                DVI_DOCUMENT_URL, params=params, headers=headers,
+                timeout=REQUEST_TIMEOUT,
             )
+            outcome.observe(response)
+
+            if is_throttle_status(response.status_code) and attempt < MAX_RETRIES:
+                print(f"    Retry {attempt}/{MAX_RETRIES}: HTTP {response.status_code} for {doc_id}")
+            else:
+                response.raise_for_status()
+
+                if not response.content or not response.content.strip():
+                    print(f"    Retry {attempt}/{MAX_RETRIES}: empty response for {doc_id}")
+                    if attempt == MAX_RETRIES:
+                        raise ValueError(
+                            f"Empty API response for {doc_id} after {MAX_RETRIES} retries "
+                            f"(session may have expired)"
+                        )
+                else:
+                    try:
+                        data = response.json()
+                    except json.JSONDecodeError:
+                        preview = response.text[:200]
+                        print(f"    Retry {attempt}/{MAX_RETRIES}: non-JSON response: {preview}")
+                        if attempt == MAX_RETRIES:
+                            raise ValueError(
+                                f"Non-JSON API response for {doc_id} after {MAX_RETRIES} retries: {preview}"
+                            )
+                    else:
+                        outcome.ok = True
+                        return data
+
+        time.sleep(retry_delay(attempt, outcome.retry_after))
+
+
+def _jpeg_tail_ok(tail: bytes) -> bool:
+    """True if the last bytes of a JPEG end with EOI, allowing trailing padding."""
+    return tail.rstrip(b"\x00\r\n\t ").endswith(JPEG_EOI)
+
+
+def is_complete_page(path: Path) -> bool:
+    """True if a page image on disk is large enough and ends with a JPEG EOI.
+
+    Used by the resume check so a file truncated by a crash is re-downloaded.
+    """
+    try:
+        size = path.stat().st_size
+        if size <= MIN_PAGE_BYTES:
+            return False
+        with open(path, "rb") as f:
+            f.seek(max(0, size - 64))
+            return _jpeg_tail_ok(f.read())
+    except OSError:
+        return False
 
-        try:
-            return response.json()
-        except json.JSONDecodeError:
-            preview = response.text[:200]
-            print(f"    Retry {attempt}/{MAX_RETRIES}: non-JSON response: {preview}")
-            if attempt < MAX_RETRIES:
-                time.sleep(2 ** attempt)
-                continue
-            raise ValueError(
-                f"Non-JSON API response for {doc_id} after {MAX_RETRIES} retries: {preview}"
-            )
+
+def expected_content_length(headers) -> int | None:
+    """Content-Length as an int, or None if absent or the body is re-encoded."""
+    value = headers.get("Content-Length")
+    if not isinstance(value, str) or not value.isdigit():
+        return None
+    if headers.get("Content-Encoding"):
+        return None  # decoded body length won't match the wire length
+    return int(value)
+
+
+def _fsync_dir(path: Path) -> None:
+    """Flush a directory entry (the rename) to disk; a no-op where unsupported."""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class PartialPage:
+    """Page image being streamed to `page_NNNN.jpg.part`.
+
+    commit() fsyncs the temp file, validates it (minimum size, Content-Length
+    if known, JPEG EOI marker) and atomically renames it over the final path,
+    so a crash can never leave a truncated page_NNNN.jpg behind. Used as a
+    context manager, an uncommitted temp file is removed on exit.
+    """
+
+    def __init__(self, filepath: Path):
+        self.filepath = filepath
+        self.tmp_path = filepath.with_name(filepath.name + ".part")
+        self.size = 0
+        self._tail = b""
+        self._committed = False
+        self._file = open(self.tmp_path, "wb")
+
+    def __enter__(self) -> "PartialPage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self._committed:
+            self.discard()
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self.size += len(chunk)
+        self._tail = (self._tail + chunk)[-64:]
+
+    def commit(self, expected_length: int | None = None) -> None:
+        """Validate and move into place. Raises ValueError if incomplete."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+        if self.size < MIN_PAGE_BYTES:
+            raise ValueError(f"too small ({self.size} bytes)")
+        if expected_length is not None and self.size != expected_length:
+            raise ValueError(f"truncated ({self.size} of {expected_length} bytes)")
+        if not _jpeg_tail_ok(self._tail):
+            raise ValueError("missing JPEG end-of-image marker")
+
+        os.replace(self.tmp_path, self.filepath)
+        _fsync_dir(self.filepath.parent)
+        self._committed = True
+
+    def discard(self) -> None:
+        self._file.close()
+        self.tmp_path.unlink(missing_ok=True)
 
 
 def _download_single_page(
     session: requests.Session,
     page_info: dict,
     output_dir: Path,
+    limiter: AdaptiveLimiter | None = None,
 ) -> bool:
-    """Download a single page image. Returns True on success or skip."""
+    """Download a single page image. Returns True on success or skip.
+
+    The body is streamed in DOWNLOAD_CHUNK_SIZE pieces into a PartialPage and
+    only renamed to page_NNNN.jpg once complete. Retries up to MAX_RETRIES on
+    errors and incomplete bodies, waiting for Retry-After when the server
+    sends one. If a limiter is given, each attempt holds one of its slots.
+    """
     page_num = int(page_info["pageNumber"])
     record_id = page_info["recordId"]
     filename = f"page_{page_num:04d}.jpg"
     filepath = output_dir / filename
 
     # Skip if already downloaded
-    if filepath.exists() and filepath.stat().st_size > 1000:
+    if is_complete_page(filepath):
         return True
 
     url = f"{IMAGE_DOWNLOAD_URL}/{record_id}"
-    params = {"legacy": "no", "scale": "1.0", "format": "jpeg"}
 
     for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
+        with request_slot(limiter) as outcome:
+            try:
+                response = session.get(
+                    url, params=IMAGE_PARAMS, timeout=REQUEST_TIMEOUT, stream=True,
+                )
+                try:
+                    outcome.observe(response)
+                    response.raise_for_status()
+
+                    with PartialPage(filepath) as part:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            part.write(chunk)
+                        part.commit(expected_content_length(response.headers))
+                finally:
+                    response.close()
+
+                outcome.ok = True
+                return True
+
+            except Exception as e:
+                outcome.fail(e)
+                if attempt == MAX_RETRIES:
+                    print(f"    Failed page {page_num}: {e}")
+                    return False
+
+        time.sleep(retry_delay(attempt, outcome.retry_after))
 
-            if len(response.content) < 1000:
-                if attempt < MAX_RETRIES:
-                    time.sleep(2 ** attempt)
-                    continue
-                print(f"    Warning: page {page_num} too small ({len(response.content)} bytes)")
-                return False
+    return False
 
-            with open(filepath, "wb") as f:
-                f.write(response.content)
-            return True
 
-        except Exception as e:
-            if attempt < MAX_RETRIES:
-                time.sleep(2 ** attempt)
-                continue
-            print(f"    Failed page {page_num}: {e}")
-            return False
+PageSubmitter = Callable[[dict, Path], Future]
 
-    return False
+
+def _submit_document_pages(
+    submit_page: PageSubmitter,
+    doc_data: dict,
+    output_dir: Path,
+) -> list[Future]:
+    """Queue every page of a document on a shared download engine.
+
+    submit_page(page_info, output_dir) returns a future resolving to True
+    on success or skip, like _download_single_page().
+    """
+    image_list = doc_data.get("imageList", [])
+    if not image_list:
+        return []
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    return [submit_page(page_info, output_dir) for page_info in image_list]
 
 
 def download_document_pages(
@@ -239,17 +403,12 @@ def download_document_pages(
     if max_workers is None:
         max_workers = MAX_WORKERS
 
-    image_list = doc_data.get("imageList", [])
-    if not image_list:
+    if not doc_data.get("imageList"):
         return 0
 
-    output_dir.mkdir(parents=True, exist_ok=True)
-
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(_download_single_page, session, page_info, output_dir)
-            for page_info in image_list
-        ]
+        submit_page = partial(executor.submit, _download_single_page, session)
+        futures = _submit_document_pages(submit_page, doc_data, output_dir)
         results = [f.result() for f in futures]
 
     return sum(1 for r in results if r)
@@ -294,11 +453,10 @@ def save_ocr_text(doc_data: dict, output_dir: Path, doc_id: str) -> int:
 # ---------------------------------------------------------------------------
 
 
-def load_manifest(path: Path) -> dict:
-    """Load download manifest from JSON, or return empty manifest."""
-    if path.exists():
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
+MANIFEST_DOC = "doc"
+
+
+def _empty_manifest() -> dict:
     return {
         "volume_id": "",
         "total_documents": 0,
@@ -308,11 +466,46 @@ def load_manifest(path: Path) -> dict:
     }
 
 
+def _manifest_from_db(db: ManifestDB) -> dict:
+    """Rebuild the manifest dict from its SQLite copy."""
+    manifest = _empty_manifest()
+    manifest.update(db.meta())
+    manifest["downloaded_docs"] = [doc_id for doc_id, _ in db.items(MANIFEST_DOC, "done")]
+    manifest["failed_docs"] = [doc_id for doc_id, _ in db.items(MANIFEST_DOC, "failed")]
+    return manifest
+
+
+def _manifest_to_db(db: ManifestDB, data: dict) -> None:
+    """Overwrite the SQLite copy of a manifest with a manifest dict."""
+    db.clear(MANIFEST_DOC)
+    for key, value in data.items():
+        if key not in ("downloaded_docs", "failed_docs"):
+            db.set_meta(key, value)
+    for doc_id in data.get("downloaded_docs", []):
+        db.mark(MANIFEST_DOC, doc_id, "done")
+    for doc_id in data.get("failed_docs", []):
+        if db.status(MANIFEST_DOC, doc_id) != "done":
+            db.mark(MANIFEST_DOC, doc_id, "failed")
+    db.flush()
+
+
+def load_manifest(path: Path) -> dict:
+    """Load download manifest (SQLite if present, else JSON), or return empty manifest."""
+    if db_path_for(path).exists():
+        with ManifestDB(db_path_for(path)) as db:
+            return _manifest_from_db(db)
+    if path.exists():
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return _empty_manifest()
+
+
 def save_manifest(path: Path, data: dict) -> None:
-    """Save download manifest to JSON."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    """Save download manifest to JSON, keeping an existing SQLite manifest in sync."""
+    if db_path_for(path).exists():
+        with ManifestDB(db_path_for(path)) as db:
+            _manifest_to_db(db, data)
+    write_json_atomic(path, data)
 
 
 # ---------------------------------------------------------------------------
@@ -320,6 +513,117 @@ def save_manifest(path: Path, data: dict) -> None:
 # ---------------------------------------------------------------------------
 
 
+class RequestThrottle:
+    """Space requests at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self) -> None:
+        """Block until this caller's request slot comes up."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ScrapeProgress:
+    """Thread-safe document/page counters across concurrently scraped volumes.
+
+    scrape_volume() reports into it; summary() renders one aggregated line.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._volumes: dict[str, dict] = {}
+
+    def start_volume(self, volume_id: str, total_docs: int, done_docs: int) -> None:
+        with self._lock:
+            self._volumes[volume_id] = {
+                "total": total_docs, "done": done_docs, "failed": 0, "pages": 0,
+                "finished": False,
+            }
+
+    def document_done(self, volume_id: str, pages: int, ok: bool = True) -> None:
+        with self._lock:
+            volume = self._volumes[volume_id]
+            volume["done" if ok else "failed"] += 1
+            volume["pages"] += pages
+
+    def finish_volume(self, volume_id: str) -> None:
+        with self._lock:
+            if volume_id in self._volumes:
+                self._volumes[volume_id]["finished"] = True
+
+    def summary(self) -> str:
+        """e.g. 'CO273_534 12/26 | CO273_550 3/14 (1 failed) | 1234 pages, 5.2 pages/s'"""
+        with self._lock:
+            parts = []
+            pages = 0
+            for volume_id, v in self._volumes.items():
+                part = f"{volume_id} {v['done']}/{v['total']}"
+                if v["failed"]:
+                    part += f" ({v['failed']} failed)"
+                if v["finished"]:
+                    part += " done"
+                parts.append(part)
+                pages += v["pages"]
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+        parts.append(f"{pages} pages, {pages / elapsed:.1f} pages/s")
+        return " | ".join(parts)
+
+
+def _open_page_engine(
+    stack: ExitStack,
+    engine: str,
+    session: requests.Session,
+    max_workers: int,
+    limiter: AdaptiveLimiter | None = None,
+) -> PageSubmitter:
+    """Start a page-download engine on `stack` and return its submit function.
+
+    Engines:
+    - "threads": ThreadPoolExecutor sharing the requests.Session. With a
+      limiter the pool is sized to limiter.max_limit and the limiter decides
+      how many threads actually have a request in flight
+    - "async": one httpx event loop with max_workers requests in flight, or
+      limiter.max_limit with the limiter deciding how many actually are
+      (requires the optional httpx dependency)
+
+    Raises ValueError for an unknown engine name.
+    """
+    if engine == "threads":
+        pool_size = limiter.max_limit if limiter else max_workers
+        executor = stack.enter_context(ThreadPoolExecutor(max_workers=pool_size))
+        return partial(executor.submit, _download_single_page, session, limiter=limiter)
+    if engine == "async":
+        from src.async_download import AsyncPageDownloader
+        in_flight = limiter.max_limit if limiter else max_workers
+        downloader = stack.enter_context(
+            AsyncPageDownloader(session, max_in_flight=in_flight, limiter=limiter)
+        )
+        return downloader.submit
+    raise ValueError(f"Unknown download engine: {engine}")
+
+
+def _record_failed_doc(
+    manifest: dict, doc_id: str, error: Exception, db: ManifestDB | None = None,
+) -> None:
+    """Log a document failure and add it to the manifest's failed_docs (and db)."""
+    print(f"    FAILED {doc_id}: {error}")
+    manifest.setdefault("failed_docs", [])
+    if doc_id not in manifest["failed_docs"]:
+        manifest["failed_docs"].append(doc_id)
+    if db is not None:
+        db.mark(MANIFEST_DOC, doc_id, "failed", str(error))
+        db.flush()
+
+
 def scrape_volume(
     session: requests.Session,
     volume_id: str,
@@ -327,14 +631,45 @@ def scrape_volume(
     output_dir: Path,
     resume: bool = True,
     max_workers: int | None = None,
+    prefetch: int | None = None,
+    engine: str = "threads",
+    adaptive: bool = True,
+    fetch: str = "images",
+    limiter: AdaptiveLimiter | None = None,
+    throttle: RequestThrottle | None = None,
+    progress: ScrapeProgress | None = None,
+    on_document: Callable[[str, Path], None] | None = None,
 ) -> dict:
     """Download all documents for a volume using the dviViewer API.
 
-    For each document:
-    1. Call dviViewer/getDviDocument to get JSON with page tokens + OCR
-    2. Download page images using recordId tokens
-    3. Extract OCR text from the JSON response
-    4. Track progress in manifest for resume support
+    Documents are scheduled across the whole volume rather than one at a time:
+    1. dviViewer metadata for the next `prefetch` documents is fetched in the
+       background, spaced DOWNLOAD_DELAY apart by a shared RequestThrottle
+    2. Page images from every in-flight document share one pool of
+       `max_workers` download slots, so short documents don't leave it idle
+    3. Documents are finished in order: OCR text saved, pages ingested into
+       the volume's content-addressed PageStore, manifest updated
+
+    Per-document progress is committed to manifest.sqlite as each document
+    finishes; manifest.json is written at the start and end of the run.
+
+    `engine` selects the page-download backend: "threads" (default,
+    MAX_WORKERS slots) or "async" (httpx, ASYNC_MAX_IN_FLIGHT slots).
+
+    With `adaptive`, an AdaptiveLimiter shared by the metadata and page
+    requests (either engine) starts at `max_workers` and grows or shrinks
+    the number of requests in flight from server response signals.
+
+    `fetch` selects how page images are obtained: "images" (one request per
+    page) or "pdf" (one BulkPDF request per document, split locally by
+    src.bulk_pdf, falling back to page images if Gale won't serve the PDF).
+
+    Several volumes can be scraped at once on one session by passing the
+    same `limiter` (global concurrency budget, replacing the per-volume one),
+    `throttle` (global metadata request rate) and `progress` to each call.
+
+    `on_document(doc_id, doc_images_dir)` is called, on this thread, after
+    each document is finished and committed (see src.ocr.stream).
 
     Saves images to output_dir/{volume_id}/images/{safe_doc_id}/page_NNNN.jpg
     Saves text to output_dir/{volume_id}/text/{safe_doc_id}.txt
@@ -344,6 +679,14 @@ def scrape_volume(
     text_dir = volume_dir / "text"
     manifest_path = volume_dir / "manifest.json"
 
+    if fetch not in ("images", "pdf"):
+        raise ValueError(f"Unknown fetch mode: {fetch}")
+    if max_workers is None:
+        max_workers = ASYNC_MAX_IN_FLIGHT if engine == "async" else MAX_WORKERS
+    if prefetch is None:
+        prefetch = PREFETCH_DOCS
+    prefetch = max(1, prefetch)
+
     # Load or create manifest
     if resume:
         manifest = load_manifest(manifest_path)
@@ -363,59 +706,137 @@ def scrape_volume(
         manifest["doc_ids"] = doc_ids
 
     manifest["total_documents"] = len(doc_ids)
-    save_manifest(manifest_path, manifest)
+    manifest_db = ManifestDB(db_path_for(manifest_path))
+    _manifest_to_db(manifest_db, manifest)
+    write_json_atomic(manifest_path, manifest)
     print(f"[{volume_id}] {len(doc_ids)} documents to process")
 
     downloaded_docs = set(manifest.get("downloaded_docs", []))
+    remaining = (
+        (i, doc_id) for i, doc_id in enumerate(doc_ids, 1)
+        if doc_id not in downloaded_docs
+    )
+    store = PageStore(volume_dir)
+    if progress:
+        progress.start_volume(volume_id, len(doc_ids), len(downloaded_docs))
+    if throttle is None:
+        throttle = RequestThrottle(DOWNLOAD_DELAY)
+    if limiter is None and adaptive:
+        limiter = AdaptiveLimiter(
+            initial=max_workers, max_limit=max(max_workers, ADAPTIVE_MAX_WORKERS),
+        )
+
+    def fetch_metadata(doc_id: str) -> dict:
+        throttle.wait()
+        return get_document_data(session, doc_id, limiter=limiter)
+
+    # metadata_queue: (index, doc_id, Future[dict]) awaiting dviViewer JSON
+    # in_flight: (doc_id, doc_data, [Future]) with pages queued
+    metadata_queue: deque = deque()
+    in_flight: deque = deque()
     consecutive_failures = 0
+    aborted = False
+
+    with ExitStack() as stack:
+        stack.callback(manifest_db.close)
+        metadata_pool = stack.enter_context(ThreadPoolExecutor(max_workers=prefetch))
+        submit_page = _open_page_engine(stack, engine, session, max_workers, limiter)
+        if fetch == "pdf":
+            from src.bulk_pdf import fetch_document_pdf
+            pdf_pool = stack.enter_context(ThreadPoolExecutor(max_workers=prefetch + 1))
+
+        def top_up_metadata() -> None:
+            while not aborted and len(metadata_queue) < prefetch:
+                nxt = next(remaining, None)
+                if nxt is None:
+                    return
+                i, doc_id = nxt
+                future = metadata_pool.submit(fetch_metadata, doc_id)
+                metadata_queue.append((i, doc_id, future))
+
+        top_up_metadata()
+
+        while metadata_queue or in_flight:
+            # Start the next document while the page window has room
+            if metadata_queue and len(in_flight) <= prefetch:
+                i, doc_id, future = metadata_queue.popleft()
+                top_up_metadata()
+                print(f"  [{volume_id}] {i}/{len(doc_ids)}: {doc_id}")
+
+                try:
+                    doc_data = future.result()
+                except Exception as e:
+                    _record_failed_doc(manifest, doc_id, e, manifest_db)
+                    if progress:
+                        progress.document_done(volume_id, 0, ok=False)
+                    consecutive_failures += 1
+
+                    if consecutive_failures >= 3:
+                        print(f"\n  [{volume_id}] 3 consecutive failures - session may have expired.")
+                        print(f"  [{volume_id}] Re-run with --resume to retry failed documents.")
+                        aborted = True
+                        for _, _, pending in metadata_queue:
+                            pending.cancel()
+                        metadata_queue.clear()
+                    continue
+
+                consecutive_failures = 0
+                image_list = doc_data.get("imageList", [])
+                print(f"    {len(image_list)} pages found")
+                if fetch == "pdf":
+                    futures = [pdf_pool.submit(
+                        fetch_document_pdf, session, doc_data, doc_id, volume_dir,
+                        submit_page, limiter,
+                    )]
+                else:
+                    doc_images_dir = images_dir / sanitize_doc_id(doc_id)
+                    futures = _submit_document_pages(submit_page, doc_data, doc_images_dir)
+                in_flight.append((doc_id, doc_data, futures))
+                continue
 
-    for i, doc_id in enumerate(doc_ids, 1):
-        if doc_id in downloaded_docs:
-            continue
-
-        safe_id = sanitize_doc_id(doc_id)
-        print(f"  [{volume_id}] {i}/{len(doc_ids)}: {doc_id}")
-
-        try:
-            # Step 1: Get document data from dviViewer API
-            doc_data = get_document_data(session, doc_id)
-            image_list = doc_data.get("imageList", [])
-            print(f"    {len(image_list)} pages found")
-
-            # Step 2: Download page images
-            doc_images_dir = images_dir / safe_id
-            pages = download_document_pages(session, doc_data, doc_images_dir, max_workers=max_workers)
-            print(f"    {pages}/{len(image_list)} page images downloaded")
-
-            # Step 3: Extract OCR text
-            ocr_pages = save_ocr_text(doc_data, text_dir, doc_id)
-            if ocr_pages:
-                print(f"    {ocr_pages} pages of OCR text saved")
-
-            # Mark as complete
-            manifest.setdefault("downloaded_docs", []).append(doc_id)
-            downloaded_docs.add(doc_id)
-            consecutive_failures = 0
-
-        except Exception as e:
-            print(f"    FAILED: {e}")
-            manifest.setdefault("failed_docs", [])
-            if doc_id not in manifest["failed_docs"]:
-                manifest["failed_docs"].append(doc_id)
-            consecutive_failures += 1
-
-            if consecutive_failures >= 3:
-                print(f"\n  [{volume_id}] 3 consecutive failures - session may have expired.")
-                print(f"  [{volume_id}] Re-run with --resume to retry failed documents.")
-                save_manifest(manifest_path, manifest)
-                break
-
-        save_manifest(manifest_path, manifest)
-        time.sleep(DOWNLOAD_DELAY)
+            # Window full (or nothing left to start): finish the oldest document
+            doc_id, doc_data, futures = in_flight.popleft()
+            try:
+                # Futures resolve to a bool per page, or a page count per BulkPDF
+                pages = sum(int(f.result()) for f in futures)
+                total = len(doc_data.get("imageList", []))
+                print(f"    {doc_id}: {pages}/{total} page images downloaded")
+
+                ocr_pages = save_ocr_text(doc_data, text_dir, doc_id)
+                if ocr_pages:
+                    print(f"    {doc_id}: {ocr_pages} pages of OCR text saved")
+
+                doc_images_dir = images_dir / sanitize_doc_id(doc_id)
+                if doc_images_dir.exists():
+                    store.ingest_document(doc_images_dir.name)
+                    store.save()
+
+                manifest.setdefault("downloaded_docs", []).append(doc_id)
+                downloaded_docs.add(doc_id)
+                manifest_db.mark(MANIFEST_DOC, doc_id, "done")
+                manifest_db.flush()
+                if progress:
+                    progress.document_done(volume_id, pages)
+            except Exception as e:
+                _record_failed_doc(manifest, doc_id, e, manifest_db)
+                if progress:
+                    progress.document_done(volume_id, 0, ok=False)
+            else:
+                if on_document:
+                    on_document(doc_id, doc_images_dir)
+
+    write_json_atomic(manifest_path, manifest)
 
     done = len(manifest.get("downloaded_docs", []))
     failed = len(manifest.get("failed_docs", []))
     print(f"[{volume_id}] Done: {done} downloaded, {failed} failed")
+    if store.has_index:
+        stats = store.stats()
+        print(f"[{volume_id}] Page store: {stats['unique']} unique images for {stats['pages']} pages")
+    if limiter:
+        print(f"[{volume_id}] Adaptive concurrency ended at {limiter.current_limit}")
+    if progress:
+        progress.finish_volume(volume_id)
     return manifest
 
 
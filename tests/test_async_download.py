@@ -0,0 +1,166 @@
+# tests/test_async_download.py
+import pytest
+from unittest.mock import AsyncMock, patch
+
+import requests
+
+httpx = pytest.importorskip("httpx")
+
+from src.async_download import AsyncPageDownloader
+from src.rate_control import AdaptiveLimiter, is_congestion_error
+from src.scraper import PartialPage, scrape_volume
+
+
+JPEG_BODY = b"\xff\xd8\xff" + b"x" * 5000 + b"\xff\xd9"
+
+
+def _session() -> requests.Session:
+    session = requests.Session()
+    session.cookies.set("JSESSIONID11_omni", "abc", domain="luna-gale-com.libproxy1.nus.edu.sg")
+    session.headers.update({"User-Agent": "test-agent"})
+    return session
+
+
+def test_async_downloader_fetches_pages(tmp_path):
+    """Pages are downloaded through the shared client with session cookies."""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, content=JPEG_BODY)
+
+    pages = [{"pageNumber": str(i), "recordId": f"TOKEN_{i}"} for i in range(1, 6)]
+
+    with AsyncPageDownloader(_session(), max_in_flight=2,
+                             transport=httpx.MockTransport(handler)) as downloader:
+        futures = [downloader.submit(p, tmp_path) for p in pages]
+        results = [f.result() for f in futures]
+
+    assert results == [True] * 5
+    for i in range(1, 6):
+        assert (tmp_path / f"page_{i:04d}.jpg").read_bytes() == JPEG_BODY
+    assert len(seen) == 5
+    assert seen[0].url.params["format"] == "jpeg"
+    assert seen[0].headers["User-Agent"] == "test-agent"
+    assert "JSESSIONID11_omni=abc" in seen[0].headers.get("Cookie", "")
+
+
+def test_async_downloader_skips_existing(tmp_path):
+    """Existing page files are not re-fetched."""
+    (tmp_path / "page_0001.jpg").write_bytes(JPEG_BODY)
+    handler = AsyncMock()
+
+    with AsyncPageDownloader(_session(), transport=httpx.MockTransport(handler)) as downloader:
+        result = downloader.submit({"pageNumber": "1", "recordId": "T"}, tmp_path).result()
+
+    assert result is True
+    handler.assert_not_called()
+
+
+def test_async_downloader_rejects_small(tmp_path):
+    """Bodies under 1000 bytes are retried and then reported as failures."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"tiny"))
+
+    with patch("src.async_download.asyncio.sleep", new=AsyncMock()):
+        with AsyncPageDownloader(_session(), transport=transport) as downloader:
+            result = downloader.submit({"pageNumber": "1", "recordId": "T"}, tmp_path).result()
+
+    assert result is False
+    assert not (tmp_path / "page_0001.jpg").exists()
+
+
+def test_async_downloader_honours_retry_after(tmp_path):
+    """A 429 backs off the limiter and the retry waits for Retry-After."""
+    responses = iter([
+        httpx.Response(429, headers={"Retry-After": "7"}),
+        httpx.Response(200, content=JPEG_BODY),
+    ])
+    transport = httpx.MockTransport(lambda request: next(responses))
+    limiter = AdaptiveLimiter(initial=4, max_limit=8)
+    clock = [1000.0]
+
+    async def fake_sleep(seconds):
+        clock[0] += seconds
+
+    sleep = AsyncMock(side_effect=fake_sleep)
+
+    with patch("src.async_download.asyncio.sleep", new=sleep), \
+            patch("src.rate_control.time.monotonic", side_effect=lambda: clock[0]):
+        with AsyncPageDownloader(_session(), transport=transport, limiter=limiter) as downloader:
+            result = downloader.submit({"pageNumber": "1", "recordId": "T"}, tmp_path).result()
+
+    assert result is True
+    sleep.assert_awaited_once_with(7.0)
+    assert limiter.current_limit == 2
+    assert (tmp_path / "page_0001.jpg").read_bytes() == JPEG_BODY
+
+
+def test_async_downloader_not_found_keeps_limit(tmp_path):
+    """A 404 is retried without shrinking the limiter."""
+    transport = httpx.MockTransport(lambda request: httpx.Response(404))
+    limiter = AdaptiveLimiter(initial=4, max_limit=8)
+
+    with patch("src.async_download.asyncio.sleep", new=AsyncMock()):
+        with AsyncPageDownloader(_session(), transport=transport, limiter=limiter) as downloader:
+            result = downloader.submit({"pageNumber": "1", "recordId": "T"}, tmp_path).result()
+
+    assert result is False
+    assert limiter.current_limit == 4
+
+
+def test_httpx_timeout_is_congestion():
+    """httpx timeouts back off the limiter like requests.Timeout does."""
+    assert is_congestion_error(httpx.ReadTimeout("read timed out"))
+    assert not is_congestion_error(httpx.ConnectError("connection refused"))
+
+
+def test_async_downloader_buffers_writes(tmp_path):
+    """Chunks are coalesced into ASYNC_WRITE_BUFFER-sized writes."""
+    body = b"\xff\xd8\xff" + b"x" * 20000 + b"\xff\xd9"
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    writes = []
+    real_write = PartialPage.write
+
+    def record(part, data):
+        writes.append(len(data))
+        real_write(part, data)
+
+    with patch("src.async_download.DOWNLOAD_CHUNK_SIZE", 1000), \
+            patch("src.async_download.ASYNC_WRITE_BUFFER", 8000), \
+            patch.object(PartialPage, "write", record):
+        with AsyncPageDownloader(_session(), transport=transport) as downloader:
+            result = downloader.submit({"pageNumber": "1", "recordId": "T"}, tmp_path).result()
+
+    assert result is True
+    assert sum(writes) == len(body)
+    assert len(writes) < 5
+    assert (tmp_path / "page_0001.jpg").read_bytes() == body
+
+
+def test_scrape_volume_async_engine(tmp_path):
+    """scrape_volume drives the async engine through the same interface."""
+    doc_data = {
+        "imageList": [{"pageNumber": "1", "recordId": "T1"}, {"pageNumber": "2", "recordId": "T2"}],
+    }
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=JPEG_BODY))
+    real_downloader = AsyncPageDownloader
+
+    with patch("src.scraper.DOWNLOAD_DELAY", 0), \
+            patch("src.scraper.get_document_data", return_value=doc_data), \
+            patch("src.async_download.AsyncPageDownloader",
+                  side_effect=lambda s, max_in_flight, limiter: real_downloader(
+                      s, max_in_flight, transport=transport, limiter=limiter)):
+        manifest = scrape_volume(
+            _session(), "CO273_TEST", ["GALE|A1", "GALE|B2"], tmp_path,
+            resume=False, engine="async",
+        )
+
+    assert manifest["downloaded_docs"] == ["GALE|A1", "GALE|B2"]
+    assert (tmp_path / "CO273_TEST" / "images" / "GALE_B2" / "page_0002.jpg").exists()
+
+
+def test_scrape_volume_unknown_engine(tmp_path):
+    """An unknown engine name raises ValueError."""
+    with pytest.raises(ValueError, match="Unknown download engine"):
+        scrape_volume(_session(), "CO273_TEST", ["GALE|A1"], tmp_path,
+                      resume=False, engine="carrier-pigeon")
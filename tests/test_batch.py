@@ -0,0 +1,157 @@
+# tests/test_batch.py
+import json
+import os
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from PIL import Image
+
+from src.ocr.batch import BATCH_JOBS, LocalBatchBackend, request_size, run_batch_pipeline
+from src.ocr.config import OCR_PROMPTS
+from src.ocr.gemini_ocr import load_image_part
+from src.ocr.manifest import OcrManifest
+
+
+def _create_doc_images(images_dir: Path, doc_id: str, count: int) -> None:
+    """Create test images in a per-document subdirectory."""
+    doc_dir = images_dir / doc_id
+    doc_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(1, count + 1):
+        img = Image.new("RGB", (100, 100), color=(i * 30, i * 30, i * 30))
+        img.save(doc_dir / f"page_{i:04d}.jpg")
+
+
+def _mock_model(text: str = "Batch text") -> MagicMock:
+    """Model whose synchronous generate_content returns fixed text."""
+    model = MagicMock()
+    model.model_name = "models/test"
+    model.generate_content.return_value = MagicMock(text=text)
+    return model
+
+
+@pytest.mark.asyncio
+async def test_run_batch_pipeline_writes_pages(tmp_path):
+    """Batch responses land in ocr/{doc_id}/page_NNNN.{txt,json} and the manifest."""
+    volume_dir = tmp_path / "CO273_534"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", 2)
+    _create_doc_images(volume_dir / "images", "GALE_BBB222", 1)
+    backend = LocalBatchBackend(_mock_model(), polls=2)
+
+    # One page per job: every image is larger than max_bytes
+    result = await run_batch_pipeline(
+        volume_dir, "CO273_534", backend, poll_interval=0, max_bytes=1,
+    )
+
+    assert len(backend._jobs) == 3
+    assert sorted(result["completed_pages"]) == [
+        "GALE_AAA111/1", "GALE_AAA111/2", "GALE_BBB222/1",
+    ]
+    assert result[BATCH_JOBS] == []
+    txt = volume_dir / "ocr" / "GALE_AAA111" / "page_0002.txt"
+    assert txt.read_text(encoding="utf-8") == "Batch text"
+    meta = json.loads(txt.with_suffix(".json").read_text(encoding="utf-8"))
+    assert meta["source_document"] == "GALE_AAA111"
+    assert meta["prompt_key"] == "general"
+
+
+@pytest.mark.asyncio
+async def test_run_batch_pipeline_resumes_submitted_jobs(tmp_path):
+    """Jobs recorded in the manifest are polled, not submitted again."""
+    volume_dir = tmp_path / "CO273_534"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", 2)
+    model = _mock_model()
+    backend = LocalBatchBackend(model)
+
+    name = backend.submit([
+        {"key": f"GALE_AAA111/{i}", "prompt": "p", "image": {"mime_type": "image/jpeg", "data": b""}}
+        for i in (1, 2)
+    ], "earlier-run")
+    with OcrManifest(volume_dir / "ocr_manifest.json") as manifest:
+        manifest.db.set_meta(BATCH_JOBS, [
+            {"name": name, "keys": ["GALE_AAA111/1", "GALE_AAA111/2"], "prompt_key": "tabular"},
+        ])
+
+    result = await run_batch_pipeline(volume_dir, "CO273_534", backend, poll_interval=0)
+
+    assert len(backend._jobs) == 1
+    assert model.generate_content.call_count == 2
+    assert len(result["completed_pages"]) == 2
+    meta = json.loads((volume_dir / "ocr" / "GALE_AAA111" / "page_0001.json").read_text(encoding="utf-8"))
+    assert meta["prompt_key"] == "tabular"
+
+
+@pytest.mark.asyncio
+async def test_run_batch_pipeline_failed_requests_are_resubmitted(tmp_path):
+    """A page whose request errored is marked failed and batched again next run."""
+    volume_dir = tmp_path / "CO273_534"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", 2)
+    model = _mock_model()
+    ok = MagicMock(text="Batch text")
+    model.generate_content.side_effect = [ok, RuntimeError("blocked")]
+
+    result = await run_batch_pipeline(volume_dir, "CO273_534", LocalBatchBackend(model), poll_interval=0)
+    assert result["completed_pages"] == ["GALE_AAA111/1"]
+    assert result["failed_pages"] == [{"page": "GALE_AAA111/2", "error": "blocked"}]
+
+    model.generate_content.side_effect = None
+    model.generate_content.return_value = ok
+    backend = LocalBatchBackend(model)
+    result = await run_batch_pipeline(volume_dir, "CO273_534", backend, poll_interval=0)
+
+    assert [r["key"] for r in backend._jobs["local-batches/1"]["requests"]] == ["GALE_AAA111/2"]
+    assert sorted(result["completed_pages"]) == ["GALE_AAA111/1", "GALE_AAA111/2"]
+    assert result["failed_pages"] == []
+
+
+
+@pytest.mark.asyncio
+async def test_run_batch_pipeline_records_jobs_as_submitted(tmp_path):
+    """Jobs created before a failed submission are in the manifest for the next run."""
+    volume_dir = tmp_path / "CO273_534"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", 2)
+    backend = LocalBatchBackend(_mock_model())
+    submit = backend.submit
+
+    def submit_once(requests, display_name):
+        """Accept the first job, then fail like a quota error."""
+        if backend._jobs:
+            raise RuntimeError("quota exceeded")
+        return submit(requests, display_name)
+
+    backend.submit = submit_once
+
+    with pytest.raises(RuntimeError):
+        await run_batch_pipeline(volume_dir, "CO273_534", backend, poll_interval=0, max_bytes=1)
+
+    with OcrManifest(volume_dir / "ocr_manifest.json") as manifest:
+        jobs = manifest.db.get_meta(BATCH_JOBS, [])
+    assert [job["keys"] for job in jobs] == [["GALE_AAA111/1"]]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_pipeline_budgets_encoded_request_size(tmp_path):
+    """Jobs are packed by base64-encoded size, not raw image bytes."""
+    volume_dir = tmp_path / "CO273_534"
+    doc_dir = volume_dir / "images" / "GALE_AAA111"
+    doc_dir.mkdir(parents=True)
+    for i in range(1, 5):
+        noise = Image.frombytes("RGB", (200, 200), os.urandom(200 * 200 * 3))
+        noise.save(doc_dir / f"page_{i:04d}.jpg", quality=95)
+    pages = sorted(doc_dir.glob("*.jpg"))
+    prompt = OCR_PROMPTS["general"]
+    sizes = [request_size(prompt, load_image_part(page)) for page in pages]
+    raw = [page.stat().st_size for page in pages]
+    # A third page misses by one byte; counted raw, all four would fit in one job
+    max_bytes = sum(sizes[:3]) - 1
+    assert sum(raw) < max_bytes
+
+    backend = LocalBatchBackend(_mock_model())
+    result = await run_batch_pipeline(
+        volume_dir, "CO273_534", backend, poll_interval=0, max_bytes=max_bytes,
+    )
+
+    assert [len(job["requests"]) for job in backend._jobs.values()] == [2, 2]
+    for job in backend._jobs.values():
+        assert sum(request_size(r["prompt"], r["image"]) for r in job["requests"]) <= max_bytes
+    assert len(result["completed_pages"]) == 4
@@ -0,0 +1,122 @@
+# tests/test_bulk_pdf.py
+import io
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+from PIL import Image
+
+from src.bulk_pdf import (
+    BULK_PDF_DIR,
+    bulk_pdf_record_ids,
+    download_bulk_pdf,
+    fetch_document_pdf,
+)
+
+
+def _pdf_bytes(num_pages: int) -> bytes:
+    """A PDF with one embedded JPEG per page, like a BulkPDF response."""
+    pages = [Image.new("RGB", (200, 300), color=(i * 40, 0, 0)) for i in range(num_pages)]
+    buf = io.BytesIO()
+    pages[0].save(buf, "PDF", save_all=True, append_images=pages[1:])
+    return buf.getvalue()
+
+
+def _doc_data(num_pages: int) -> dict:
+    return {
+        "imageList": [
+            {"pageNumber": str(i), "recordId": f"TOKEN_{i}"}
+            for i in range(1, num_pages + 1)
+        ],
+        "originalDocument": {
+            "formatPdfRecordIdsForDviDownload": "|".join(f"rec{i}" for i in range(num_pages)),
+        },
+    }
+
+
+def _pdf_session(body: bytes) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {"Content-Type": "application/pdf"}
+    response.iter_content.side_effect = lambda chunk_size: iter([body])
+    session = MagicMock()
+    session.post.return_value = response
+    return session
+
+
+def test_bulk_pdf_record_ids():
+    """Record IDs come from formatPdfRecordIdsForDviDownload."""
+    assert bulk_pdf_record_ids(_doc_data(2)) == "rec0|rec1"
+    assert bulk_pdf_record_ids({"originalDocument": {}}) == ""
+
+
+@patch("src.bulk_pdf.MIN_PDF_BYTES", 0)
+def test_download_bulk_pdf_one_request(tmp_path):
+    """A whole document arrives in a single POST and is renamed into place."""
+    session = _pdf_session(_pdf_bytes(3))
+    pdf_path = tmp_path / "doc.pdf"
+
+    assert download_bulk_pdf(session, _doc_data(3), pdf_path) is True
+
+    session.post.assert_called_once()
+    assert session.post.call_args.kwargs["data"] == {"recordIds": "rec0|rec1|rec2"}
+    assert pdf_path.read_bytes().startswith(b"%PDF-")
+    assert not (tmp_path / "doc.pdf.part").exists()
+
+
+@patch("src.bulk_pdf.MIN_PDF_BYTES", 0)
+def test_download_bulk_pdf_rejects_disclaimer(tmp_path):
+    """A PDF with the wrong page count is rejected without retrying."""
+    session = _pdf_session(_pdf_bytes(1))
+    pdf_path = tmp_path / "doc.pdf"
+
+    assert download_bulk_pdf(session, _doc_data(3), pdf_path) is False
+    session.post.assert_called_once()
+    assert not pdf_path.exists()
+
+
+@patch("src.bulk_pdf.MIN_PDF_BYTES", 0)
+def test_fetch_document_pdf_splits_pages(tmp_path):
+    """The PDF is split into the per-document page image layout."""
+    session = _pdf_session(_pdf_bytes(2))
+    submit_page = MagicMock()
+
+    pages = fetch_document_pdf(session, _doc_data(2), "GALE|A1", tmp_path, submit_page)
+
+    assert pages == 2
+    assert (tmp_path / "images" / "GALE_A1" / "page_0001.jpg").exists()
+    assert (tmp_path / "images" / "GALE_A1" / "page_0002.jpg").exists()
+    assert (tmp_path / BULK_PDF_DIR / "GALE_A1" / "GALE_A1.pdf").exists()
+    submit_page.assert_not_called()
+
+
+def test_fetch_document_pdf_falls_back_to_images(tmp_path):
+    """Without usable record IDs, pages are fetched one image at a time."""
+    doc_data = _doc_data(2)
+    doc_data["originalDocument"] = {}
+    done = Future()
+    done.set_result(True)
+    submit_page = MagicMock(return_value=done)
+
+    pages = fetch_document_pdf(MagicMock(), doc_data, "GALE|A1", tmp_path, submit_page)
+
+    assert pages == 2
+    assert submit_page.call_count == 2
+
+
+@patch("src.bulk_pdf.MIN_PDF_BYTES", 0)
+def test_scrape_volume_pdf_fetch(tmp_path):
+    """scrape_volume(fetch="pdf") makes one PDF request per document."""
+    from src.scraper import scrape_volume
+
+    session = _pdf_session(_pdf_bytes(2))
+    with patch("src.scraper.DOWNLOAD_DELAY", 0), \
+            patch("src.scraper.get_document_data", return_value=_doc_data(2)):
+        manifest = scrape_volume(
+            session, "CO273_TEST", ["GALE|A1", "GALE|B2"], tmp_path,
+            resume=False, fetch="pdf",
+        )
+
+    assert manifest["downloaded_docs"] == ["GALE|A1", "GALE|B2"]
+    assert session.post.call_count == 2
+    session.get.assert_not_called()
+    assert (tmp_path / "CO273_TEST" / "images" / "GALE_B2" / "page_0002.jpg").exists()
@@ -0,0 +1,97 @@
+# tests/test_cache.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from PIL import Image
+
+from src.ocr.cache import ResponseCache
+from src.ocr.correct import correct_single_page
+from src.ocr.gemini_ocr import ocr_single_page
+
+
+def _mock_model(text: str = "Transcribed text", name: str = "models/gemini-2.0-flash") -> MagicMock:
+    """Helper: a Gemini model mock returning `text`."""
+    response = MagicMock()
+    response.text = text
+    model = MagicMock()
+    model.model_name = name
+    model._generation_config = {"temperature": 0}
+    model.generate_content_async = AsyncMock(return_value=response)
+    return model
+
+
+def test_cache_key_covers_prompt_model_and_input():
+    """Changing the prompt, model, generation config or input changes the key."""
+    model = _mock_model()
+    base = ResponseCache.key("ocr", model, "prompt", b"image")
+
+    assert base == ResponseCache.key("ocr", _mock_model(), "prompt", b"image")
+    assert base != ResponseCache.key("ocr", model, "other prompt", b"image")
+    assert base != ResponseCache.key("ocr", model, "prompt", b"other image")
+    assert base != ResponseCache.key("ocr", _mock_model(name="models/gemini-pro"), "prompt", b"image")
+    assert base != ResponseCache.key("correct", model, "prompt", b"image")
+
+    tuned = _mock_model()
+    tuned._generation_config = {"temperature": 1}
+    assert base != ResponseCache.key("ocr", tuned, "prompt", b"image")
+
+
+def test_cache_persists_and_evicts_least_recently_used(tmp_path):
+    """Entries survive reopening; the oldest unused ones go once max_bytes is exceeded."""
+    path = tmp_path / "ocr_cache.sqlite"
+    with ResponseCache(path, max_bytes=10) as cache:
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        assert cache.get("a") == "aaaa"  # a is now more recent than b
+        cache.put("c", "cccc")
+
+        assert cache.get("b") is None
+        assert cache.size == 8
+
+    with ResponseCache(path, max_bytes=10) as cache:
+        assert cache.get("a") == "aaaa"
+        assert cache.get("c") == "cccc"
+        assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_ocr_single_page_reuses_cached_response(tmp_path):
+    """A repeat OCR of the same image and prompt makes no API call."""
+    img_path = tmp_path / "page_0001.jpg"
+    Image.new("RGB", (60, 60)).save(img_path)
+    model = _mock_model()
+
+    with ResponseCache(tmp_path / "ocr_cache.sqlite") as cache:
+        for out in ("first", "second"):
+            assert await ocr_single_page(
+                model=model, image_path=img_path, page_num=1, volume_id="CO273_534",
+                source_document="GALE_AAA111", output_dir=tmp_path / out, cache=cache,
+            )
+        await ocr_single_page(
+            model=model, image_path=img_path, page_num=1, volume_id="CO273_534",
+            source_document="GALE_AAA111", output_dir=tmp_path / "tabular",
+            prompt_key="tabular", cache=cache,
+        )
+
+    assert model.generate_content_async.call_count == 2  # general once, tabular once
+    assert (tmp_path / "second" / "page_0001.txt").read_text() == "Transcribed text"
+
+
+@pytest.mark.asyncio
+async def test_correct_single_page_reuses_cached_response(tmp_path):
+    """Correcting identical text again is served from the cache."""
+    model = _mock_model("Corrected text")
+    pages = []
+    for name in ("a", "b"):
+        path = tmp_path / name / "page_0001.txt"
+        path.parent.mkdir()
+        path.write_text("tbe raw text", encoding="utf-8")
+        pages.append(path)
+
+    with ResponseCache(tmp_path / "ocr_cache.sqlite") as cache:
+        for path in pages:
+            assert await correct_single_page(model, path, cache=cache)
+
+    assert model.generate_content_async.call_count == 1
+    assert pages[1].read_text() == "Corrected text"
+    assert pages[1].with_suffix(".raw.txt").read_text() == "tbe raw text"
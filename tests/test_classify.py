@@ -0,0 +1,110 @@
+# tests/test_classify.py
+import json
+import random
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from PIL import Image, ImageDraw
+
+from src.ocr.classify import PromptRouter, classify_gale_text, classify_image, image_features
+from src.ocr.config import OCR_PROMPTS
+from src.ocr.pipeline import run_ocr_pipeline
+
+
+def _printed_page(path: Path) -> None:
+    """Rows of word-like blocks separated by clean white gaps."""
+    rng = random.Random(1)
+    img = Image.new("L", (1200, 1600), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(150, 1450, 40):
+        x = 100
+        while x < 1050:
+            w = rng.randint(30, 120)
+            draw.rectangle([x, y, x + w, y + 18], fill=20)
+            x += w + 15
+    img.save(path)
+
+
+def _table_page(path: Path) -> None:
+    """A ruled grid."""
+    img = Image.new("L", (1200, 1600), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(200, 1400, 100):
+        draw.line([100, y, 1100, y], fill=0, width=3)
+    for x in range(100, 1101, 250):
+        draw.line([x, 200, x, 1300], fill=0, width=3)
+    img.save(path)
+
+
+def _handwritten_page(path: Path) -> None:
+    """Irregular slanted strokes with no clean gaps between lines."""
+    rng = random.Random(2)
+    img = Image.new("L", (1200, 1600), 255)
+    draw = ImageDraw.Draw(img)
+    for y in range(150, 1450, 45):
+        x = 100
+        while x < 1050:
+            draw.line([
+                x, y + rng.randint(-25, 25),
+                x + rng.randint(10, 40), y + rng.randint(-45, 45),
+            ], fill=20, width=4)
+            x += rng.randint(5, 20)
+    img.save(path)
+
+
+def test_classify_image(tmp_path):
+    """Ruled grids route to tabular, gapless strokes to handwritten, print to general."""
+    for name, draw in (("print", _printed_page), ("table", _table_page), ("hand", _handwritten_page)):
+        draw(tmp_path / f"{name}.jpg")
+
+    assert classify_image(image_features(tmp_path / "print.jpg")) == "general"
+    assert classify_image(image_features(tmp_path / "table.jpg")) == "tabular"
+    assert classify_image(image_features(tmp_path / "hand.jpg")) == "handwritten"
+
+
+def test_classify_gale_text():
+    """Number-heavy Gale lines suggest a table, garbled Gale text a hand."""
+    ledger = "\n".join(f"Rice  {i},250  12.50  {i * 3}" for i in range(8))
+    assert classify_gale_text(ledger) == "tabular"
+    garbled = "tbe rnay wbich G0v ~~a tle frorn tbat witb bave rnade sbould xq!z"
+    assert classify_gale_text(garbled) == "handwritten"
+    prose = "I have the honour to transmit herewith a copy of a despatch from the Governor."
+    assert classify_gale_text(prose) is None
+
+
+def test_prompt_router_prefers_gale_text(tmp_path):
+    """A page with Gale text is routed from the text; others fall back to the image."""
+    text_dir = tmp_path / "text"
+    text_dir.mkdir()
+    ledger = "\n".join(f"Tin  {i},100  8.25  {i}" for i in range(6))
+    (text_dir / "GALE_AAA111.txt").write_text(f"--- Page 1 ---\n{ledger}\n", encoding="utf-8")
+    _printed_page(tmp_path / "page.jpg")
+
+    router = PromptRouter(text_dir)
+    assert router.route(tmp_path / "page.jpg", "GALE_AAA111", 1) == "tabular"
+    assert router.route(tmp_path / "page.jpg", "GALE_AAA111", 2) == "general"
+    assert router.route(tmp_path / "missing.jpg", "GALE_BBB222", 1) == "general"
+    assert router.summary() == "2 general, 1 tabular"
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_pipeline_auto_prompt(tmp_path):
+    """prompt_key='auto' sends each page its routed prompt and records it in the JSON."""
+    volume_dir = tmp_path / "CO273_534"
+    doc_dir = volume_dir / "images" / "GALE_AAA111"
+    doc_dir.mkdir(parents=True)
+    _printed_page(doc_dir / "page_0001.jpg")
+    _table_page(doc_dir / "page_0002.jpg")
+
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock(return_value=MagicMock(text="text"))
+
+    with patch("src.ocr.pipeline.get_gemini_model", return_value=mock_model):
+        await run_ocr_pipeline(volume_dir, "CO273_534", concurrency=1, prompt_key="auto")
+
+    prompts = {call.args[0][0] for call in mock_model.generate_content_async.call_args_list}
+    assert prompts == {OCR_PROMPTS["general"], OCR_PROMPTS["tabular"]}
+    ocr_dir = volume_dir / "ocr" / "GALE_AAA111"
+    assert json.loads((ocr_dir / "page_0001.json").read_text())["prompt_key"] == "general"
+    assert json.loads((ocr_dir / "page_0002.json").read_text())["prompt_key"] == "tabular"
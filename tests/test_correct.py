@@ -1,9 +1,17 @@
 # tests/test_correct.py
+import asyncio
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, AsyncMock
 
-from src.ocr.correct import correct_single_page, CORRECTION_PROMPT
+from src.ocr.correct import (
+    CORRECTION_PROMPT,
+    CorrectionBatcher,
+    CorrectionFilter,
+    correct_single_page,
+    noise_rate,
+    split_paragraphs,
+)
 
 
 def test_correction_prompt_exists():
@@ -55,3 +63,95 @@ async def test_correct_single_page_skips_if_corrected(tmp_path):
     assert result is True
     # Model should not have been called
     mock_model.generate_content_async.assert_not_called()
+
+
+def test_correction_filter_skip_reasons():
+    """The pre-filter only lets noisy prose through to the model."""
+    prefilter = CorrectionFilter(min_noise=0.05, max_illegible=0.3, max_table=0.5)
+    assert prefilter.skip_reason("") == "empty"
+    assert prefilter.skip_reason("| Item | $ |\n|---|---|\n| Rice | 5 |") == "tabular"
+    assert prefilter.skip_reason("[illegible] [illegible] of Singapore") == "illegible"
+    assert prefilter.skip_reason("I have the honour to transmit the connexion, 3rd inst.") == "clean"
+    assert prefilter.skip_reason("I bave tbe honour to transmit the G0vernor's letter") is None
+
+
+def test_noise_rate_ignores_archaic_and_numeric_tokens():
+    """Roman numerals, ordinals, amounts and names are not counted as OCR errors."""
+    assert noise_rate("McLeod wrote on the 2d inst. re CO 273/iii, $5,000.") == 0
+    assert noise_rate("tbe Govvvernor") == 1
+
+
+def _fixing_model() -> MagicMock:
+    """Model whose correction reply fixes 'tbe' and keeps section markers."""
+    async def generate(prompt):
+        return MagicMock(text=prompt.split("---\n", 1)[1].replace("tbe", "the"))
+
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(side_effect=generate)
+    return model
+
+
+def test_split_paragraphs_rebuilds_text():
+    """Chunks break at blank lines, stay under max_chars and rejoin exactly."""
+    text = "First para\nline two\n\nSecond para\n\n\nThird para\n"
+    chunks = split_paragraphs(text, max_chars=20)
+    assert "".join(chunk + sep for chunk, sep in chunks) == text
+    assert [chunk for chunk, _ in chunks] == ["First para\nline two", "Second para", "Third para\n"]
+    assert split_paragraphs(text, max_chars=1000) == [(text, "")]
+
+
+@pytest.mark.asyncio
+async def test_correction_batcher_packs_short_pages(tmp_path):
+    """Short pages share one request; each keeps its own .raw.txt backup."""
+    pages = []
+    for i in range(1, 4):
+        path = tmp_path / f"page_{i:04d}.txt"
+        path.write_text(f"tbe page {i}\n", encoding="utf-8")
+        pages.append(path)
+    model = _fixing_model()
+
+    async with CorrectionBatcher(model, asyncio.Semaphore(2), linger=0.01) as batcher:
+        results = await asyncio.gather(*(batcher.correct(path) for path in pages))
+
+    assert results == [True, True, True]
+    assert model.generate_content_async.await_count == 1
+    assert pages[1].read_text(encoding="utf-8") == "the page 2\n"
+    assert pages[1].with_suffix(".raw.txt").read_text(encoding="utf-8") == "tbe page 2\n"
+
+
+@pytest.mark.asyncio
+async def test_correction_batcher_splits_long_pages(tmp_path):
+    """A page over max_chars is corrected in paragraph chunks and reassembled."""
+    path = tmp_path / "page_0001.txt"
+    text = "\n\n".join(f"Paragraph {i} of tbe letter." for i in range(6))
+    path.write_text(text, encoding="utf-8")
+    model = _fixing_model()
+
+    async with CorrectionBatcher(model, asyncio.Semaphore(2), max_chars=60, linger=0) as batcher:
+        assert await batcher.correct(path)
+
+    assert model.generate_content_async.await_count == 3
+    assert path.read_text(encoding="utf-8") == text.replace("tbe", "the")
+
+
+@pytest.mark.asyncio
+async def test_correction_batcher_retries_lost_markers(tmp_path):
+    """When a batched reply loses its markers, sections are corrected one by one."""
+    pages = []
+    for i in (1, 2):
+        path = tmp_path / f"page_{i:04d}.txt"
+        path.write_text(f"tbe page {i}", encoding="utf-8")
+        pages.append(path)
+
+    async def generate(prompt):
+        body = prompt.split("---\n", 1)[1]
+        return MagicMock(text="merged" if "<<<SECTION" in body else body.replace("tbe", "the"))
+
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(side_effect=generate)
+
+    async with CorrectionBatcher(model, asyncio.Semaphore(2), linger=0.01) as batcher:
+        await asyncio.gather(*(batcher.correct(path) for path in pages))
+
+    assert model.generate_content_async.await_count == 3
+    assert [p.read_text(encoding="utf-8") for p in pages] == ["the page 1", "the page 2"]
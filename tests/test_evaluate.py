@@ -2,11 +2,15 @@
 import pytest
 from pathlib import Path
 
+from jiwer import cer, wer
+
 from src.ocr.evaluate import (
     parse_gale_text,
     load_gemini_page,
     compute_page_metrics,
     evaluate_document,
+    evaluate_volume,
+    MetricsCache,
 )
 
 
@@ -77,3 +81,71 @@ def test_evaluate_document(tmp_path):
     assert result["page_metrics"][2]["wer"] == 0.0
     assert "avg_wer" in result
     assert "avg_cer" in result
+
+
+def test_compute_page_metrics_matches_jiwer():
+    """Single-pass distances give the same WER/CER as jiwer's defaults."""
+    pairs = [
+        ("the cat sat on the mat", "the cat set on  mat"),
+        ("  Straits Settlements Despatch No. 12 ", "Straits Setlements Despatch No 12"),
+        ("hello world", ""),
+    ]
+    for ref, hyp in pairs:
+        metrics = compute_page_metrics(ref, hyp)
+        assert metrics["wer"] == round(wer(ref, hyp), 4)
+        assert metrics["cer"] == round(cer(ref, hyp), 4)
+
+    # Line breaks separate words (jiwer alone splits on spaces only)
+    assert compute_page_metrics("Straits\nSettlements", "Straits Settlements")["wer"] == 0.0
+
+
+def _write_volume(volume_dir: Path) -> None:
+    """Two documents: a long page with one error and a short page with one error."""
+    text_dir = volume_dir / "text"
+    text_dir.mkdir(parents=True)
+    long_ref = " ".join(["word"] * 9 + ["end"])
+    (text_dir / "GALE_AAA111.txt").write_text(f"--- Page 1 ---\n{long_ref}\n", encoding="utf-8")
+    (text_dir / "GALE_BBB222.txt").write_text("--- Page 1 ---\nshort page\n", encoding="utf-8")
+    for doc_id, text in (("GALE_AAA111", long_ref.replace("end", "and")), ("GALE_BBB222", "short paqe")):
+        doc_dir = volume_dir / "ocr" / doc_id
+        doc_dir.mkdir(parents=True)
+        (doc_dir / "page_0001.txt").write_text(text, encoding="utf-8")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_evaluate_volume_weighted_aggregates(tmp_path, workers):
+    """Volume results carry per-document means and reference-length-weighted errors."""
+    volume_dir = tmp_path / "CO273_534"
+    _write_volume(volume_dir)
+
+    result = evaluate_volume("CO273_534", volume_dir, workers=workers)
+
+    assert [d["doc_id"] for d in result["documents"]] == ["GALE_AAA111", "GALE_BBB222"]
+    assert result["pages_compared"] == 2
+    # Mean of document WERs (0.1 and 0.5) vs. 2 errors over 12 reference words
+    assert result["overall_wer"] == 0.3
+    assert result["weighted_wer"] == round(2 / 12, 4)
+    assert result["word_errors"] == 2 and result["ref_words"] == 12
+
+
+def test_evaluate_volume_recomputes_only_changed_pages(tmp_path):
+    """With a metrics cache, a re-run only recomputes pages whose texts changed."""
+    volume_dir = tmp_path / "CO273_534"
+    _write_volume(volume_dir)
+
+    with MetricsCache(volume_dir / "eval_cache.sqlite") as cache:
+        first = evaluate_volume("CO273_534", volume_dir, workers=1, cache=cache)
+        assert first["pages_recomputed"] == 2 and len(cache) == 2
+
+        unchanged = evaluate_volume("CO273_534", volume_dir, workers=1, cache=cache)
+        assert unchanged["pages_recomputed"] == 0
+        assert unchanged["documents"] == first["documents"]
+
+        # Re-OCR one page
+        (volume_dir / "ocr" / "GALE_BBB222" / "page_0001.txt").write_text("short page", encoding="utf-8")
+        rerun = evaluate_volume("CO273_534", volume_dir, workers=1, cache=cache)
+
+    assert rerun["pages_recomputed"] == 1
+    assert rerun["documents"][0] == first["documents"][0]
+    assert rerun["documents"][1]["avg_wer"] == 0.0
+    assert rerun == evaluate_volume("CO273_534", volume_dir, workers=1) | {"pages_recomputed": 1}
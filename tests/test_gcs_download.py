@@ -0,0 +1,79 @@
+# tests/test_gcs_download.py
+import base64
+import hashlib
+import json
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.gcs_download import VolumeDownload, download_blob
+
+
+def _blob(name: str, data: bytes) -> MagicMock:
+    """Helper: a fake GCS blob holding data."""
+    blob = MagicMock()
+    blob.name = name
+    blob.size = len(data)
+    blob.md5_hash = base64.b64encode(hashlib.md5(data).digest()).decode()
+    blob.download_to_filename.side_effect = lambda path: Path(path).write_bytes(data)
+    return blob
+
+
+def _bucket(blobs: list, index: bytes | None = None) -> MagicMock:
+    """Helper: a fake bucket listing blobs, with an optional page_index.json."""
+    bucket = MagicMock()
+    index_blob = bucket.blob.return_value
+    index_blob.exists.return_value = index is not None
+    if index is not None:
+        index_blob.download_to_filename.side_effect = lambda path: Path(path).write_bytes(index)
+    bucket.list_blobs.return_value = blobs
+    return bucket
+
+
+def test_download_blob_skips_matching_file(tmp_path):
+    """A local file with the blob's size and MD5 is not downloaded again."""
+    blob = _blob("CO273_534/images/GALE_AAA111/page_0001.jpg", b"page bytes")
+    local_path = tmp_path / "page_0001.jpg"
+
+    assert download_blob(blob, local_path) is True
+    assert download_blob(blob, local_path) is False
+    assert blob.download_to_filename.call_count == 1
+
+    local_path.write_bytes(b"page byteZ")  # same size, different content
+    assert download_blob(blob, local_path) is True
+
+
+def test_volume_download_preserves_document_layout(tmp_path):
+    """Same-named pages of different documents land in their own subdirectories."""
+    volume_dir = tmp_path / "CO273_534"
+    bucket = _bucket([
+        _blob("CO273_534/images/GALE_BBB222/page_0001.jpg", b"second doc"),
+        _blob("CO273_534/images/GALE_AAA111/page_0001.jpg", b"first doc"),
+    ])
+
+    with VolumeDownload("CO273_534", volume_dir, bucket=bucket, max_workers=2) as download:
+        count = download.wait()
+
+    assert count == 2
+    assert download.pages == [
+        volume_dir / "images" / "GALE_AAA111" / "page_0001.jpg",
+        volume_dir / "images" / "GALE_BBB222" / "page_0001.jpg",
+    ]
+    assert (volume_dir / "images" / "GALE_AAA111" / "page_0001.jpg").read_bytes() == b"first doc"
+    assert (volume_dir / "images" / "GALE_BBB222" / "page_0001.jpg").read_bytes() == b"second doc"
+
+
+def test_volume_download_indexed_volume_fetches_blobs_once(tmp_path):
+    """Indexed volumes download unique blobs and link images/ to them afterwards."""
+    volume_dir = tmp_path / "CO273_534"
+    data = b"blank folio"
+    sha = hashlib.sha256(data).hexdigest()
+    index = json.dumps({"GALE_AAA111": {"1": sha}, "GALE_BBB222": {"1": sha}}).encode()
+    bucket = _bucket([_blob(f"CO273_534/blobs/{sha[:2]}/{sha}.jpg", data)], index=index)
+
+    with VolumeDownload("CO273_534", volume_dir, bucket=bucket) as download:
+        assert len(download.futures) == 1
+        assert download.wait() == 1
+
+    assert len(download.pages) == 2
+    for page in download.pages:
+        assert page.read_bytes() == data
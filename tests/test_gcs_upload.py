@@ -2,7 +2,7 @@
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
-from src.gcs_upload import upload_file, upload_volume
+from src.gcs_upload import UPLOAD_MANIFEST, file_checksums, upload_file, upload_volume
 
 
 def test_upload_file():
@@ -33,3 +33,96 @@ def test_upload_volume(tmp_path):
 
     count = upload_volume(mock_bucket, tmp_path / "CO273_534", "CO273_534")
     assert count == 4  # 2 pages + manifest + full pdf
+
+
+def test_upload_volume_skips_partial_downloads(tmp_path):
+    """Leftover .part files from interrupted downloads are not uploaded."""
+    doc_dir = tmp_path / "CO273_534" / "images" / "GALE_AAA111"
+    doc_dir.mkdir(parents=True)
+    (doc_dir / "page_0001.jpg").write_bytes(b"fake")
+    (doc_dir / "page_0002.jpg.part").write_bytes(b"half")
+
+    mock_bucket = MagicMock()
+    count = upload_volume(mock_bucket, tmp_path / "CO273_534", "CO273_534")
+    assert count == 1
+    mock_bucket.blob.assert_called_once_with("CO273_534/images/GALE_AAA111/page_0001.jpg")
+
+
+
+def test_upload_volume_skips_bulk_pdfs(tmp_path):
+    """Raw BulkPDF downloads stay local; the pages extracted from them are uploaded."""
+    volume_dir = tmp_path / "CO273_534"
+    pdf_dir = volume_dir / "bulk_pdf" / "GALE_AAA111"
+    pdf_dir.mkdir(parents=True)
+    (pdf_dir / "GALE_AAA111.pdf").write_bytes(b"fake pdf")
+    doc_dir = volume_dir / "images" / "GALE_AAA111"
+    doc_dir.mkdir(parents=True)
+    (doc_dir / "page_0001.jpg").write_bytes(b"fake")
+
+    mock_bucket = MagicMock()
+    count = upload_volume(mock_bucket, volume_dir, "CO273_534")
+    assert count == 1
+    mock_bucket.blob.assert_called_once_with("CO273_534/images/GALE_AAA111/page_0001.jpg")
+
+def test_upload_volume_uploads_page_store_blobs_once(tmp_path):
+    """Indexed pages go up as one blob each plus the index, not per document."""
+    from src.page_store import PageStore
+
+    volume_dir = tmp_path / "CO273_534"
+    for doc in ("GALE_AAA111", "GALE_BBB222"):
+        doc_dir = volume_dir / "images" / doc
+        doc_dir.mkdir(parents=True)
+        (doc_dir / "page_0001.jpg").write_bytes(b"same blank folio")
+    PageStore(volume_dir).ingest()
+
+    mock_bucket = MagicMock()
+    count = upload_volume(mock_bucket, volume_dir, "CO273_534")
+
+    uploaded = [c.args[0] for c in mock_bucket.blob.call_args_list]
+    assert count == 2  # one blob + page_index.json
+    assert "CO273_534/page_index.json" in uploaded
+    assert not any("/images/" in name for name in uploaded)
+
+
+def test_upload_volume_skips_identical_remote_blobs(tmp_path):
+    """Files whose checksum matches the listed blob are not re-uploaded."""
+    volume_dir = tmp_path / "CO273_534"
+    volume_dir.mkdir()
+    (volume_dir / "same.json").write_text("{}")
+    (volume_dir / "changed.json").write_text('{"a": 1}')
+    (volume_dir / "composite.pdf").write_bytes(b"fake pdf")
+
+    md5, _ = file_checksums(volume_dir / "same.json")
+    _, crc32c = file_checksums(volume_dir / "composite.pdf")
+    listed = [
+        MagicMock(md5_hash=md5, crc32c="x"),
+        MagicMock(md5_hash="stale", crc32c="x"),
+        MagicMock(md5_hash=None, crc32c=crc32c),
+    ]
+    for blob, name in zip(listed, ["same.json", "changed.json", "composite.pdf"]):
+        blob.name = f"CO273_534/{name}"
+    mock_bucket = MagicMock()
+    mock_bucket.list_blobs.return_value = listed
+
+    count = upload_volume(mock_bucket, volume_dir, "CO273_534")
+
+    assert count == 1
+    mock_bucket.list_blobs.assert_called_once_with(prefix="CO273_534/")
+    mock_bucket.blob.assert_called_once_with("CO273_534/changed.json")
+    assert (volume_dir / UPLOAD_MANIFEST).exists()
+
+
+def test_upload_volume_reuses_cached_checksums(tmp_path):
+    """Unchanged files are not re-hashed, and the upload manifest is never uploaded."""
+    volume_dir = tmp_path / "CO273_534"
+    volume_dir.mkdir()
+    (volume_dir / "manifest.json").write_text("{}")
+    upload_volume(MagicMock(), volume_dir, "CO273_534")
+
+    mock_bucket = MagicMock()
+    with patch("src.gcs_upload.file_checksums") as checksums:
+        count = upload_volume(mock_bucket, volume_dir, "CO273_534")
+
+    checksums.assert_not_called()
+    assert count == 1
+    mock_bucket.blob.assert_called_once_with("CO273_534/manifest.json")
@@ -6,7 +6,7 @@ from unittest.mock import MagicMock, patch, AsyncMock
 from datetime import datetime, timezone
 
 from src.ocr.config import OCR_PROMPTS
-from src.ocr.gemini_ocr import ocr_single_page, build_page_metadata
+from src.ocr.gemini_ocr import ocr_single_page, build_page_metadata, load_image_part
 
 
 def test_build_page_metadata():
@@ -113,3 +113,32 @@ async def test_ocr_single_page_uses_prompt_variant(tmp_path):
     call_args = mock_model.generate_content_async.call_args[0][0]
     prompt_used = call_args[0]
     assert "table" in prompt_used.lower() or "column" in prompt_used.lower()
+
+
+def test_load_image_part_sends_original_jpeg_bytes(tmp_path):
+    """A JPEG within the size limit is sent as-is, without re-encoding."""
+    from PIL import Image
+    img_path = tmp_path / "page_0001.jpg"
+    Image.new("RGB", (120, 80), color=(90, 90, 90)).save(img_path)
+
+    part = load_image_part(img_path, max_edge=200)
+
+    assert part == {"mime_type": "image/jpeg", "data": img_path.read_bytes()}
+
+
+def test_load_image_part_downscales_large_or_unsupported_images(tmp_path):
+    """Oversized pages are shrunk to max_edge; non-inline formats become JPEG."""
+    import io
+    from PIL import Image
+    big = tmp_path / "big.jpg"
+    Image.new("RGB", (400, 200)).save(big)
+    bmp = tmp_path / "page.bmp"
+    Image.new("RGB", (50, 50)).save(bmp)
+
+    part = load_image_part(big, max_edge=100)
+    assert part["mime_type"] == "image/jpeg"
+    assert Image.open(io.BytesIO(part["data"])).size == (100, 50)
+
+    part = load_image_part(bmp, max_edge=0)
+    assert part["mime_type"] == "image/jpeg"
+    assert Image.open(io.BytesIO(part["data"])).format == "JPEG"
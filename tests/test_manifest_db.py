@@ -0,0 +1,67 @@
+# tests/test_manifest_db.py
+import json
+
+from src.manifest_db import ManifestDB, db_path_for, write_json_atomic
+
+
+def test_db_path_for_json_manifest(tmp_path):
+    """SQLite manifest sits next to the JSON one."""
+    assert db_path_for(tmp_path / "ocr_manifest.json") == tmp_path / "ocr_manifest.sqlite"
+
+
+def test_mark_and_status_persist(tmp_path):
+    """Item statuses and metadata survive reopening the database."""
+    path = tmp_path / "m.sqlite"
+    with ManifestDB(path) as db:
+        db.set_meta("volume_id", "CO273_534")
+        db.mark("page", "DOC/1", "done")
+        db.mark("page", "DOC/2", "failed", "timeout")
+
+    with ManifestDB(path) as db:
+        assert db.get_meta("volume_id") == "CO273_534"
+        assert db.status("page", "DOC/1") == "done"
+        assert db.items("page", "failed") == [("DOC/2", "timeout")]
+        assert db.status("page", "DOC/3") is None
+
+
+def test_remark_updates_status_and_counts(tmp_path):
+    """A failed item that later succeeds moves to done, keeping its position."""
+    with ManifestDB(tmp_path / "m.sqlite") as db:
+        db.mark("page", "1", "failed", "boom")
+        db.mark("page", "2", "done")
+        db.mark("page", "1", "done")
+        assert db.count("page", "done") == 2
+        assert db.count("page", "failed") == 0
+        assert [key for key, _ in db.items("page", "done")] == ["1", "2"]
+
+
+def test_writes_commit_in_batches(tmp_path):
+    """Writes become visible to other connections once a batch fills."""
+    path = tmp_path / "m.sqlite"
+    db = ManifestDB(path, batch_size=3)
+    db.mark("page", "1", "done")
+    db.mark("page", "2", "done")
+    with ManifestDB(path) as reader:
+        assert reader.count("page", "done") == 0
+    db.mark("page", "3", "done")
+    with ManifestDB(path) as reader:
+        assert reader.count("page", "done") == 3
+    db.close()
+
+
+def test_clear_removes_one_kind(tmp_path):
+    """clear() drops items of one kind only."""
+    with ManifestDB(tmp_path / "m.sqlite") as db:
+        db.mark("page", "1", "done")
+        db.mark("doc", "A", "done")
+        db.clear("page")
+        assert db.count("page", "done") == 0
+        assert db.status("doc", "A") == "done"
+
+
+def test_write_json_atomic(tmp_path):
+    """JSON is written without leaving a temp file behind."""
+    path = tmp_path / "out" / "manifest.json"
+    write_json_atomic(path, {"a": 1})
+    assert json.loads(path.read_text()) == {"a": 1}
+    assert list(path.parent.iterdir()) == [path]
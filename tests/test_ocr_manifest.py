@@ -3,7 +3,7 @@ import json
 import pytest
 from pathlib import Path
 
-from src.ocr.manifest import load_ocr_manifest, save_ocr_manifest, update_manifest_page
+from src.ocr.manifest import OcrManifest, load_ocr_manifest, save_ocr_manifest, update_manifest_page
 
 
 def test_load_ocr_manifest_new(tmp_path):
@@ -62,3 +62,75 @@ def test_update_manifest_page_failure():
     assert len(manifest["failed_pages"]) == 1
     assert manifest["failed_pages"][0]["page"] == "5"
     assert manifest["failed_pages"][0]["error"] == "timeout"
+
+
+def test_ocr_manifest_imports_json_and_exports(tmp_path):
+    """OcrManifest seeds SQLite from an existing JSON manifest and exports back."""
+    path = tmp_path / "ocr_manifest.json"
+    save_ocr_manifest(path, {
+        "volume_id": "CO273_534",
+        "total_pages": 3,
+        "completed_pages": ["1"],
+        "failed_pages": [{"page": "2", "error": "timeout"}],
+        "doc_page_map": {},
+    })
+
+    with OcrManifest(path) as manifest:
+        assert manifest.is_completed("1")
+        assert not manifest.is_completed("2")
+        manifest.mark_page("2", success=True)
+        manifest.mark_page("3", success=True)
+        exported = manifest.export_json()
+
+    assert exported["completed_pages"] == ["1", "2", "3"]
+    assert exported["failed_pages"] == []
+    assert load_ocr_manifest(path) == exported
+    assert json.loads(path.read_text()) == exported
+
+
+
+def test_ocr_manifest_keeps_int_page_keys(tmp_path):
+    """Int page keys written by update_manifest_page are exported as ints again."""
+    path = tmp_path / "ocr_manifest.json"
+    data = load_ocr_manifest(path)
+    update_manifest_page(data, 1, success=True)
+    update_manifest_page(data, 2, success=False, error="timeout")
+    save_ocr_manifest(path, data)
+
+    with OcrManifest(path) as manifest:
+        assert manifest.is_completed(1) and manifest.is_completed("1")
+        manifest.mark_page(3, success=True)
+        exported = manifest.export_json()
+
+    assert exported["completed_pages"] == [1, 3]
+    assert exported["failed_pages"] == [{"page": 2, "error": "timeout"}]
+    assert "int_page_keys" not in exported
+
+def test_load_prefers_sqlite_manifest(tmp_path):
+    """Progress committed to SQLite is visible before the JSON is exported."""
+    path = tmp_path / "ocr_manifest.json"
+    with OcrManifest(path) as manifest:
+        manifest.set_volume("CO273_534", 2)
+        manifest.mark_page("GALE_AAA111/1", success=True)
+
+    loaded = load_ocr_manifest(path)
+    assert not path.exists()
+    assert loaded["completed_pages"] == ["GALE_AAA111/1"]
+    assert loaded["total_pages"] == 2
+
+
+def test_ocr_manifest_tracks_corrections(tmp_path):
+    """Correction state round-trips through the JSON export and re-import."""
+    path = tmp_path / "ocr_manifest.json"
+    with OcrManifest(path) as manifest:
+        manifest.mark_pages([("1", True, ""), ("2", True, "")])
+        manifest.mark_corrections([("1", True, ""), ("2", False, "correction failed")])
+        exported = manifest.export_json()
+
+    assert exported["corrected_pages"] == ["1"]
+    assert exported["failed_corrections"] == [{"page": "2", "error": "correction failed"}]
+
+    path.with_suffix(".sqlite").unlink()
+    with OcrManifest(path) as manifest:
+        assert manifest.corrected_keys() == {"1"}
+        assert manifest.completed_keys() == {"1", "2"}
@@ -0,0 +1,84 @@
+# tests/test_page_store.py
+import json
+import os
+from pathlib import Path
+
+from src.page_store import PageStore, file_sha256
+
+
+def _write_page(volume_dir: Path, doc_id: str, page_num: int, data: bytes) -> Path:
+    doc_dir = volume_dir / "images" / doc_id if doc_id else volume_dir / "images"
+    doc_dir.mkdir(parents=True, exist_ok=True)
+    path = doc_dir / f"page_{page_num:04d}.jpg"
+    path.write_bytes(data)
+    return path
+
+
+def test_ingest_deduplicates_across_documents(tmp_path):
+    """Identical page bytes in different documents share one blob."""
+    _write_page(tmp_path, "GALE_AAA111", 1, b"blank folio")
+    _write_page(tmp_path, "GALE_AAA111", 2, b"letter text")
+    _write_page(tmp_path, "GALE_BBB222", 1, b"blank folio")
+
+    stats = PageStore(tmp_path).ingest()
+
+    assert stats == {"pages": 3, "unique": 2}
+    assert len(list((tmp_path / "blobs").rglob("*.jpg"))) == 2
+
+    index = json.loads((tmp_path / "page_index.json").read_text())
+    assert index["GALE_AAA111"]["1"] == index["GALE_BBB222"]["1"]
+
+    # Page files stay readable and are links to the shared blob
+    page_a = tmp_path / "images" / "GALE_AAA111" / "page_0001.jpg"
+    page_b = tmp_path / "images" / "GALE_BBB222" / "page_0001.jpg"
+    assert page_a.read_bytes() == b"blank folio"
+    assert os.path.samefile(page_a, page_b)
+
+
+def test_resolve_image(tmp_path):
+    """Indexed pages resolve to their blob and SHA-256."""
+    page = _write_page(tmp_path, "GALE_AAA111", 1, b"page bytes")
+    sha = file_sha256(page)
+    store = PageStore(tmp_path)
+    store.ingest()
+
+    blob, content_hash = PageStore(tmp_path).resolve_image(page)
+    assert content_hash == sha
+    assert blob == tmp_path / "blobs" / sha[:2] / f"{sha}.jpg"
+    assert store.resolve("GALE_AAA111", 1) == blob
+
+
+def test_resolve_image_ignores_rewritten_page(tmp_path):
+    """A page replaced after ingest is not mapped to its stale blob."""
+    page = _write_page(tmp_path, "GALE_AAA111", 1, b"old bytes")
+    PageStore(tmp_path).ingest()
+
+    page.unlink()
+    page.write_bytes(b"new bytes")
+
+    assert PageStore(tmp_path).resolve_image(page) == (page, None)
+
+
+def test_reingest_is_incremental(tmp_path):
+    """Already-linked pages are skipped; rewritten pages are re-hashed."""
+    _write_page(tmp_path, "GALE_AAA111", 1, b"first")
+    store = PageStore(tmp_path)
+    store.ingest()
+    assert store.ingest_document("GALE_AAA111") == 0
+
+    page = tmp_path / "images" / "GALE_AAA111" / "page_0001.jpg"
+    page.unlink()
+    page.write_bytes(b"second")
+    assert store.ingest_document("GALE_AAA111") == 1
+    assert store.lookup("GALE_AAA111", 1) == file_sha256(page)
+
+
+def test_flat_layout_and_materialize(tmp_path):
+    """Flat images/ pages are indexed under "" and can be rebuilt from blobs."""
+    _write_page(tmp_path, "", 1, b"flat page")
+    PageStore(tmp_path).ingest()
+
+    page = tmp_path / "images" / "page_0001.jpg"
+    page.unlink()
+    assert PageStore(tmp_path).materialize() == 1
+    assert page.read_bytes() == b"flat page"
@@ -1,7 +1,16 @@
 import pytest
+from collections import Counter
 from pathlib import Path
+from unittest.mock import patch
 from PIL import Image
-from src.pdf_builder import build_volume_pdf
+from pypdf import PdfReader
+from src.pdf_builder import (
+    build_document_fragment,
+    build_volume_pdf,
+    jpeg_header,
+    write_concatenated_pdf,
+)
+from src.page_store import PageStore
 
 
 def _create_test_jpg(path: Path, width: int = 100, height: int = 100) -> None:
@@ -47,3 +56,139 @@ def test_build_volume_pdf_missing_dir(tmp_path):
     """Building from non-existent directory raises FileNotFoundError."""
     with pytest.raises(FileNotFoundError):
         build_volume_pdf(tmp_path / "nonexistent", tmp_path / "output.pdf")
+
+
+def test_build_volume_pdf_resolves_page_store(tmp_path):
+    """Pages indexed in the PageStore are read from blobs; duplicates still appear in order."""
+    images_dir = tmp_path / "images"
+    _create_test_jpg(images_dir / "GALE_DOC001" / "page_0001.jpg")
+    _create_test_jpg(images_dir / "GALE_DOC002" / "page_0001.jpg")  # identical bytes
+    _create_test_jpg(images_dir / "GALE_DOC002" / "page_0002.jpg", width=50)
+    assert PageStore(tmp_path).ingest() == {"pages": 3, "unique": 2}
+
+    total = build_volume_pdf(images_dir, tmp_path / "volume.pdf")
+    assert total == 3
+
+
+def test_build_volume_pdf_reuses_unchanged_fragments(tmp_path):
+    """A rebuild only converts documents whose pages changed."""
+    images_dir = tmp_path / "images"
+    _create_test_jpg(images_dir / "GALE_DOC001" / "page_0001.jpg")
+    _create_test_jpg(images_dir / "GALE_DOC002" / "page_0001.jpg", width=60)
+    output_pdf = tmp_path / "volume.pdf"
+    assert build_volume_pdf(images_dir, output_pdf) == 2
+
+    _create_test_jpg(images_dir / "GALE_DOC003" / "page_0001.jpg", width=70)
+    with patch("src.pdf_builder.build_document_fragment", wraps=build_document_fragment) as build:
+        assert build_volume_pdf(images_dir, output_pdf) == 3
+    assert build.call_count == 1
+    assert len(PdfReader(str(output_pdf)).pages) == 3
+
+    # Nothing changed: the volume PDF is left as is
+    mtime = output_pdf.stat().st_mtime_ns
+    with patch("src.pdf_builder.build_document_fragment") as build:
+        assert build_volume_pdf(images_dir, output_pdf) == 3
+    build.assert_not_called()
+    assert output_pdf.stat().st_mtime_ns == mtime
+
+
+def test_jpeg_header_reads_size_without_decoding(tmp_path):
+    """Width, height, components and bit depth come from the SOF segment."""
+    path = tmp_path / "page.jpg"
+    _create_test_jpg(path, width=120, height=80)
+    assert jpeg_header(path.read_bytes()) == (120, 80, 3, 8)
+    assert jpeg_header(b"not a jpeg") is None
+
+
+def test_build_volume_pdf_embeds_jpeg_bytes_unchanged(tmp_path):
+    """Passthrough pages carry the original JPEG as a DCTDecode XObject."""
+    images_dir = tmp_path / "images"
+    page_path = images_dir / "GALE_DOC001" / "page_0001.jpg"
+    _create_test_jpg(page_path, width=120, height=80)
+
+    with patch("src.pdf_builder.render_page_pdf") as convert:
+        build_volume_pdf(images_dir, tmp_path / "volume.pdf")
+    convert.assert_not_called()
+
+    page = PdfReader(str(tmp_path / "volume.pdf")).pages[0]
+    image = page["/Resources"]["/XObject"]["/Im0"].get_object()
+    assert image["/Filter"] == "/DCTDecode"
+    assert image.get_data() == page_path.read_bytes()
+    assert (float(page.mediabox.width), float(page.mediabox.height)) == (120, 80)
+
+
+def test_build_volume_pdf_converts_cmyk_jpeg(tmp_path):
+    """CMYK JPEGs fall back to PIL conversion."""
+    images_dir = tmp_path / "images"
+    path = images_dir / "GALE_DOC001" / "page_0001.jpg"
+    path.parent.mkdir(parents=True)
+    Image.new("CMYK", (60, 60)).save(path, "JPEG")
+
+    assert build_volume_pdf(images_dir, tmp_path / "volume.pdf") == 1
+    page = PdfReader(str(tmp_path / "volume.pdf")).pages[0]
+    image = next(iter(page["/Resources"]["/XObject"].values())).get_object()
+    assert image["/ColorSpace"] == "/DeviceRGB"
+
+
+def test_build_volume_pdf_process_pool_keeps_page_order(tmp_path):
+    """Pages converted in a process pool are appended in doc-then-page order."""
+    images_dir = tmp_path / "images"
+    widths = []
+    for d in range(2):
+        for p in range(4):
+            width = 40 + 10 * (d * 4 + p)
+            _create_test_jpg(images_dir / f"GALE_DOC{d:03d}" / f"page_{p + 1:04d}.jpg", width=width)
+            widths.append(width)
+
+    total = build_volume_pdf(images_dir, tmp_path / "volume.pdf", passthrough=False, workers=2)
+
+    assert total == 8
+    pages = PdfReader(str(tmp_path / "volume.pdf")).pages
+    assert [round(float(page.mediabox.width)) for page in pages] == widths
+
+
+def test_build_document_fragment_drops_converted_pages_after_last_use(tmp_path):
+    """Converted pages are kept only while a later page still repeats them."""
+    images_dir = tmp_path / "images"
+    _create_test_jpg(images_dir / "GALE_DOC001" / "page_0001.jpg")
+    _create_test_jpg(images_dir / "GALE_DOC001" / "page_0002.jpg", width=50)
+    _create_test_jpg(images_dir / "GALE_DOC002" / "page_0001.jpg")  # repeats DOC001 page 1
+    store = PageStore(tmp_path)
+    store.ingest()
+    pages = {d: sorted((images_dir / d).glob("*.jpg")) for d in ("GALE_DOC001", "GALE_DOC002")}
+    uses = Counter(store.resolve_image(p)[1] for doc in pages.values() for p in doc)
+    converted = {}
+
+    build_document_fragment(
+        pages["GALE_DOC001"], store, tmp_path / "f1.pdf", converted, passthrough=False, uses=uses,
+    )
+    assert list(converted) == [store.resolve_image(pages["GALE_DOC002"][0])[1]]
+
+    count, _ = build_document_fragment(
+        pages["GALE_DOC002"], store, tmp_path / "f2.pdf", converted, passthrough=False, uses=uses,
+    )
+    assert count == 1
+    assert converted == {}
+
+
+def test_write_concatenated_pdf_streams_fragments_in_order(tmp_path):
+    """Fragments are copied page by page into one valid PDF with a single page tree."""
+    fragments = []
+    for i, (width, height) in enumerate([(100, 80), (60, 90)]):
+        _create_test_jpg(tmp_path / "images" / f"DOC{i}" / "page_0001.jpg", width, height)
+        _create_test_jpg(tmp_path / "images" / f"DOC{i}" / "page_0002.jpg", height, width)
+        fragment = tmp_path / f"DOC{i}.pdf"
+        build_document_fragment(
+            sorted((tmp_path / "images" / f"DOC{i}").glob("*.jpg")), PageStore(tmp_path), fragment,
+        )
+        fragments.append(fragment)
+
+    output_pdf = tmp_path / "volume.pdf"
+    with open(output_pdf, "wb") as f:
+        assert write_concatenated_pdf(fragments, f) == 4
+
+    reader = PdfReader(output_pdf, strict=True)
+    sizes = [(int(page.mediabox.width), int(page.mediabox.height)) for page in reader.pages]
+    assert sizes == [(100, 80), (80, 100), (60, 90), (90, 60)]
+    assert [page.images[0].image.size for page in reader.pages] == sizes
+    assert output_pdf.read_bytes().count(b"/Type /Pages") == 1
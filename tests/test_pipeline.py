@@ -1,5 +1,7 @@
 # tests/test_pipeline.py
+import asyncio
 import json
+from functools import partial
 import pytest
 from pathlib import Path
 from unittest.mock import MagicMock, patch, AsyncMock
@@ -7,7 +9,9 @@ from unittest.mock import MagicMock, patch, AsyncMock
 from PIL import Image
 from pypdf import PdfWriter
 
-from src.ocr.pipeline import run_ocr_pipeline
+from src.ocr.correct import CorrectionBatcher
+from src.ocr.pipeline import run_ocr_pipeline, _discover_pages
+from src.page_store import PageStore
 
 
 def _create_test_pdf(path: Path, num_pages: int = 2) -> None:
@@ -27,6 +31,11 @@ def _create_test_images(images_dir: Path, count: int = 3) -> None:
         img.save(images_dir / f"page_{i:04d}.jpg")
 
 
+def _correct_response(prompt: str) -> MagicMock:
+    """Correction reply that fixes 'Tle' and keeps any section markers."""
+    return MagicMock(text=prompt.split("---\n", 1)[1].replace("Tle", "The"))
+
+
 def _create_doc_images(images_dir: Path, doc_id: str, count: int) -> None:
     """Create test images in a per-document subdirectory."""
     doc_dir = images_dir / doc_id
@@ -176,3 +185,214 @@ async def test_run_ocr_pipeline_with_correction(tmp_path):
     assert (ocr_dir / "page_0001.txt").read_text(encoding="utf-8") == "The Governor"
     # Raw backup exists
     assert (ocr_dir / "page_0001.raw.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_pipeline_corrects_while_ocr_runs(tmp_path):
+    """Pages are corrected as their OCR completes, not after the whole volume."""
+    volume_dir = tmp_path / "CO273_534"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", 3)
+    calls = []
+
+    async def generate(content):
+        stage = "correct" if isinstance(content, str) else "ocr"
+        calls.append(stage)
+        await asyncio.sleep(0.01)
+        return MagicMock(text="Tle text") if stage == "ocr" else _correct_response(content)
+
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock(side_effect=generate)
+
+    with patch("src.ocr.pipeline.get_gemini_model", return_value=mock_model), \
+         patch("src.ocr.pipeline.CorrectionBatcher", partial(CorrectionBatcher, linger=0)):
+        result = await run_ocr_pipeline(
+            volume_dir=volume_dir,
+            volume_id="CO273_534",
+            concurrency=1,
+            correct=True,
+            correct_concurrency=1,
+        )
+
+    assert calls.count("ocr") == 3 and calls.count("correct") == 3
+    last_ocr = len(calls) - 1 - calls[::-1].index("ocr")
+    assert calls.index("correct") < last_ocr
+    assert sorted(result["corrected_pages"]) == ["GALE_AAA111/1", "GALE_AAA111/2", "GALE_AAA111/3"]
+    assert result["failed_corrections"] == []
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_pipeline_corrects_pages_ocrd_earlier(tmp_path):
+    """A re-run with correct=True corrects completed pages the manifest shows uncorrected."""
+    volume_dir = tmp_path / "CO273_534"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", 2)
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock(return_value=MagicMock(text="Tle text"))
+
+    with patch("src.ocr.pipeline.get_gemini_model", return_value=mock_model):
+        await run_ocr_pipeline(volume_dir=volume_dir, volume_id="CO273_534", concurrency=2)
+        mock_model.generate_content_async = AsyncMock(side_effect=_correct_response)
+        result = await run_ocr_pipeline(
+            volume_dir=volume_dir, volume_id="CO273_534", concurrency=2, correct=True,
+        )
+
+    # One correction request shared by both pages; OCR is not repeated
+    assert mock_model.generate_content_async.await_count == 1
+    assert sorted(result["corrected_pages"]) == ["GALE_AAA111/1", "GALE_AAA111/2"]
+    ocr_dir = volume_dir / "ocr" / "GALE_AAA111"
+    assert (ocr_dir / "page_0001.txt").read_text(encoding="utf-8") == "The text"
+    assert (ocr_dir / "page_0001.raw.txt").read_text(encoding="utf-8") == "Tle text"
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_pipeline_prefilter_skips_clean_pages(tmp_path):
+    """Clean pages are not sent for correction and are counted in the manifest."""
+    volume_dir = tmp_path / "CO273_534"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", 2)
+    texts = iter(["The Governor of the Straits", "Tle Govemor of tbe Straits"])
+
+    async def generate(content):
+        text = next(texts) if not isinstance(content, str) else "The Governor of the Straits"
+        return MagicMock(text=text)
+
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock(side_effect=generate)
+
+    with patch("src.ocr.pipeline.get_gemini_model", return_value=mock_model):
+        result = await run_ocr_pipeline(
+            volume_dir=volume_dir, volume_id="CO273_534", concurrency=1, correct=True,
+        )
+
+    assert mock_model.generate_content_async.await_count == 3
+    assert result["corrected_pages"] == ["GALE_AAA111/2"]
+    assert result["skipped_corrections"] == [{"page": "GALE_AAA111/1", "reason": "clean"}]
+    assert result["correction_skip_counts"] == {"clean": 1}
+    assert result["correction_filter"]["min_noise"] > 0
+    assert not (volume_dir / "ocr" / "GALE_AAA111" / "page_0001.raw.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_pipeline_dedups_identical_images(tmp_path):
+    """Identical images indexed in the PageStore are OCR'd once."""
+    volume_dir = tmp_path / "CO273_534"
+    images_dir = volume_dir / "images"
+    _create_doc_images(images_dir, "GALE_AAA111", count=2)
+    _create_doc_images(images_dir, "GALE_BBB222", count=1)  # same bytes as AAA111/1
+    PageStore(volume_dir).ingest()
+
+    entries = _discover_pages(images_dir)
+    assert entries[0]["content_hash"] == entries[2]["content_hash"]
+
+    mock_model = MagicMock()
+    mock_response = MagicMock()
+    mock_response.text = "Transcribed text"
+    mock_model.generate_content_async = AsyncMock(return_value=mock_response)
+
+    with patch("src.ocr.pipeline.get_gemini_model", return_value=mock_model):
+        result = await run_ocr_pipeline(
+            volume_dir=volume_dir,
+            volume_id="CO273_534",
+            concurrency=2,
+        )
+
+    assert mock_model.generate_content_async.call_count == 2
+    assert len(result["completed_pages"]) == 3
+
+    dup_dir = volume_dir / "ocr" / "GALE_BBB222"
+    assert (dup_dir / "page_0001.txt").read_text() == "Transcribed text"
+    meta = json.loads((dup_dir / "page_0001.json").read_text())
+    assert meta["source_document"] == "GALE_BBB222"
+    assert meta["duplicate_of"] == "GALE_AAA111/1"
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_pipeline_duplicates_inherit_correction(tmp_path):
+    """A duplicate of a corrected page is recorded as corrected, not skipped as clean."""
+    volume_dir = tmp_path / "CO273_534"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", 1)
+    _create_doc_images(volume_dir / "images", "GALE_BBB222", 1)  # same bytes
+    PageStore(volume_dir).ingest()
+
+    async def generate(content):
+        return _correct_response(content) if isinstance(content, str) else MagicMock(text="Tle text")
+
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock(side_effect=generate)
+
+    with patch("src.ocr.pipeline.get_gemini_model", return_value=mock_model), \
+         patch("src.ocr.pipeline.CorrectionBatcher", partial(CorrectionBatcher, linger=0)):
+        result = await run_ocr_pipeline(
+            volume_dir=volume_dir, volume_id="CO273_534", concurrency=1, correct=True,
+        )
+
+    assert mock_model.generate_content_async.await_count == 2
+    assert sorted(result["corrected_pages"]) == ["GALE_AAA111/1", "GALE_BBB222/1"]
+    assert result["skipped_corrections"] == []
+    dup_dir = volume_dir / "ocr" / "GALE_BBB222"
+    assert (dup_dir / "page_0001.txt").read_text(encoding="utf-8") == "The text"
+    assert (dup_dir / "page_0001.raw.txt").read_text(encoding="utf-8") == "Tle text"
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_writer_batches_results(tmp_path):
+    """Results are committed once batch_size are queued, and the rest on exit."""
+    from src.ocr.manifest import OcrManifest, load_ocr_manifest
+    from src.ocr.pipeline import CheckpointWriter
+
+    path = tmp_path / "ocr_manifest.json"
+    with OcrManifest(path) as manifest:
+        async with CheckpointWriter(manifest, interval=60, batch_size=2) as checkpoint:
+            checkpoint.record("1", success=True)
+            await asyncio.sleep(0.01)
+            assert load_ocr_manifest(path)["completed_pages"] == []
+
+            checkpoint.record("2", success=False, error="timeout")
+            for _ in range(50):
+                await asyncio.sleep(0.01)
+                if load_ocr_manifest(path)["failed_pages"]:
+                    break
+            assert load_ocr_manifest(path)["completed_pages"] == ["1"]
+
+            checkpoint.record("3", success=True)
+            assert checkpoint.completed == 2
+
+    saved = load_ocr_manifest(path)
+    assert saved["completed_pages"] == ["1", "3"]
+    assert saved["failed_pages"] == [{"page": "2", "error": "timeout"}]
+
+
+@pytest.mark.asyncio
+async def test_run_ocr_pipeline_overlaps_download(tmp_path):
+    """Pages are OCR'd as their downloads finish, not after the whole volume."""
+    from concurrent.futures import Future
+    from types import SimpleNamespace
+
+    volume_dir = tmp_path / "CO273_534"
+    doc_dir = volume_dir / "images" / "GALE_AAA111"
+    _create_doc_images(volume_dir / "images", "GALE_AAA111", count=1)
+    first, second = doc_dir / "page_0001.jpg", doc_dir / "page_0002.jpg"
+    futures = {first: Future(), second: Future()}
+    futures[first].set_result(True)
+    download = SimpleNamespace(pages=[first, second], futures=futures)
+
+    mock_response = MagicMock()
+    mock_response.text = "Transcribed text"
+
+    async def transcribe(*args, **kwargs):
+        # Page 2 only "arrives" once page 1 is being transcribed
+        if not futures[second].done():
+            Image.new("RGB", (100, 100)).save(second)
+            futures[second].set_result(True)
+        return mock_response
+
+    mock_model = MagicMock()
+    mock_model.generate_content_async = AsyncMock(side_effect=transcribe)
+
+    with patch("src.ocr.pipeline.get_gemini_model", return_value=mock_model):
+        result = await asyncio.wait_for(run_ocr_pipeline(
+            volume_dir=volume_dir,
+            volume_id="CO273_534",
+            concurrency=2,
+            download=download,
+        ), timeout=10)
+
+    assert result["completed_pages"] == ["GALE_AAA111/1", "GALE_AAA111/2"]
@@ -0,0 +1,231 @@
+# tests/test_rate_control.py
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from src.config import RETRY_AFTER_MAX
+from src.rate_control import (
+    AdaptiveLimiter,
+    is_throttle_status,
+    parse_retry_after,
+    retry_delay,
+)
+from src.scraper import _download_single_page, get_document_data
+
+
+def test_parse_retry_after_seconds():
+    assert parse_retry_after("5") == 5.0
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = parse_retry_after(format_datetime(when))
+    assert 25 <= delay <= 31
+
+
+def test_parse_retry_after_clamped():
+    """Retry-After values beyond RETRY_AFTER_MAX are capped, in either format."""
+    assert parse_retry_after("86400") == RETRY_AFTER_MAX
+    when = datetime.now(timezone.utc) + timedelta(days=2)
+    assert parse_retry_after(format_datetime(when)) == RETRY_AFTER_MAX
+
+
+def test_limiter_pause_is_clamped():
+    """A huge Retry-After response pauses the limiter for at most RETRY_AFTER_MAX."""
+    limiter = AdaptiveLimiter(initial=2)
+    with patch("src.rate_control.time.monotonic", return_value=1000.0):
+        with limiter.request() as outcome:
+            outcome.observe(_response(503, headers={"Retry-After": "999999"}))
+            outcome.ok = False
+    with patch("src.rate_control.time.monotonic", return_value=1000.0 + RETRY_AFTER_MAX - 1):
+        assert limiter.try_acquire() is False
+    with patch("src.rate_control.time.monotonic", return_value=1000.0 + RETRY_AFTER_MAX + 1):
+        assert limiter.try_acquire() is True
+
+
+def test_parse_retry_after_invalid():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(MagicMock()) is None
+
+
+def test_is_throttle_status():
+    assert is_throttle_status(429)
+    assert is_throttle_status(503)
+    assert not is_throttle_status(404)
+    assert not is_throttle_status(200)
+
+
+def test_retry_delay_prefers_retry_after():
+    assert retry_delay(2, retry_after=7.0) == 7.0
+    assert retry_delay(2) == 4.0
+
+
+def test_limiter_grows_additively_on_success():
+    """Each full window of successes adds roughly one slot."""
+    limiter = AdaptiveLimiter(initial=4, max_limit=10, latency_window=1000)
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release(ok=True, latency=0.1)
+    assert limiter.current_limit == 4
+    assert limiter.limit > 4.9
+
+
+def test_limiter_halves_on_failure_once_per_cooldown():
+    """A burst of failures halves the limit once, not once per failure."""
+    limiter = AdaptiveLimiter(initial=8, max_limit=20, cooldown=60)
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(ok=False)
+    assert limiter.current_limit == 4
+
+
+def test_limiter_respects_bounds():
+    limiter = AdaptiveLimiter(initial=2, min_limit=1, max_limit=3, cooldown=0)
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(ok=False)
+    assert limiter.current_limit == 1
+    for _ in range(50):
+        limiter.acquire()
+        limiter.release(ok=True)
+    assert limiter.current_limit == 3
+
+
+def test_limiter_backs_off_on_rising_p95_latency():
+    """p95 latency well above the best observed window shrinks the limit."""
+    limiter = AdaptiveLimiter(initial=10, max_limit=10, latency_window=10,
+                              latency_factor=2.0, cooldown=0)
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(ok=True, latency=0.1)
+    assert limiter.current_limit == 10
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(ok=True, latency=1.0)
+    assert limiter.current_limit == 5
+
+
+def test_limiter_caps_in_flight():
+    """No more than current_limit callers hold a slot at once."""
+    limiter = AdaptiveLimiter(initial=2, max_limit=2, latency_window=1000)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal active, peak
+        with limiter.request() as outcome:
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            outcome.ok = True
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == 2
+
+
+def test_limiter_pauses_for_retry_after():
+    """Retry-After blocks the next acquire until it has elapsed."""
+    limiter = AdaptiveLimiter(initial=2)
+    limiter.acquire()
+    limiter.release(ok=False, retry_after=0.1)
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_limiter_try_acquire_never_blocks():
+    """try_acquire() refuses a slot while the limit is full or Retry-After is pending."""
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+    assert limiter.try_acquire() is True
+    assert limiter.try_acquire() is False
+    limiter.release(ok=False, retry_after=60)
+    assert limiter.try_acquire() is False
+
+
+def _response(status=200, content=b"", headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.content = content
+    response.iter_content.side_effect = lambda chunk_size: iter([content])
+    response.headers = headers or {}
+    if status >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status}")
+    return response
+
+
+def test_download_single_page_honours_retry_after(tmp_path):
+    """429 with Retry-After waits that long (not 2**attempt) and backs off the limiter."""
+    session = MagicMock()
+    session.get.side_effect = [
+        _response(429, headers={"Retry-After": "0"}),
+        _response(200, content=b"\xff\xd8\xff" + b"x" * 5000 + b"\xff\xd9"),
+    ]
+    limiter = AdaptiveLimiter(initial=4, max_limit=8)
+    page_info = {"pageNumber": "1", "recordId": "T"}
+
+    with patch("src.scraper.time.sleep") as mock_sleep:
+        result = _download_single_page(session, page_info, tmp_path, limiter=limiter)
+
+    assert result is True
+    mock_sleep.assert_called_once_with(0.0)
+    assert limiter.current_limit < 4
+
+
+def test_download_single_page_404_keeps_limit(tmp_path):
+    """A 404 is retried and fails without shrinking the limiter."""
+    session = MagicMock()
+    session.get.side_effect = [_response(404) for _ in range(3)]
+    limiter = AdaptiveLimiter(initial=4, max_limit=8, cooldown=0)
+    page_info = {"pageNumber": "1", "recordId": "T"}
+
+    with patch("src.scraper.time.sleep"):
+        result = _download_single_page(session, page_info, tmp_path, limiter=limiter)
+
+    assert result is False
+    assert limiter.limit == 4.0
+
+
+def test_limiter_request_classifies_exceptions():
+    """Errors escaping request() back off only when they signal congestion."""
+    limiter = AdaptiveLimiter(initial=8, max_limit=8, cooldown=0)
+    with pytest.raises(requests.HTTPError):
+        with limiter.request() as outcome:
+            outcome.observe(_response(403))
+            raise requests.HTTPError("403")
+    with pytest.raises(requests.ConnectionError):
+        with limiter.request():
+            raise requests.ConnectionError("connection reset")
+    assert limiter.current_limit == 8
+
+    with pytest.raises(requests.Timeout):
+        with limiter.request():
+            raise requests.Timeout("read timed out")
+    assert limiter.current_limit == 4
+
+
+def test_get_document_data_retries_on_503():
+    """Server errors are retried instead of raised immediately."""
+    good = _response(200, content=b'{"imageList": []}')
+    good.json.return_value = {"imageList": []}
+    session = MagicMock()
+    session.get.side_effect = [_response(503), good]
+
+    with patch("src.scraper.time.sleep") as mock_sleep:
+        result = get_document_data(session, "GALE|TEST")
+
+    assert result == {"imageList": []}
+    mock_sleep.assert_called_once_with(2.0)
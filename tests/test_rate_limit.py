@@ -0,0 +1,89 @@
+# tests/test_rate_limit.py
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from PIL import Image
+
+from src.ocr.gemini_ocr import ocr_single_page
+from src.ocr.rate_limit import GeminiRateLimiter, estimate_image_tokens, is_rate_limited
+
+
+def test_estimate_image_tokens_counts_tiles(tmp_path):
+    """Small images cost one tile; larger ones 258 tokens per 768px tile, after downscaling."""
+    small = tmp_path / "small.jpg"
+    Image.new("RGB", (300, 200)).save(small)
+    page = tmp_path / "page.jpg"
+    Image.new("RGB", (1000, 1600)).save(page)
+
+    assert estimate_image_tokens(small) == 258
+    assert estimate_image_tokens(page, max_edge=0) == 258 * 2 * 3
+    assert estimate_image_tokens(page, max_edge=768) == 258  # 480x768 -> one tile
+    assert estimate_image_tokens(page.read_bytes(), max_edge=0) == 258 * 2 * 3
+
+
+class ResourceExhausted(Exception):
+    """Stand-in for google.api_core's 429 exception."""
+
+    code = 429
+
+
+def test_is_rate_limited():
+    """429 / quota errors are recognised by type or status, not by message."""
+    assert is_rate_limited(ResourceExhausted("Resource has been exhausted"))
+    http_error = Exception("Too Many Requests")
+    http_error.response = MagicMock(status_code=429)
+    assert is_rate_limited(http_error)
+    assert not is_rate_limited(ValueError("bad image"))
+    assert not is_rate_limited(ValueError("page 429 could not be decoded"))
+
+
+@pytest.mark.asyncio
+async def test_limiter_paces_requests_to_rpm():
+    """Requests beyond the burst capacity wait for the bucket to refill."""
+    limiter = GeminiRateLimiter(rpm=600, tpm=0, headroom=1.0, burst_seconds=0.1)  # 10/s, burst 1
+
+    started = time.monotonic()
+    for _ in range(4):
+        await limiter.acquire(1000)
+    elapsed = time.monotonic() - started
+
+    assert elapsed >= 0.25
+    assert limiter.requests == 4
+
+
+@pytest.mark.asyncio
+async def test_limiter_paces_tokens_to_tpm():
+    """A token budget slows large requests even when RPM allows them."""
+    limiter = GeminiRateLimiter(rpm=0, tpm=60_000, headroom=1.0, burst_seconds=0.1)  # 1000 tokens/s
+
+    started = time.monotonic()
+    for _ in range(3):
+        await limiter.acquire(100)
+    await limiter.acquire(300)
+    elapsed = time.monotonic() - started
+
+    assert elapsed >= 0.25
+    assert limiter.tokens == 600
+
+
+@pytest.mark.asyncio
+async def test_ocr_single_page_throttles_limiter_on_429(tmp_path):
+    """A 429 from Gemini pauses the shared limiter for every caller."""
+    img_path = tmp_path / "page_0001.jpg"
+    Image.new("RGB", (60, 60)).save(img_path)
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(side_effect=ResourceExhausted("Resource has been exhausted"))
+    limiter = GeminiRateLimiter()
+
+    with patch("src.ocr.rate_limit.GEMINI_THROTTLE_PAUSE", 0.2):
+        ok = await ocr_single_page(
+            model=model, image_path=img_path, page_num=1, volume_id="CO273_534",
+            source_document="", output_dir=tmp_path / "ocr", limiter=limiter,
+        )
+        started = time.monotonic()
+        await limiter.acquire(10)
+
+    assert ok is False
+    assert limiter.throttled_count == 1
+    assert time.monotonic() - started >= 0.15
@@ -15,6 +15,11 @@ from src.scraper import (
     save_ocr_text,
     load_manifest,
     save_manifest,
+    scrape_volume,
+    RequestThrottle,
+    ScrapeProgress,
+    PartialPage,
+    is_complete_page,
     _download_single_page,
 )
 
@@ -81,6 +86,9 @@ SAMPLE_SMALL_SEARCH_HTML = '''
 </body></html>
 '''
 
+# Minimal JPEG-shaped page body: SOI marker, filler, EOI marker
+JPEG_BYTES = b"\xff\xd8\xff" + b"x" * 5000 + b"\xff\xd9"
+
 # Sample dviViewer API response
 SAMPLE_DVI_RESPONSE = {
     "imageList": [
@@ -414,7 +422,8 @@ def test_download_document_pages(tmp_path):
     session = MagicMock()
     response = MagicMock()
     response.status_code = 200
-    response.content = b"\xff\xd8\xff" + b"x" * 5000  # JPEG-like data
+    response.content = JPEG_BYTES  # JPEG-like data
+    response.iter_content.side_effect = lambda chunk_size: iter([response.content])
     response.ok = True
     session.get.return_value = response
 
@@ -430,12 +439,13 @@ def test_download_document_pages(tmp_path):
 def test_download_document_pages_skips_existing(tmp_path):
     """Skips pages that already exist on disk."""
     # Pre-create page 1
-    (tmp_path / "page_0001.jpg").write_bytes(b"\xff\xd8\xff" + b"x" * 5000)
+    (tmp_path / "page_0001.jpg").write_bytes(JPEG_BYTES)
 
     session = MagicMock()
     response = MagicMock()
     response.status_code = 200
-    response.content = b"\xff\xd8\xff" + b"x" * 5000
+    response.content = JPEG_BYTES
+    response.iter_content.side_effect = lambda chunk_size: iter([response.content])
     response.ok = True
     session.get.return_value = response
 
@@ -493,7 +503,8 @@ def test_download_single_page_success(tmp_path):
     session = MagicMock()
     response = MagicMock()
     response.status_code = 200
-    response.content = b"\xff\xd8\xff" + b"x" * 5000
+    response.content = JPEG_BYTES
+    response.iter_content.side_effect = lambda chunk_size: iter([response.content])
     response.ok = True
     session.get.return_value = response
 
@@ -505,7 +516,7 @@ def test_download_single_page_success(tmp_path):
 
 def test_download_single_page_skips_existing(tmp_path):
     """Returns True without network call when file exists."""
-    (tmp_path / "page_0001.jpg").write_bytes(b"\xff\xd8\xff" + b"x" * 5000)
+    (tmp_path / "page_0001.jpg").write_bytes(JPEG_BYTES)
 
     session = MagicMock()
     page_info = {"pageNumber": "1", "recordId": "ENCODED_TOKEN_PAGE1"}
@@ -520,6 +531,7 @@ def test_download_single_page_rejects_small(tmp_path):
     response = MagicMock()
     response.status_code = 200
     response.content = b"tiny"
+    response.iter_content.side_effect = lambda chunk_size: iter([response.content])
     response.ok = True
     session.get.return_value = response
 
@@ -547,7 +559,8 @@ def test_download_document_pages_concurrent(tmp_path):
     session = MagicMock()
     response = MagicMock()
     response.status_code = 200
-    response.content = b"\xff\xd8\xff" + b"x" * 5000
+    response.content = JPEG_BYTES
+    response.iter_content.side_effect = lambda chunk_size: iter([response.content])
     response.ok = True
     session.get.return_value = response
 
@@ -621,3 +634,232 @@ def test_get_document_data_retries_on_non_json():
 
     result = get_document_data(session, "GALE|TEST123")
     assert "imageList" in result
+
+
+# ---------------------------------------------------------------------------
+# 18. Volume scheduler tests
+# ---------------------------------------------------------------------------
+
+def _jpeg_session():
+    """Session mock whose GETs return a JPEG-sized body."""
+    session = MagicMock()
+    response = MagicMock()
+    response.status_code = 200
+    response.content = JPEG_BYTES
+    response.iter_content.side_effect = lambda chunk_size: iter([response.content])
+    response.ok = True
+    session.get.return_value = response
+    return session
+
+
+def _doc_data(num_pages: int) -> dict:
+    return {
+        "imageList": [
+            {"pageNumber": str(i), "recordId": f"TOKEN_{i}"}
+            for i in range(1, num_pages + 1)
+        ],
+        "originalDocument": {"pageOcrTextMap": {"1": "Some text."}},
+    }
+
+
+def test_scrape_volume_schedules_across_documents(tmp_path):
+    """All documents are downloaded and recorded in the manifest in order."""
+    doc_ids = ["GALE|A1", "GALE|B2", "GALE|C3", "GALE|D4"]
+    pages = {"GALE|A1": 1, "GALE|B2": 3, "GALE|C3": 2, "GALE|D4": 1}
+    session = _jpeg_session()
+
+    with patch("src.scraper.DOWNLOAD_DELAY", 0), \
+            patch("src.scraper.get_document_data",
+                  side_effect=lambda s, d, **kw: _doc_data(pages[d])):
+        manifest = scrape_volume(
+            session, "CO273_TEST", doc_ids, tmp_path,
+            resume=False, max_workers=3, prefetch=2,
+        )
+
+    assert manifest["downloaded_docs"] == doc_ids
+    assert manifest["failed_docs"] == []
+    images_dir = tmp_path / "CO273_TEST" / "images"
+    assert (images_dir / "GALE_B2" / "page_0003.jpg").exists()
+    assert (images_dir / "GALE_D4" / "page_0001.jpg").exists()
+    assert (tmp_path / "CO273_TEST" / "text" / "GALE_C3.txt").exists()
+
+    saved = load_manifest(tmp_path / "CO273_TEST" / "manifest.json")
+    assert saved["downloaded_docs"] == doc_ids
+
+
+def test_scrape_volume_skips_downloaded_on_resume(tmp_path):
+    """Documents already in downloaded_docs are not re-fetched."""
+    doc_ids = ["GALE|A1", "GALE|B2"]
+    save_manifest(tmp_path / "CO273_TEST" / "manifest.json", {
+        "volume_id": "CO273_TEST",
+        "total_documents": 2,
+        "doc_ids": doc_ids,
+        "downloaded_docs": ["GALE|A1"],
+        "failed_docs": [],
+    })
+
+    with patch("src.scraper.DOWNLOAD_DELAY", 0), \
+            patch("src.scraper.get_document_data",
+                  return_value=_doc_data(1)) as mock_get:
+        manifest = scrape_volume(_jpeg_session(), "CO273_TEST", doc_ids, tmp_path)
+
+    mock_get.assert_called_once()
+    assert mock_get.call_args.args[1] == "GALE|B2"
+    assert manifest["downloaded_docs"] == doc_ids
+
+
+def test_scrape_volume_resumes_from_sqlite_manifest(tmp_path):
+    """Progress committed to manifest.sqlite wins over a stale manifest.json."""
+    doc_ids = ["GALE|A1", "GALE|B2"]
+    with patch("src.scraper.DOWNLOAD_DELAY", 0), \
+            patch("src.scraper.get_document_data", return_value=_doc_data(1)):
+        scrape_volume(_jpeg_session(), "CO273_TEST", doc_ids, tmp_path, resume=False)
+
+    # Simulate a crash before the final JSON export
+    manifest_path = tmp_path / "CO273_TEST" / "manifest.json"
+    stale = load_manifest(manifest_path)
+    stale["downloaded_docs"] = []
+    manifest_path.write_text(json.dumps(stale))
+    assert (tmp_path / "CO273_TEST" / "manifest.sqlite").exists()
+
+    with patch("src.scraper.DOWNLOAD_DELAY", 0), \
+            patch("src.scraper.get_document_data") as mock_get:
+        manifest = scrape_volume(_jpeg_session(), "CO273_TEST", doc_ids, tmp_path)
+
+    mock_get.assert_not_called()
+    assert manifest["downloaded_docs"] == doc_ids
+
+
+def test_scrape_volume_aborts_after_consecutive_failures(tmp_path):
+    """Three metadata failures in a row stop scheduling further documents."""
+    doc_ids = [f"GALE|D{i}" for i in range(10)]
+
+    with patch("src.scraper.DOWNLOAD_DELAY", 0), \
+            patch("src.scraper.get_document_data",
+                  side_effect=ValueError("session expired")) as mock_get:
+        manifest = scrape_volume(
+            MagicMock(), "CO273_TEST", doc_ids, tmp_path,
+            resume=False, prefetch=2,
+        )
+
+    assert manifest["downloaded_docs"] == []
+    assert manifest["failed_docs"] == doc_ids[:3]
+    # Only the prefetch window beyond the third failure was ever requested
+    assert mock_get.call_count <= 5
+
+
+def test_scrape_volumes_share_budget_and_progress(tmp_path):
+    """Concurrent volumes use the caller's limiter and report into one progress."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.rate_control import AdaptiveLimiter
+
+    limiter = AdaptiveLimiter(initial=2, min_limit=2, max_limit=2)
+    throttle = RequestThrottle(0)
+    progress = ScrapeProgress()
+    volumes = {"CO273_A": ["GALE|A1", "GALE|A2"], "CO273_B": ["GALE|B1"]}
+
+    with patch("src.scraper.get_document_data",
+               side_effect=lambda s, d, **kw: _doc_data(2)) as mock_get:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(
+                    scrape_volume, _jpeg_session(), volume_id, doc_ids, tmp_path,
+                    resume=False, limiter=limiter, throttle=throttle, progress=progress,
+                )
+                for volume_id, doc_ids in volumes.items()
+            ]
+            manifests = [f.result() for f in futures]
+
+    assert [m["downloaded_docs"] for m in manifests] == list(volumes.values())
+    assert all(call.kwargs["limiter"] is limiter for call in mock_get.call_args_list)
+    summary = progress.summary()
+    assert "CO273_A 2/2 done" in summary
+    assert "CO273_B 1/1 done" in summary
+    assert "6 pages" in summary
+
+
+def test_request_throttle_spaces_calls():
+    """Consecutive wait() calls are spaced by the interval."""
+    throttle = RequestThrottle(0.05)
+    with patch("src.scraper.time.sleep") as mock_sleep:
+        throttle.wait()
+        throttle.wait()
+    assert mock_sleep.call_count == 1
+    assert 0 < mock_sleep.call_args.args[0] <= 0.05
+
+
+# ---------------------------------------------------------------------------
+# 19. Streamed, atomic page writes
+# ---------------------------------------------------------------------------
+
+def _streamed_session(content: bytes, headers: dict | None = None):
+    session = MagicMock()
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = headers or {}
+    response.iter_content.side_effect = lambda chunk_size: (
+        content[i:i + 1024] for i in range(0, len(content), 1024)
+    )
+    session.get.return_value = response
+    return session
+
+
+def test_is_complete_page(tmp_path):
+    """Only files over 1000 bytes ending in a JPEG EOI count as complete."""
+    good = tmp_path / "good.jpg"
+    good.write_bytes(JPEG_BYTES)
+    truncated = tmp_path / "truncated.jpg"
+    truncated.write_bytes(JPEG_BYTES[:3000])
+    padded = tmp_path / "padded.jpg"
+    padded.write_bytes(JPEG_BYTES + b"\x00\x00")
+
+    assert is_complete_page(good)
+    assert not is_complete_page(truncated)
+    assert is_complete_page(padded)
+    assert not is_complete_page(tmp_path / "missing.jpg")
+
+
+def test_download_single_page_streams_in_chunks(tmp_path):
+    """Page is streamed with stream=True and written whole via rename."""
+    session = _streamed_session(JPEG_BYTES, {"Content-Length": str(len(JPEG_BYTES))})
+    page_info = {"pageNumber": "1", "recordId": "T"}
+
+    assert _download_single_page(session, page_info, tmp_path) is True
+    assert session.get.call_args.kwargs["stream"] is True
+    assert (tmp_path / "page_0001.jpg").read_bytes() == JPEG_BYTES
+    assert not (tmp_path / "page_0001.jpg.part").exists()
+
+
+def test_download_single_page_redownloads_truncated(tmp_path):
+    """A truncated page left by an earlier crash is not treated as done."""
+    (tmp_path / "page_0001.jpg").write_bytes(JPEG_BYTES[:3000])
+    session = _streamed_session(JPEG_BYTES)
+
+    result = _download_single_page(session, {"pageNumber": "1", "recordId": "T"}, tmp_path)
+    assert result is True
+    assert session.get.call_count == 1
+    assert (tmp_path / "page_0001.jpg").read_bytes() == JPEG_BYTES
+
+
+def test_download_single_page_rejects_incomplete_body(tmp_path):
+    """Bodies short of Content-Length or missing EOI are never committed."""
+    session = _streamed_session(
+        JPEG_BYTES[:4000], {"Content-Length": str(len(JPEG_BYTES))},
+    )
+    with patch("src.scraper.time.sleep"):
+        result = _download_single_page(session, {"pageNumber": "1", "recordId": "T"}, tmp_path)
+
+    assert result is False
+    assert session.get.call_count == 3
+    assert not (tmp_path / "page_0001.jpg").exists()
+    assert not (tmp_path / "page_0001.jpg.part").exists()
+
+
+def test_partial_page_discarded_without_commit(tmp_path):
+    """Leaving the context without commit() removes the temp file."""
+    target = tmp_path / "page_0001.jpg"
+    with PartialPage(target) as part:
+        part.write(JPEG_BYTES[:100])
+        assert part.tmp_path.exists()
+    assert not part.tmp_path.exists()
+    assert not target.exists()
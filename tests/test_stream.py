@@ -0,0 +1,119 @@
+# tests/test_stream.py
+import asyncio
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from src.ocr.stream import run_stream_pipeline
+
+
+def _write_doc(images_dir: Path, doc_id: str, count: int) -> Path:
+    """Helper: write a document's page images as the scraper would."""
+    doc_dir = images_dir / doc_id
+    doc_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(1, count + 1):
+        Image.new("RGB", (50, 50), color=(i * 40, 0, 0)).save(doc_dir / f"page_{i:04d}.jpg")
+    return doc_dir
+
+
+def _mock_model(transcribing: threading.Event) -> MagicMock:
+    """Helper: a Gemini model mock that sets `transcribing` on each call."""
+    response = MagicMock()
+    response.text = "Transcribed text"
+
+    async def transcribe(*args, **kwargs):
+        transcribing.set()
+        return response
+
+    model = MagicMock()
+    model.generate_content_async = AsyncMock(side_effect=transcribe)
+    return model
+
+
+@pytest.mark.asyncio
+async def test_stream_pipeline_ocrs_while_scraping(tmp_path):
+    """The first document is transcribed before the scraper finishes the second."""
+    images_dir = tmp_path / "CO273_534" / "images"
+    transcribing = threading.Event()
+    overlapped = []
+
+    def fake_scrape(session, volume_id, doc_ids, output_dir, on_document=None, **kwargs):
+        on_document("GALE_AAA111", _write_doc(images_dir, "GALE_AAA111", 2))
+        overlapped.append(transcribing.wait(timeout=5))
+        on_document("GALE_BBB222", _write_doc(images_dir, "GALE_BBB222", 1))
+        return {}
+
+    with patch("src.ocr.stream.scrape_volume", side_effect=fake_scrape), \
+            patch("src.ocr.stream.get_gemini_model", return_value=_mock_model(transcribing)):
+        result = await run_stream_pipeline(
+            session=MagicMock(),
+            volume_id="CO273_534",
+            doc_ids=["GALE|AAA111", "GALE|BBB222"],
+            output_dir=tmp_path,
+            concurrency=2,
+            queue_size=1,
+        )
+
+    assert overlapped == [True]
+    assert sorted(result["completed_pages"]) == ["GALE_AAA111/1", "GALE_AAA111/2", "GALE_BBB222/1"]
+    assert result["total_pages"] == 3
+    assert (tmp_path / "CO273_534" / "ocr" / "GALE_BBB222" / "page_0001.txt").exists()
+
+
+@pytest.mark.asyncio
+async def test_stream_pipeline_resumes_pages_on_disk(tmp_path):
+    """Pages scraped by an earlier run are OCR'd even if the scraper has nothing left."""
+    _write_doc(tmp_path / "CO273_534" / "images", "GALE_AAA111", 2)
+    model = _mock_model(threading.Event())
+
+    with patch("src.ocr.stream.scrape_volume", return_value={}), \
+            patch("src.ocr.stream.get_gemini_model", return_value=model):
+        result = await run_stream_pipeline(
+            session=MagicMock(), volume_id="CO273_534", doc_ids=[], output_dir=tmp_path,
+            concurrency=2,
+        )
+        assert len(result["completed_pages"]) == 2
+
+        again = await run_stream_pipeline(
+            session=MagicMock(), volume_id="CO273_534", doc_ids=[], output_dir=tmp_path,
+            concurrency=2,
+        )
+
+    assert model.generate_content_async.call_count == 2
+    assert len(again["completed_pages"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_pipeline_stops_scraper_when_ocr_fails(tmp_path):
+    """A failing consumer ends the run and unblocks a scraper waiting on the full queue."""
+    images_dir = tmp_path / "CO273_534" / "images"
+    scraper_errors = []
+    scraper_done = threading.Event()
+
+    def fake_scrape(session, volume_id, doc_ids, output_dir, on_document=None, **kwargs):
+        try:
+            on_document("GALE_AAA111", _write_doc(images_dir, "GALE_AAA111", 5))
+        except RuntimeError as e:
+            scraper_errors.append(str(e))
+        finally:
+            scraper_done.set()
+        return {}
+
+    async def fail_after_queue_fills(**kwargs):
+        await asyncio.sleep(0.2)
+        raise ValueError("boom")
+
+    with patch("src.ocr.stream.scrape_volume", side_effect=fake_scrape), \
+            patch("src.ocr.stream.get_gemini_model", return_value=MagicMock()), \
+            patch("src.ocr.stream._ocr_with_retry", AsyncMock(side_effect=fail_after_queue_fills)):
+        with pytest.raises(ValueError):
+            await asyncio.wait_for(run_stream_pipeline(
+                session=MagicMock(), volume_id="CO273_534", doc_ids=["GALE|AAA111"],
+                output_dir=tmp_path, concurrency=1, queue_size=1,
+            ), timeout=5)
+
+    assert scraper_done.wait(timeout=5)
+    assert scraper_errors == ["stream pipeline stopped"]